@@ -0,0 +1,328 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+from python.generators import GENERATORS, generate_graph
+from python.graph import Graph
+from python.independent_cascade import IndependentCascadeModel
+from python.linear_threshold import LinearThresholdModel
+
+# A benchmark case is a (name, size, function) tuple: `function` is timed, `size` is the number of nodes it works on.
+Case = Tuple[str, int, Callable[[], Any]]
+
+
+def summarise(samples_ns: List[int]) -> Dict[str, float]:
+    """ Computes summary statistics of timing samples.
+
+    Parameters
+    ----------
+    samples_ns : List[int]
+        running times in nanoseconds.
+
+    Returns
+    -------
+    Dict[str, float]
+        median, first and third quartiles, interquartile range, minimum and maximum, in nanoseconds.
+    """
+    if len(samples_ns) > 1:
+        q1, median, q3 = statistics.quantiles(samples_ns, n=4, method="inclusive")
+    else:
+        q1 = median = q3 = float(samples_ns[0])
+    return {"median_ns": median, "q1_ns": q1, "q3_ns": q3, "iqr_ns": q3 - q1,
+            "min_ns": float(min(samples_ns)), "max_ns": float(max(samples_ns))}
+
+
+def measure(function: Callable[[], Any], repetitions: int = 5, warmup: int = 1, track_memory: bool = True) -> Dict[str, Any]:
+    """ Times `function` after warm-up runs and records its peak memory allocation.
+
+    Parameters
+    ----------
+    function : Callable[[], Any]
+        function benchmarked.
+
+    repetitions : int, optional
+        number of timed runs. Defaults to 5.
+
+    warmup : int, optional
+        number of untimed runs made first. Defaults to 1.
+
+    track_memory : bool, optional
+        whether an extra run is made under tracemalloc to record the peak allocation. Defaults to True.
+
+    Returns
+    -------
+    Dict[str, Any]
+        timing samples, their summary and the peak allocation in bytes.
+    """
+    for _ in range(warmup):
+        function()
+    samples_ns = []
+    for _ in range(repetitions):
+        start = time.perf_counter_ns()
+        function()
+        samples_ns.append(time.perf_counter_ns() - start)
+    result = {"samples_ns": samples_ns}
+    result.update(summarise(samples_ns))
+    # Memory is measured on a separate run since tracing allocations slows the code down.
+    if track_memory:
+        tracemalloc.start()
+        try:
+            function()
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def graph_cases(path: str, sizes: List[int], rng_seed: int = 0) -> List[Case]:
+    """ Builds the benchmark cases for the graph stored in `path`: loading, then for each size,
+    subgraph extraction, influential nodes computation and IC and LT cascades seeded by the influential nodes.
+
+    Parameters
+    ----------
+    path : str
+        path of the txt/tgf file.
+
+    sizes : List[int]
+        numbers of nodes of the subgraphs benchmarked.
+
+    rng_seed : int, optional
+        seed of the random number generators. Defaults to 0.
+
+    Returns
+    -------
+    List[Case]
+        list of benchmark cases.
+    """
+    g = Graph(path)
+    cases = [("load", len(g.nodes), lambda: Graph(path))]
+    for size in sizes:
+        sub = g.build_subgraph(size, "o", random.Random(rng_seed))
+        seeds = sub.get_influential_nodes(sub.out_degree)
+        cases.extend(subgraph_cases(g, sub, seeds, size, rng_seed))
+    return cases
+
+
+def generated_cases(model: str, sizes: List[int], average_degree: float = 8, rng_seed: int = 0) -> Iterator[Case]:
+    """ Builds the benchmark cases of synthetic graphs, to chart how the code scales across orders of magnitude:
+    for each size, generation of the graph, then influential nodes computation and IC and LT cascades on the whole graph.
+    The cases are built lazily, one size at a time, so that only the graph of the size being benchmarked is held in memory.
+
+    Parameters
+    ----------
+    model : str
+        graph model, see `generators.GENERATORS`.
+
+    sizes : List[int]
+        numbers of nodes of the graphs generated.
+
+    average_degree : float, optional
+        average out-degree of the graphs. Defaults to 8.
+
+    rng_seed : int, optional
+        seed of the random number generators. Defaults to 0.
+
+    Returns
+    -------
+    Iterator[Case]
+        iterator over the benchmark cases.
+    """
+    for size in sizes:
+        yield from generated_size_cases(model, size, average_degree, rng_seed)
+
+
+def generated_size_cases(model: str, size: int, average_degree: float, rng_seed: int) -> Iterator[Case]:
+    """ Builds the benchmark cases of one synthetic graph, generated when the first case is requested and released with
+    the last one.
+
+    Parameters
+    ----------
+    model : str
+        graph model, see `generators.GENERATORS`.
+
+    size : int
+        number of nodes of the graph generated.
+
+    average_degree : float
+        average out-degree of the graph.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    Returns
+    -------
+    Iterator[Case]
+        iterator over the benchmark cases.
+    """
+    g = generate_graph(model, size, average_degree, random.Random(rng_seed))
+    seeds = g.get_influential_nodes(g.out_degree)
+    # The number of nodes of an R-MAT graph is rounded up to a power of two.
+    size = len(g.labels)
+    yield "generate_" + model, size, lambda: generate_graph(model, size, average_degree, random.Random(rng_seed))
+    # The subgraph extraction case is skipped, the other cases run on the whole generated graph.
+    yield from subgraph_cases(g, g, seeds, size, rng_seed)[1:]
+
+
+def subgraph_cases(g: Graph, sub: Graph, seeds: List[str], size: int, rng_seed: int) -> List[Case]:
+    """ Builds the benchmark cases of one subgraph size.
+
+    Parameters
+    ----------
+    g : Graph
+        graph from which the subgraphs are extracted.
+
+    sub : Graph
+        subgraph on which the centrality and the cascades are benchmarked.
+
+    seeds : List[str]
+        seed nodes of the cascades.
+
+    size : int
+        number of nodes of `sub`.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    Returns
+    -------
+    List[Case]
+        list of benchmark cases.
+    """
+    return [
+        ("subgraph_extraction", size, lambda: g.build_subgraph(size, "o", random.Random(rng_seed))),
+        ("get_influential_nodes", size, lambda: sub.get_influential_nodes(sub.out_degree)),
+        ("get_influential_nodes_pruned", size, lambda: sub.get_influential_nodes_pruned(sub.out_degree)),
+        ("ic_cascade", size, lambda: IndependentCascadeModel(sub, seeds, 0.2, random.Random(rng_seed))),
+        ("lt_cascade", size, lambda: LinearThresholdModel(sub, seeds)),
+    ]
+
+
+def run_benchmarks(cases: Iterable[Case], repetitions: int = 5, warmup: int = 1, track_memory: bool = True) -> Dict[str, Any]:
+    """ Runs the benchmark cases and gathers their results in a JSON-serialisable dictionary.
+
+    Parameters
+    ----------
+    cases : Iterable[Case]
+        benchmark cases, run in order.
+
+    repetitions : int, optional
+        number of timed runs per case. Defaults to 5.
+
+    warmup : int, optional
+        number of untimed runs per case. Defaults to 1.
+
+    track_memory : bool, optional
+        whether the peak allocation of each case is recorded. Defaults to True.
+
+    Returns
+    -------
+    Dict[str, Any]
+        the environment and, for each case, its name, size and measurements.
+    """
+    results = []
+    for name, size, function in cases:
+        result = {"name": name, "size": size}
+        result.update(measure(function, repetitions, warmup, track_memory))
+        results.append(result)
+        print("%s (n=%d): median %.3f ms, IQR %.3f ms" % (name, size, result["median_ns"] / 1e6, result["iqr_ns"] / 1e6), file=sys.stderr)
+    return {"python": platform.python_version(), "platform": platform.platform(), "timestamp": time.time(),
+            "repetitions": repetitions, "warmup": warmup, "results": results}
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """ Compares benchmark results against a baseline.
+    A case regresses when its median running time exceeds the baseline median by more than `tolerance`,
+    and by more than the baseline interquartile range, so that noise alone is not reported.
+
+    Parameters
+    ----------
+    current : Dict[str, Any]
+        results returned by `run_benchmarks`.
+
+    baseline : Dict[str, Any]
+        baseline results returned by `run_benchmarks`.
+
+    tolerance : float, optional
+        relative slowdown tolerated. Defaults to 0.1 (10%).
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        one entry per case found in both results, with the ratio of the medians and whether it regressed.
+    """
+    baseline_results = {(r["name"], r["size"]): r for r in baseline["results"]}
+    comparisons = []
+    for result in current["results"]:
+        reference = baseline_results.get((result["name"], result["size"]))
+        if reference is None:
+            continue
+        ratio = result["median_ns"] / reference["median_ns"] if reference["median_ns"] else float("inf")
+        regressed = ratio > 1 + tolerance and result["median_ns"] - reference["median_ns"] > reference["iqr_ns"]
+        comparisons.append({"name": result["name"], "size": result["size"], "baseline_median_ns": reference["median_ns"],
+                            "median_ns": result["median_ns"], "ratio": ratio, "regressed": regressed})
+    return comparisons
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command-line entry point.
+
+    `python -m python.benchmark run --graph wiki-Vote.txt --sizes 500 1000 --output results.json` runs the suite,
+    `python -m python.benchmark run --generator rmat --sizes 1000 10000 100000` runs it on synthetic graphs, and
+    `python -m python.benchmark compare results.json baseline.json` exits with status 1 if any case regressed.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        exit status.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks of the graph, centrality and diffusion code.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--graph", default="test_graph.txt", help="txt/tgf graph file")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[10], help="subgraph sizes, or graph sizes with --generator")
+    run_parser.add_argument("--generator", choices=sorted(GENERATORS), help="benchmark synthetic graphs of this model instead of --graph")
+    run_parser.add_argument("--average-degree", type=float, default=8, help="average out-degree of the synthetic graphs")
+    run_parser.add_argument("--repetitions", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--no-memory", action="store_true", help="do not record peak memory")
+    run_parser.add_argument("--output", help="JSON file to write the results to (standard output by default)")
+    compare_parser = subparsers.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.generator:
+            cases = generated_cases(args.generator, args.sizes, args.average_degree, args.seed)
+        else:
+            cases = graph_cases(args.graph, args.sizes, args.seed)
+        results = run_benchmarks(cases, args.repetitions, args.warmup, not args.no_memory)
+        if args.output:
+            with open(args.output, "w") as output_file:
+                json.dump(results, output_file, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+        return 0
+
+    with open(args.current) as current_file, open(args.baseline) as baseline_file:
+        comparisons = compare_results(json.load(current_file), json.load(baseline_file), args.tolerance)
+    for c in comparisons:
+        print("%-24s n=%-8d %8.3f ms -> %8.3f ms  x%.2f%s" % (c["name"], c["size"], c["baseline_median_ns"] / 1e6,
+                                                            c["median_ns"] / 1e6, c["ratio"], "  REGRESSION" if c["regressed"] else ""))
+    return 1 if any(c["regressed"] for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
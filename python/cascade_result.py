@@ -0,0 +1,165 @@
+from array import array
+from typing import Dict, List, Optional
+
+
+class CascadeResult:
+    """Nodes influenced by a cascade, round by round, stored in compressed sparse row (CSR) form:
+    a single list of the influenced nodes in activation order, and the offsets at which each round starts in it.
+    Round 0 holds the seeds and, as in the nested-list format of the spreading models, the last round is empty.
+    A result indexes and iterates like the list of its rounds, which `to_layers` builds for code expecting lists.
+
+    Parameters
+    ----------
+    seeds : List[str]
+        list of seed nodes, which form round 0.
+    """
+
+    __slots__ = ("nodes", "offsets", "activation_rounds")
+
+    def __init__(self, seeds):
+        self.nodes = list(seeds)
+        self.offsets = array('q', [0, len(self.nodes)])
+        # Round of each node, built on first use.
+        self.activation_rounds = None
+
+    @classmethod
+    def from_layers(cls, layers: List[List[str]]) -> 'CascadeResult':
+        """ Builds a result from the nested-list format of the spreading models.
+
+        Parameters
+        ----------
+        layers : List[List[str]]
+            list of lists of influenced nodes, one list per round.
+
+        Returns
+        -------
+        CascadeResult
+            the result.
+        """
+        result = cls(layers[0] if layers else [])
+        for layer in layers[1:]:
+            result.add_round(layer)
+        return result
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, round_index):
+        if isinstance(round_index, slice):
+            return [self.layer(i) for i in range(*round_index.indices(len(self)))]
+        if round_index < 0:
+            round_index += len(self)
+        if not 0 <= round_index < len(self):
+            raise IndexError("round index out of range")
+        return self.layer(round_index)
+
+    def __iter__(self):
+        for round_index in range(len(self)):
+            yield self.layer(round_index)
+
+    def __eq__(self, other):
+        if isinstance(other, CascadeResult):
+            return self.nodes == other.nodes and self.offsets == other.offsets
+        if isinstance(other, list):
+            return self.to_layers() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return "CascadeResult(%r)" % self.to_layers()
+
+    def end_round(self) -> None:
+        """ Closes a round, which holds the nodes appended to `nodes` since the previous round was closed."""
+        self.offsets.append(len(self.nodes))
+        self.activation_rounds = None
+
+    def add_round(self, activated_nodes: List[str]) -> None:
+        """ Appends a round.
+
+        Parameters
+        ----------
+        activated_nodes : List[str]
+            nodes influenced during the round.
+        """
+        self.nodes.extend(activated_nodes)
+        self.end_round()
+
+    def layer(self, round_index: int) -> List[str]:
+        """ Returns the nodes influenced at a round.
+
+        Parameters
+        ----------
+        round_index : int
+            index of the round, 0 for the seeds.
+
+        Returns
+        -------
+        List[str]
+            nodes influenced at the round, in activation order.
+        """
+        return self.nodes[self.offsets[round_index]:self.offsets[round_index + 1]]
+
+    def round_size(self, round_index: int) -> int:
+        """ Returns the number of nodes influenced at a round, without building the round.
+
+        Parameters
+        ----------
+        round_index : int
+            index of the round, 0 for the seeds.
+
+        Returns
+        -------
+        int
+            number of nodes influenced at the round.
+        """
+        return self.offsets[round_index + 1] - self.offsets[round_index]
+
+    def total(self) -> int:
+        """ Returns the total number of influenced nodes, seeds included.
+
+        Returns
+        -------
+        int
+            number of influenced nodes.
+        """
+        return len(self.nodes)
+
+    def activation_round(self, vertex: str) -> Optional[int]:
+        """ Returns the round at which `vertex` was influenced.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex looked up.
+
+        Returns
+        -------
+        Optional[int]
+            index of the round, 0 for the seeds, or None if `vertex` was not influenced.
+        """
+        if self.activation_rounds is None:
+            self.activation_rounds = self.compute_activation_rounds()
+        return self.activation_rounds.get(vertex)
+
+    def compute_activation_rounds(self) -> Dict[str, int]:
+        """ Computes the round at which each influenced node was influenced.
+
+        Returns
+        -------
+        Dict[str, int]
+            dictionary which entries (`v`, `r`) associate each influenced node `v` to its round `r`.
+        """
+        activation_rounds = {}
+        for round_index in range(len(self)):
+            for i in range(self.offsets[round_index], self.offsets[round_index + 1]):
+                activation_rounds[self.nodes[i]] = round_index
+        return activation_rounds
+
+    def to_layers(self) -> List[List[str]]:
+        """ Converts `self` to the nested-list format of the spreading models, for compatibility.
+
+        Returns
+        -------
+        List[List[str]]
+            list of lists of influenced nodes, one list per round.
+        """
+        return list(self)
@@ -0,0 +1,86 @@
+import json
+import os
+from typing import Any
+from python.results_store import atomic_open
+
+
+class Checkpoint:
+    """Progress of an evaluation test, saved to a file so that an interrupted test can be resumed.
+    The results of the completed iterations are saved along with the state of the random number generator after the last one,
+    so a resumed test extracts the same subgraphs and gives the same results as an uninterrupted one.
+
+    Parameters
+    ----------
+    path : str
+        path of the checkpoint file. Progress is loaded from it if it exists.
+
+    key : str
+        identifier of the test and its parameters. A checkpoint file saved for another key is rejected.
+
+    interval : int, optional
+        number of iterations between two saves. Defaults to 1.
+    """
+
+    def __init__(self, path, key, interval=1):
+        self.path = path
+        self.key = key
+        self.interval = interval
+        self.results = []
+        self.rng_state = None
+        if os.path.exists(path):
+            self.load()
+
+    def load(self) -> None:
+        """ Loads the progress saved in the checkpoint file."""
+        with open(self.path, 'r') as f:
+            saved = json.load(f)
+        if saved["key"] != self.key:
+            raise Exception("checkpoint", self.path, "belongs to", saved["key"], "not to", self.key)
+        self.results = saved["results"]
+        if saved["rng_state"] is not None:
+            # JSON turns the tuples of the random state into lists.
+            version, internal_state, gauss_next = saved["rng_state"]
+            self.rng_state = (version, tuple(internal_state), gauss_next)
+
+    def save(self) -> None:
+        """ Saves the progress to the checkpoint file, atomically."""
+        with atomic_open(self.path) as f:
+            json.dump({"key": self.key, "results": self.results, "rng_state": self.rng_state}, f)
+
+    def resume(self, rng: Any) -> int:
+        """ Restores the state of `rng` saved after the last completed iteration.
+
+        Parameters
+        ----------
+        rng : random.Random
+            random number generator of the test, or the `random` module.
+
+        Returns
+        -------
+        int
+            number of completed iterations, that is the index of the iteration to run next.
+        """
+        if self.rng_state is not None:
+            rng.setstate(self.rng_state)
+        return len(self.results)
+
+    def record(self, result: Any, rng: Any) -> None:
+        """ Records the result of an iteration and the state of `rng` after it.
+
+        Parameters
+        ----------
+        result : Any
+            JSON-serialisable result of the iteration.
+
+        rng : random.Random
+            random number generator of the test, or the `random` module.
+        """
+        self.results.append(result)
+        self.rng_state = rng.getstate()
+        if len(self.results) % self.interval == 0:
+            self.save()
+
+    def remove(self) -> None:
+        """ Deletes the checkpoint file, once the test is complete."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
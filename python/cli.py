@@ -0,0 +1,286 @@
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+from python.compact_graph import CompactGraph
+from python.graph import Graph, write_nodes_to_txt_file
+from python.independent_cascade import IndependentCascadeModel
+from python.linear_threshold import LinearThresholdModel
+from python.mapped_graph import load_compact_graph, read_meta, save_compact_graph
+from python.results_store import write_csv_rows
+
+MODELS = {"IC": IndependentCascadeModel, "LT": LinearThresholdModel}
+STAGES = ("load", "score", "simulate", "write")
+
+
+def source_description(path: str) -> Dict[str, Any]:
+    """ Describes a graph file by its path, size and modification time, which identify the version cached.
+
+    Parameters
+    ----------
+    path : str
+        path of the graph file.
+
+    Returns
+    -------
+    Dict[str, Any]
+        the description.
+    """
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_graph(path: str, cache_directory: str = None) -> CompactGraph:
+    """ Loads a txt/tgf graph file as a `CompactGraph`. With a cache directory, the graph is stored there in binary form
+    the first time, and read back without parsing on later runs as long as the file is unchanged.
+
+    Parameters
+    ----------
+    path : str
+        path of the graph file.
+
+    cache_directory : str, optional
+        directory of the binary cache. Defaults to None, which disables the cache.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    if cache_directory is None:
+        return CompactGraph.from_graph(Graph(path))
+    source = source_description(path)
+    directory = os.path.join(cache_directory, hashlib.sha1(source["path"].encode()).hexdigest()[:16])
+    try:
+        if read_meta(directory)["source"] == source:
+            return load_compact_graph(directory)
+    except Exception:
+        # Missing, incomplete or stale entry: the graph is parsed again below.
+        pass
+    g = CompactGraph.from_graph(Graph(path))
+    save_compact_graph(g, directory, source)
+    return g
+
+
+def replica_rng(seed: int, name: str, model: str) -> random.Random:
+    """ Returns the random number generator of the replicas of one model on one input,
+    which only depends on its arguments so that results do not depend on the worker running them.
+
+    Parameters
+    ----------
+    seed : int
+        seed of the run.
+
+    name : str
+        name of the input.
+
+    model : str
+        name of the spreading model.
+
+    Returns
+    -------
+    random.Random
+        the random number generator.
+    """
+    return random.Random("%d:%s:%s" % (seed, name, model))
+
+
+def run_input(name: str, path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """ Runs the load, score and simulate stages on one input. Executed by the worker processes.
+
+    Parameters
+    ----------
+    name : str
+        name of the input, used for its output files.
+
+    path : str
+        path of the graph file.
+
+    options : Dict[str, Any]
+        options of the run: cache_dir, degree, models, act_prob, replicas and seed.
+
+    Returns
+    -------
+    Dict[str, Any]
+        name, path, number of nodes and edges, influential nodes, number of nodes influenced by each replica of each model,
+        nodes influenced by the first replica of the first model, and running time of each stage in seconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+    g = load_graph(path, options["cache_dir"])
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seeds = g.get_influential_nodes(g.in_degree if options["degree"] == "i" else g.out_degree)
+    timings["score"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    spreads = {}
+    influenced_nodes = None
+    for model_name in options["models"]:
+        model = MODELS[model_name]
+        # LT is deterministic, so a single replica is enough.
+        replicas = 1 if model is LinearThresholdModel else options["replicas"]
+        rng = replica_rng(options["seed"], name, model_name)
+        spreads[model_name] = []
+        for _ in range(replicas):
+            result = model(g, seeds, options["act_prob"], rng).get_cascade_result()
+            spreads[model_name].append(result.total())
+            if influenced_nodes is None:
+                # The influenced nodes, seeds excluded, are written like in the main method of the graph module.
+                influenced_nodes = result.nodes[result.round_size(0):]
+    timings["simulate"] = time.perf_counter() - start
+    return {"name": name, "path": path, "nodes": len(g.labels), "edges": len(g.targets), "seeds": seeds,
+            "spreads": spreads, "influenced_nodes": influenced_nodes or [], "timings": timings}
+
+
+def write_outputs(result: Dict[str, Any], output_directory: str) -> None:
+    """ Write stage: writes the influential nodes, the influenced nodes and the spread of every replica of one input,
+    each file in a single write.
+
+    Parameters
+    ----------
+    result : Dict[str, Any]
+        result of `run_input`.
+
+    output_directory : str
+        directory of the output files.
+    """
+    prefix = os.path.join(output_directory, result["name"])
+    write_nodes_to_txt_file(prefix + ".influential_nodes.txt", result["seeds"])
+    write_nodes_to_txt_file(prefix + ".influenced_nodes.txt", result["influenced_nodes"])
+    rows = [["model", "replica", "influenced_nodes"]]
+    for model_name, totals in result["spreads"].items():
+        rows.extend([model_name, replica, total] for replica, total in enumerate(totals))
+    write_csv_rows(prefix + ".spreads.csv", rows)
+
+
+def summary_rows(results: List[Dict[str, Any]]) -> List[List[Any]]:
+    """ Builds the summary table of a run: one row per input and model.
+
+    Parameters
+    ----------
+    results : List[Dict[str, Any]]
+        results of the inputs, with the timings of all the stages.
+
+    Returns
+    -------
+    List[List[Any]]
+        rows of the table, header included.
+    """
+    rows = [["input", "nodes", "edges", "influential_nodes", "model", "replicas", "average_spread"] + ["%s_s" % s for s in STAGES]]
+    for result in results:
+        stage_times = ["%.6f" % result["timings"][s] for s in STAGES]
+        for model_name, totals in result["spreads"].items():
+            rows.append([result["name"], result["nodes"], result["edges"], len(result["seeds"]), model_name, len(totals),
+                         sum(totals) / float(len(totals))] + stage_times)
+    return rows
+
+
+def input_names(paths: List[str]) -> List[str]:
+    """ Names the inputs after their files, without the extension.
+
+    Parameters
+    ----------
+    paths : List[str]
+        paths of the graph files.
+
+    Returns
+    -------
+    List[str]
+        name of each input.
+    """
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(set(names)) != len(names):
+        raise Exception("Input files must have distinct names, since their outputs are named after them")
+    return names
+
+
+def run_pipeline(paths: List[str], output_directory: str, options: Dict[str, Any], workers: int = None) -> List[Dict[str, Any]]:
+    """ Runs the pipeline over several inputs. The load, score and simulate stages of different inputs run in parallel
+    in a pool of at most `workers` processes, while the main process writes the outputs of each input as soon as it is done.
+    The timings of each input are printed as it completes, followed by the total time of each stage.
+
+    Parameters
+    ----------
+    paths : List[str]
+        paths of the graph files.
+
+    output_directory : str
+        directory of the output files. Created if needed.
+
+    options : Dict[str, Any]
+        options of the run, see `run_input`.
+
+    workers : int, optional
+        number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        results of the inputs, in the order of `paths`.
+    """
+    names = input_names(paths)
+    os.makedirs(output_directory, exist_ok=True)
+    if options["cache_dir"] is not None:
+        os.makedirs(options["cache_dir"], exist_ok=True)
+    results = {}
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_input, name, path, options) for name, path in zip(names, paths)]
+        for future in as_completed(futures):
+            result = future.result()
+            start = time.perf_counter()
+            write_outputs(result, output_directory)
+            result["timings"]["write"] = time.perf_counter() - start
+            results[result["name"]] = result
+            print("%-24s %s" % (result["name"], " ".join("%s %9.3f s" % (s, result["timings"][s]) for s in STAGES)))
+    ordered_results = [results[name] for name in names]
+    write_csv_rows(os.path.join(output_directory, "summary.csv"), summary_rows(ordered_results))
+    print("%-24s %s" % ("total", " ".join("%s %9.3f s" % (s, sum(r["timings"][s] for r in ordered_results)) for s in STAGES)))
+    return ordered_results
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command-line entry point.
+
+    `python -m python.cli wiki-Vote.txt test_graph.txt --output-dir results --replicas 100 --cache-dir .graph-cache`
+    computes the influential nodes of each graph, runs IC and LT from them and writes, in the output directory,
+    `<input>.influential_nodes.txt`, `<input>.influenced_nodes.txt` and `<input>.spreads.csv` for each input,
+    and `summary.csv` for the whole run. IC and LT activate the nodes of a round in insertion order,
+    so their results are repeated exactly across runs with the same `--seed`, whatever the PYTHONHASHSEED.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        exit status.
+    """
+    parser = argparse.ArgumentParser(description="Computes the influential nodes of graphs and simulates their spread.")
+    parser.add_argument("inputs", nargs="+", help="txt/tgf graph files")
+    parser.add_argument("--output-dir", default="results", help="directory of the output files")
+    parser.add_argument("--degree", choices=["i", "o"], default="o", help="degree metric: in-degree or out-degree")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=["IC", "LT"], help="spreading models")
+    parser.add_argument("--act-prob", type=float, default=0.2, help="activation probability of IC")
+    parser.add_argument("--replicas", type=int, default=1, help="number of IC cascades per input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="number of worker processes (number of CPUs by default)")
+    parser.add_argument("--cache-dir", help="directory of the binary graph cache (disabled by default)")
+    args = parser.parse_args(argv)
+
+    options = {"cache_dir": args.cache_dir, "degree": args.degree, "models": args.models, "act_prob": args.act_prob,
+               "replicas": args.replicas, "seed": args.seed}
+    run_pipeline(args.inputs, args.output_dir, options, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
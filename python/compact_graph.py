@@ -0,0 +1,405 @@
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Sequence, Tuple
+from python.graph import Graph
+
+
+def build_csr(number_of_nodes: int, sources: Sequence[int], targets: Sequence[int]) -> Tuple[array, array]:
+    """ Builds the compressed sparse row (CSR) form of a list of edges by counting sort.
+    The edges leaving a node keep their relative order.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes, identified by the integers 0 to `number_of_nodes` - 1.
+
+    sources : Sequence[int]
+        head of each edge.
+
+    targets : Sequence[int]
+        tail of each edge.
+
+    Returns
+    -------
+    Tuple[array, array]
+        the offsets, such that the successors of node `i` are the targets between `offsets[i]` and `offsets[i+1]`, and the targets.
+    """
+    offsets = array('q', bytes(8 * (number_of_nodes + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(number_of_nodes):
+        offsets[i + 1] += offsets[i]
+    position = array('q', offsets[:number_of_nodes])
+    sorted_targets = array('q', bytes(8 * len(targets)))
+    for source, target in zip(sources, targets):
+        sorted_targets[position[source]] = target
+        position[source] += 1
+    return offsets, sorted_targets
+
+
+def build_reverse_csr(number_of_nodes: int, offsets: Sequence[int], targets: Sequence[int]) -> Tuple[array, array]:
+    """ Builds the CSR form of the predecessors from the CSR form of the successors.
+    A predecessor is listed once even if it has several edges to the same node, and predecessors are sorted by identifier.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes.
+
+    offsets : Sequence[int]
+        offsets of the successors.
+
+    targets : Sequence[int]
+        successors.
+
+    Returns
+    -------
+    Tuple[array, array]
+        the offsets and the predecessors.
+    """
+    sources = array('q')
+    distinct_targets = array('q')
+    for node in range(number_of_nodes):
+        for target in set(targets[offsets[node]:offsets[node + 1]]):
+            sources.append(node)
+            distinct_targets.append(target)
+    # Sources are visited in increasing order, and the counting sort is stable, so predecessors come out sorted.
+    return build_csr(number_of_nodes, distinct_targets, sources)
+
+
+class CompactAdjacency(Mapping):
+    """Read-only adjacency list of a `CompactGraph`, mapping each node to the list of its successors.
+
+    Parameters
+    ----------
+    graph : CompactGraph
+        graph which adjacency is exposed.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, vertex):
+        return self.graph.successors(vertex)
+
+    def __iter__(self):
+        return iter(self.graph.labels)
+
+    def __len__(self):
+        return len(self.graph.labels)
+
+    def __contains__(self, vertex):
+        return vertex in self.graph.index
+
+
+class CompactGraph(Graph):
+    """Graph stored in compressed sparse row (CSR) form: nodes are identified by integers, and the successors and
+    predecessors of all the nodes are stored in flat integer arrays instead of one list per node.
+    Node labels are only used at the interface, so a `CompactGraph` can be used wherever a `Graph` is.
+
+    Parameters
+    ----------
+    labels : Sequence[str]
+        label of each node, indexed by identifier.
+
+    offsets : Sequence[int]
+        offsets of the successors of each node in `targets`.
+
+    targets : Sequence[int]
+        successors of all the nodes.
+
+    in_offsets : Sequence[int]
+        offsets of the predecessors of each node in `in_sources`.
+
+    in_sources : Sequence[int]
+        predecessors of all the nodes, each listed once per node.
+
+    index : Mapping[str, int], optional
+        identifier of each label. Built from `labels` if not given.
+    """
+
+    def __init__(self, labels, offsets, targets, in_offsets, in_sources, index=None):
+        self.labels = labels
+        self.index = {label: i for i, label in enumerate(labels)} if index is None else index
+        self.offsets = offsets
+        self.targets = targets
+        self.in_offsets = in_offsets
+        self.in_sources = in_sources
+        self.adjacency_list = CompactAdjacency(self)
+        # Parallel edges are kept as repeated targets, like in a `Graph` which does not deduplicate them.
+        self.deduplicate = False
+        self.nodes = labels
+        self.mutations = 0
+        self.most_connected_node_degree_value = None
+        self.degree_centralities = {}
+        self.weak_components = None
+        self.strong_components = None
+
+    @classmethod
+    def from_edges(cls, labels: Sequence[str], sources: Sequence[int], targets: Sequence[int]) -> 'CompactGraph':
+        """ Builds a compact graph from a list of edges between node identifiers.
+
+        Parameters
+        ----------
+        labels : Sequence[str]
+            label of each node, indexed by identifier.
+
+        sources : Sequence[int]
+            head of each edge.
+
+        targets : Sequence[int]
+            tail of each edge.
+
+        Returns
+        -------
+        CompactGraph
+            the graph.
+        """
+        offsets, sorted_targets = build_csr(len(labels), sources, targets)
+        in_offsets, in_sources = build_reverse_csr(len(labels), offsets, sorted_targets)
+        return cls(labels, offsets, sorted_targets, in_offsets, in_sources)
+
+    @classmethod
+    def from_graph(cls, g: Graph) -> 'CompactGraph':
+        """ Builds the compact form of `g`. Nodes keep the order of `g` and successors their order in the adjacency list.
+
+        Parameters
+        ----------
+        g : Graph
+            graph converted.
+
+        Returns
+        -------
+        CompactGraph
+            the graph.
+        """
+        labels = list(g.adjacency_list)
+        index = {label: i for i, label in enumerate(labels)}
+        offsets = array('q', [0])
+        targets = array('q')
+        for label in labels:
+            targets.extend(index[successor] for successor in g.adjacency_list[label])
+            offsets.append(len(targets))
+        in_offsets, in_sources = build_reverse_csr(len(labels), offsets, targets)
+        compact = cls(labels, offsets, targets, in_offsets, in_sources, index)
+        compact.most_connected_node_degree_value = g.most_connected_node_degree_value
+        return compact
+
+    def to_graph(self) -> Graph:
+        """ Converts `self` to a `Graph` backed by a dictionary of lists.
+
+        Returns
+        -------
+        Graph
+            the graph.
+        """
+        g = Graph("", {label: self.successors(label) for label in self.labels})
+        g.most_connected_node_degree_value = self.most_connected_node_degree_value
+        return g
+
+    @property
+    def edges(self) -> List[Tuple[str, str]]:
+        return self.get_edges()
+
+    def get_edges(self) -> List[Tuple[str, str]]:
+        """Extracts and returns the edges of `self`. They are built on each call rather than stored.
+
+        Returns
+        -------
+        List[Tuple[str,str]]
+            list of tuples where each tuple (`a`, `b`) is an edge between `a` and `b`.
+        """
+        return [(label, successor) for label in self.labels for successor in self.successors(label)]
+
+    def get_vertices(self) -> List[str]:
+        """Extracts and returns the vertices of `self`.
+
+        Returns
+        -------
+        List[str]
+            list of strings where each string `v`, is a node `v` of the graph.
+        """
+        return list(self.labels)
+
+    def successor_ids(self, node: int) -> Sequence[int]:
+        """ Returns the identifiers of the successors of the node identified by `node`.
+
+        Parameters
+        ----------
+        node : int
+            identifier of the node.
+
+        Returns
+        -------
+        Sequence[int]
+            identifiers of the successors.
+        """
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def predecessor_ids(self, node: int) -> Sequence[int]:
+        """ Returns the identifiers of the predecessors of the node identified by `node`, in increasing order.
+
+        Parameters
+        ----------
+        node : int
+            identifier of the node.
+
+        Returns
+        -------
+        Sequence[int]
+            identifiers of the predecessors.
+        """
+        return self.in_sources[self.in_offsets[node]:self.in_offsets[node + 1]]
+
+    def successors(self, vertex: str) -> List[str]:
+        """ Derives the successors of `vertex`. Those are the nodes that are connected to `vertex`, via outgoing edges from `vertex`.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the successors are derived.
+
+        Returns
+        -------
+        List[str]
+            list of successors of `vertex`.
+        """
+        labels = self.labels
+        return [labels[target] for target in self.successor_ids(self.index[vertex])]
+
+    def predecessors(self, vertices: List[str], vertex: str) -> List[str]:
+        """ Derives the predecessors of `vertex`, in the order of the nodes of `self`.
+        They are read from the stored predecessors, so `vertices` must hold all of them, as the vertices of `self`
+        or the weakly connected component of `vertex` do.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the predecessors are derived.
+
+        vertices : List[str]
+            vertices of the original graph.
+
+        Returns
+        -------
+        List[str]
+            list of predecessors of `vertex`.
+        """
+        labels = self.labels
+        return [labels[source] for source in self.predecessor_ids(self.index[vertex])]
+
+    def out_degree(self, vertex: str) -> int:
+        """ Calculates the out-degree of the `vertex`.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the out-degree is calculated.
+
+        Returns
+        -------
+        int
+            the out-degree of the vertex.
+        """
+        node = self.index[vertex]
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def in_degree(self, vertex: str) -> int:
+        """ Calculates the in-degree of the `vertex`, that is its number of predecessors.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the in-degree is calculated.
+
+        Returns
+        -------
+        int
+            the in-degree of the vertex.
+        """
+        node = self.index[vertex]
+        return self.in_offsets[node + 1] - self.in_offsets[node]
+
+    def in_degree_counts(self) -> Dict[str, int]:
+        """ Returns the in-degree of every vertex of `self`.
+
+        Returns
+        -------
+        Dict[str, int]
+            dictionary which entries (`v`, `d`) associate each node `v` to its in-degree `d`.
+        """
+        in_offsets = self.in_offsets
+        return {label: in_offsets[i + 1] - in_offsets[i] for i, label in enumerate(self.labels)}
+
+    def neighbourhood(self, vertex: str) -> List[str]:
+        """ Determines the neighbourhood of `vertex`, which are the nodes connected to `vertex` by either an outgoing or incoming edge.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex which neighbourhood is determined.
+
+        Returns
+        -------
+        List[str]
+            list of nodes corresponding to the neighbourhood of `vertex`, in the order of the nodes of `self`.
+        """
+        node = self.index[vertex]
+        neighbours = set(self.successor_ids(node))
+        neighbours.update(self.predecessor_ids(node))
+        labels = self.labels
+        return [labels[neighbour] for neighbour in sorted(neighbours)]
+
+    def weakly_connected_components(self) -> Tuple[List[List[str]], Dict[str, int]]:
+        """ Computes the weakly connected components of `self`, that is its connected components when edges are undirected.
+        The traversal reads the stored successors and predecessors, so unlike `Graph` no undirected copy of the edges is built.
+        The result is cached.
+
+        Returns
+        -------
+        Tuple[List[List[str]], Dict[str, int]]
+            list of components, each listing its nodes in the order of `self`, and dictionary which entries (`v`, `c`)
+            associate each node `v` to the index `c` of its component.
+        """
+        if self.weak_components is None:
+            number_of_nodes = len(self.labels)
+            component_ids = array('q', [-1]) * number_of_nodes
+            number_of_components = 0
+            for root in range(number_of_nodes):
+                if component_ids[root] != -1:
+                    continue
+                component_ids[root] = number_of_components
+                stack = [root]
+                while stack:
+                    node = stack.pop()
+                    for neighbours in (self.successor_ids(node), self.predecessor_ids(node)):
+                        for neighbour in neighbours:
+                            if component_ids[neighbour] == -1:
+                                component_ids[neighbour] = number_of_components
+                                stack.append(neighbour)
+                number_of_components += 1
+            components = [[] for _ in range(number_of_components)]
+            component_of = {}
+            for label, component in zip(self.labels, component_ids):
+                components[component].append(label)
+                component_of[label] = component
+            self.weak_components = (components, component_of)
+        return self.weak_components
+
+    def get_adjacency_list_of_subgraph(self, nodes: Iterable[str]) -> Dict[str, List[str]]:
+        """ Builds from a set of nodes, a new adjacency list that will be associated to the subgraph which vertices are `nodes`.
+
+        Parameters
+        ----------
+        nodes : Iterable[str]
+            nodes constituting the subgraph, as a list or a set.
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            the adjacency list
+        """
+        index = self.index
+        labels = self.labels
+        node_ids = set(index[node] for node in nodes)
+        return {node: [labels[target] for target in self.successor_ids(index[node]) if target in node_ids] for node in nodes}
@@ -0,0 +1,888 @@
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from python.compact_graph import CompactGraph
+from python.edge_stream import stream_edges, stream_random_subgraph
+from python.graph import Graph
+from python.independent_cascade import IndependentCascadeModel
+from python.linear_threshold import LinearThresholdModel
+from python.mapped_graph import MappedGraph, convert_edge_list
+from python.parallel_cascade import component_parallel_cascade
+from python.results_store import write_csv_rows
+from python.shared_graph import SharedGraph, attach_shared_graph, detach_shared_graph
+from python.temporal_graph import TemporalGraph
+
+# A pair runs the reference and the optimised implementation on a case: it returns the two functions to time,
+# and the function comparing their results, or None if the pair does not apply to the case.
+Pair = Tuple[Callable[[], Any], Callable[[], Any], Callable[[Any, Any], Optional[str]]]
+
+
+def random_edge_lines(rng: random.Random, nodes: int, edges: int, duplicate_rate: float = 0.1, self_loop_rate: float = 0.05) -> List[str]:
+    """ Generates the lines of a random edge list, with duplicate edges and self loops.
+
+    Parameters
+    ----------
+    rng : random.Random
+        random number generator used.
+
+    nodes : int
+        number of node labels drawn from.
+
+    edges : int
+        number of lines.
+
+    duplicate_rate : float, optional
+        probability that a line repeats an earlier one. Defaults to 0.1.
+
+    self_loop_rate : float, optional
+        probability that a line is a self loop. Defaults to 0.05.
+
+    Returns
+    -------
+    List[str]
+        lines "a b" of the edge list.
+    """
+    lines = []
+    for _ in range(edges):
+        draw = rng.random()
+        if lines and draw < duplicate_rate:
+            lines.append(rng.choice(lines))
+        elif draw < duplicate_rate + self_loop_rate:
+            node = rng.randrange(nodes)
+            lines.append("%d %d" % (node, node))
+        else:
+            lines.append("%d %d" % (rng.randrange(nodes), rng.randrange(nodes)))
+    return lines
+
+
+def adversarial_edge_lines() -> Dict[str, List[str]]:
+    """ Builds edge lists exercising the corner cases of the IM algorithm and of the spreading models:
+    ties in every centrality, complete neighbourhoods, hubs, heavy duplication and self loops.
+
+    Returns
+    -------
+    Dict[str, List[str]]
+        lines of each edge list, by name.
+    """
+    return {
+        "cycle": ["%d %d" % (i, (i + 1) % 12) for i in range(12)],
+        "clique": ["%d %d" % (i, j) for i in range(7) for j in range(7)],
+        "out_star": ["0 %d" % i for i in range(1, 20)] + ["%d %d" % (i, i + 1) for i in range(1, 19, 3)],
+        "in_star": ["%d 0" % i for i in range(1, 20)] + ["0 1"],
+        "duplicates": ["%d %d" % (i % 5, (i * 3) % 7) for i in range(60)],
+        "self_loops": ["%d %d" % (i % 6, i % 6) for i in range(30)] + ["0 1", "1 2", "2 0", "3 4"],
+        "two_components": ["0 1", "1 2", "2 0", "2 3", "10 11", "11 12", "12 10", "12 13", "13 10"],
+    }
+
+
+def write_txt_graph(path: str, lines: List[str]) -> None:
+    """ Writes an edge list in the txt format of `Graph`.
+
+    Parameters
+    ----------
+    path : str
+        path of the txt file.
+
+    lines : List[str]
+        lines "a b" of the edge list.
+    """
+    with open(path, "w") as output_file:
+        output_file.write("".join(line + "\n" for line in lines))
+
+
+def write_tgf_graph(path: str, lines: List[str]) -> None:
+    """ Writes an edge list in the tgf format, declaring the nodes in order of first appearance in the edges, like `Graph`.
+
+    Parameters
+    ----------
+    path : str
+        path of the tgf file.
+
+    lines : List[str]
+        lines "a b" of the edge list.
+    """
+    nodes = {}
+    for line in lines:
+        from_node, to_node = line.split(" ")
+        if from_node != to_node:
+            nodes.setdefault(from_node, None)
+            nodes.setdefault(to_node, None)
+    with open(path, "w") as output_file:
+        output_file.write("".join("%s node%s\n" % (node, node) for node in nodes) + "#\n" + "".join(line + "\n" for line in lines))
+
+
+def adjacency_list_with_isolated_nodes(rng: random.Random, nodes: int, edges: int, isolated: int) -> Dict[str, List[str]]:
+    """ Builds a random adjacency list which has isolated nodes and a node whose only edge is a self loop,
+    which can only be given to `Graph` as an adjacency list.
+
+    Parameters
+    ----------
+    rng : random.Random
+        random number generator used.
+
+    nodes : int
+        number of nodes with edges drawn from.
+
+    edges : int
+        number of edges.
+
+    isolated : int
+        number of isolated nodes, interleaved with the other nodes.
+
+    Returns
+    -------
+    Dict[str, List[str]]
+        the adjacency list.
+    """
+    al = {}
+    for line in random_edge_lines(rng, nodes, edges):
+        from_node, to_node = line.split(" ")
+        if from_node != to_node:
+            al.setdefault(from_node, []).append(to_node)
+            al.setdefault(to_node, [])
+            if rng.random() < isolated / float(edges):
+                al.setdefault("isolated%d" % len(al), [])
+    for i in range(isolated):
+        al.setdefault("isolated_end%d" % i, [])
+    al["self_loop"] = ["self_loop"]
+    return al
+
+
+def generate_cases(directory: str, count: int, rng: random.Random, max_nodes: int = 60) -> List[Dict[str, Any]]:
+    """ Generates the inputs of the harness: the adversarial edge lists, then `count` random ones,
+    each as a txt file, a tgf file and, for every fourth one, an adjacency list with isolated nodes, and a graph without edges.
+
+    Parameters
+    ----------
+    directory : str
+        directory where the files are written.
+
+    count : int
+        number of random edge lists.
+
+    rng : random.Random
+        random number generator used.
+
+    max_nodes : int, optional
+        maximum number of node labels of the random edge lists. Defaults to 60.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        cases, each with a name and either a path or an adjacency list `al`.
+    """
+    edge_lists = adversarial_edge_lines()
+    for i in range(count):
+        nodes = rng.randint(2, max_nodes)
+        edge_lists["random%d" % i] = random_edge_lines(rng, nodes, rng.randint(1, 4 * nodes))
+    cases = []
+    for i, (name, lines) in enumerate(edge_lists.items()):
+        # Edge lists made only of self loops give an empty graph, on which the IM algorithm is undefined.
+        if all(line.split(" ")[0] == line.split(" ")[1] for line in lines):
+            continue
+        txt_path = os.path.join(directory, name + ".txt")
+        tgf_path = os.path.join(directory, name + ".tgf")
+        write_txt_graph(txt_path, lines)
+        write_tgf_graph(tgf_path, lines)
+        cases.append({"name": name + ".txt", "path": txt_path})
+        cases.append({"name": name + ".tgf", "path": tgf_path})
+        if i % 4 == 0:
+            nodes = rng.randint(2, max_nodes)
+            cases.append({"name": name + ".isolated", "al": adjacency_list_with_isolated_nodes(rng, nodes, 2 * nodes, 3)})
+    # A graph without edges, whose arrays of edges are empty.
+    cases.append({"name": "edgeless", "al": {"a": [], "b": [], "c": []}})
+    return cases
+
+
+def load_case(case: Dict[str, Any], deduplicate: bool = False) -> Graph:
+    """ Builds a new `Graph` of a case.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    deduplicate : bool, optional
+        whether parallel edges are merged. Defaults to False.
+
+    Returns
+    -------
+    Graph
+        the graph.
+    """
+    if "path" in case:
+        return Graph(case["path"], deduplicate=deduplicate)
+    return Graph("", {node: list(successors) for node, successors in case["al"].items()}, deduplicate)
+
+
+def influential_nodes(g: Graph, degree: str, pruned: bool = False) -> List[str]:
+    """ Computes the influential nodes of `g` with a fresh biggest degree value.
+
+    Parameters
+    ----------
+    g : Graph
+        the graph.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    pruned : bool, optional
+        whether `get_influential_nodes_pruned` is used. Defaults to False.
+
+    Returns
+    -------
+    List[str]
+        the influential nodes.
+    """
+    g.most_connected_node_degree_value = None
+    degree_method = g.in_degree if degree == "i" else g.out_degree
+    return g.get_influential_nodes_pruned(degree_method) if pruned else g.get_influential_nodes(degree_method)
+
+
+def same(reference: Any, candidate: Any) -> Optional[str]:
+    """ Compares two results for equality.
+
+    Parameters
+    ----------
+    reference : Any
+        result of the reference implementation.
+
+    candidate : Any
+        result of the optimised implementation.
+
+    Returns
+    -------
+    Optional[str]
+        None if they are equal, otherwise a description of the difference.
+    """
+    if reference == candidate:
+        return None
+    return "expected %r, got %r" % (reference, candidate)
+
+
+def same_rounds(reference: Tuple[Any, int], candidate: Tuple[Any, int]) -> Optional[str]:
+    """ Compares two cascades round by round, ignoring the order of the nodes within a round,
+    which follows the order in which they are reached, for instance component by component in a per-component cascade.
+
+    Parameters
+    ----------
+    reference : Tuple[Any, int]
+        rounds of the reference cascade and number of influenced nodes.
+
+    candidate : Tuple[Any, int]
+        rounds of the optimised cascade and number of influenced nodes.
+
+    Returns
+    -------
+    Optional[str]
+        None if the cascades match, otherwise a description of the difference.
+    """
+    return same(([sorted(layer) for layer in reference[0]], reference[1]), ([sorted(layer) for layer in candidate[0]], candidate[1]))
+
+
+def same_checkpoints(reference: List[Any], candidate: List[Any]) -> Optional[str]:
+    """ Compares the states of two graphs along a stream, and describes the first one which differs.
+
+    Parameters
+    ----------
+    reference : List[Any]
+        states of the reference graph, one per checkpoint.
+
+    candidate : List[Any]
+        states of the optimised graph, one per checkpoint.
+
+    Returns
+    -------
+    Optional[str]
+        None if all the states are equal, otherwise a description of the first difference.
+    """
+    if len(reference) != len(candidate):
+        return "expected %d checkpoints, got %d" % (len(reference), len(candidate))
+    for i, (expected, got) in enumerate(zip(reference, candidate)):
+        if expected != got:
+            return "at checkpoint %d, %s" % (i, same(expected, got))
+    return None
+
+
+def seed_nodes(g: Graph, rng_seed: int) -> List[str]:
+    """ Draws the seeds of the cascades of a case.
+
+    Parameters
+    ----------
+    g : Graph
+        the graph.
+
+    rng_seed : int
+        seed of the random number generator.
+
+    Returns
+    -------
+    List[str]
+        up to 3 seed nodes.
+    """
+    return random.Random(rng_seed).sample(list(g.adjacency_list), min(3, len(g.adjacency_list)))
+
+
+def compact_graph_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `Graph` against `CompactGraph`: influential nodes.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    g = load_case(case)
+    compact = CompactGraph.from_graph(load_case(case))
+    return lambda: influential_nodes(g, degree), lambda: influential_nodes(compact, degree), same
+
+
+def compact_graph_state(g: CompactGraph, degree: str) -> Tuple[Any, ...]:
+    """ Reads the labels, the arrays and the influential nodes of a compact graph.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        the graph.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    Returns
+    -------
+    Tuple[Any, ...]
+        labels, offsets, targets, reverse offsets and sources, and influential nodes.
+    """
+    return (list(g.labels), list(g.offsets), list(g.targets), list(g.in_offsets), list(g.in_sources),
+            influential_nodes(g, degree))
+
+
+def shared_graph_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `CompactGraph` against the graph attached from its `SharedGraph` export: labels, arrays and influential nodes.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    compact = CompactGraph.from_graph(load_case(case))
+
+    def candidate():
+        with SharedGraph(compact) as shared:
+            attached = attach_shared_graph(shared.descriptor)
+            try:
+                return compact_graph_state(attached, degree)
+            finally:
+                detach_shared_graph(attached)
+    return lambda: compact_graph_state(compact, degree), candidate, same
+
+
+def pruned_edc_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `get_influential_nodes` against `get_influential_nodes_pruned`: influential nodes and DC values.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    g = load_case(case)
+    pruned = load_case(case)
+    return (lambda: (influential_nodes(g, degree), g.degree_centralities),
+            lambda: (influential_nodes(pruned, degree, True), pruned.degree_centralities), same)
+
+
+def mapped_graph_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `Graph` against `MappedGraph` built by external sort: influential nodes. Txt files only.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    if not case.get("path", "").endswith(".txt"):
+        return None
+    g = load_case(case)
+    mapped_directory = os.path.join(directory, os.path.basename(case["path"]) + ".mapped")
+    if not os.path.isdir(mapped_directory):
+        convert_edge_list(case["path"], mapped_directory)
+
+    def candidate():
+        with MappedGraph(mapped_directory) as mapped:
+            return influential_nodes(mapped, degree)
+    return lambda: influential_nodes(g, degree), candidate, same
+
+
+def temporal_graph_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `Graph` against a `TemporalGraph` holding all the edges of the file: influential nodes. Txt files only.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    if not case.get("path", "").endswith(".txt"):
+        return None
+    g = load_case(case)
+    temporal = TemporalGraph(math.inf)
+    temporal.add_edges((from_node, to_node, timestamp) for timestamp, (from_node, to_node) in enumerate(stream_edges(case["path"])))
+    temporal_degree_method = temporal.in_degree if degree == "i" else temporal.out_degree
+    return lambda: influential_nodes(g, degree), lambda: temporal.get_influential_nodes(temporal_degree_method), same
+
+
+def live_edge_graph(edges: List[Tuple[str, str]]) -> Graph:
+    """ Builds a new `Graph` from a list of edges, its nodes in order of first appearance in the edges, like a file read by `Graph`.
+
+    Parameters
+    ----------
+    edges : List[Tuple[str, str]]
+        the edges (`a`, `b`), without self loops.
+
+    Returns
+    -------
+    Graph
+        the graph.
+    """
+    al = {}
+    for from_node, to_node in edges:
+        al.setdefault(from_node, []).append(to_node)
+        al.setdefault(to_node, [])
+    return Graph("", al)
+
+
+def windowed_temporal_graph_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `Graph` rebuilt from the live edges against a `TemporalGraph` with a finite window, after every edge of the file,
+    or about 200 of them for large files: nodes, adjacency list and, while at most 1000 edges are live, influential nodes.
+    Txt files only.
+    The edges get random non-decreasing timestamps, several edges sharing some of them, and are replayed with a short window,
+    which keeps a few edges, and a long one, which keeps about a quarter of them, so that edges expire throughout the stream.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    if not case.get("path", "").endswith(".txt"):
+        return None
+    rng = random.Random(rng_seed)
+    timed_edges = []
+    timestamp = 0
+    for from_node, to_node in stream_edges(case["path"]):
+        timestamp += rng.choice((0, 1, 1, 2))
+        timed_edges.append((from_node, to_node, timestamp))
+    windows = (3, 3 + len(timed_edges) // 4)
+    # Every edge of the small cases is a checkpoint, and about 200 evenly spaced edges of the large ones.
+    step = max(1, len(timed_edges) // 200)
+    checkpoints_at = set(range(len(timed_edges) - 1, -1, -step))
+    # The influential nodes of the reference are recomputed from scratch, so they are only compared on small live graphs.
+    max_influential_edges = 1000
+
+    def reference():
+        checkpoints = []
+        for window in windows:
+            for i, (_, _, now) in enumerate(timed_edges):
+                if i not in checkpoints_at:
+                    continue
+                live_edges = [(a, b) for a, b, t in timed_edges[:i + 1] if now - window < t]
+                g = live_edge_graph(live_edges)
+                checkpoints.append((g.nodes, g.adjacency_list,
+                                    influential_nodes(g, degree) if len(live_edges) <= max_influential_edges else None))
+        return checkpoints
+
+    def candidate():
+        checkpoints = []
+        for window in windows:
+            temporal = TemporalGraph(window)
+            temporal_degree_method = temporal.in_degree if degree == "i" else temporal.out_degree
+            for i, (from_node, to_node, timestamp) in enumerate(timed_edges):
+                temporal.add_edge(from_node, to_node, timestamp)
+                if i not in checkpoints_at:
+                    continue
+                checkpoints.append((temporal.nodes, temporal.snapshot().adjacency_list,
+                                    temporal.get_influential_nodes(temporal_degree_method)
+                                    if len(temporal.timed_edges) <= max_influential_edges else None))
+        return checkpoints
+
+    return reference, candidate, same_checkpoints
+
+
+def compact_ic_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ IC on `Graph` against IC on `CompactGraph`, with the same random number generator seed: rounds and spread.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    g = load_case(case)
+    compact = CompactGraph.from_graph(load_case(case))
+    seeds = seed_nodes(g, rng_seed)
+
+    def cascade(graph):
+        model = IndependentCascadeModel(graph, list(seeds), 0.2, random.Random(rng_seed))
+        return model.get_influenced_nodes(), model.get_total_number_of_influenced_nodes()
+    return lambda: cascade(g), lambda: cascade(compact), same
+
+
+def deduplicated_ic_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ IC on a multigraph `Graph` against IC on a deduplicated one, with the same random number generator seed: rounds and spread.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    g = load_case(case)
+    deduplicated = load_case(case, True)
+    seeds = seed_nodes(g, rng_seed)
+
+    def cascade(graph):
+        model = IndependentCascadeModel(graph, list(seeds), 0.2, random.Random(rng_seed))
+        return model.get_influenced_nodes(), model.get_total_number_of_influenced_nodes()
+    return lambda: cascade(g), lambda: cascade(deduplicated), same
+
+
+def compact_lt_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ LT on `Graph` against LT on `CompactGraph`: rounds and spread.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    g = load_case(case)
+    compact = CompactGraph.from_graph(load_case(case))
+    seeds = seed_nodes(g, rng_seed)
+
+    def cascade(graph):
+        model = LinearThresholdModel(graph, list(seeds))
+        return model.get_influenced_nodes(), model.get_total_number_of_influenced_nodes()
+    return lambda: cascade(g), lambda: cascade(compact), same_rounds
+
+
+def component_parallel_lt_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ LT on the whole graph against LT run per weakly connected component: rounds and spread.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    g = load_case(case)
+    seeds = seed_nodes(g, rng_seed)
+
+    def cascade():
+        model = LinearThresholdModel(g, list(seeds))
+        return model.get_influenced_nodes(), model.get_total_number_of_influenced_nodes()
+    return cascade, lambda: component_parallel_cascade(g, list(seeds), LinearThresholdModel, processes=1), same_rounds
+
+
+def streamed_subgraph_pair(case: Dict[str, Any], degree: str, rng_seed: int, directory: str) -> Optional[Pair]:
+    """ `Graph.build_subgraph` against `stream_random_subgraph`: adjacency list and biggest degree value. Txt files only.
+
+    Parameters
+    ----------
+    case : Dict[str, Any]
+        the case.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    rng_seed : int
+        seed of the random number generators.
+
+    directory : str
+        directory for the files derived from the case.
+
+    Returns
+    -------
+    Optional[Pair]
+        the reference and optimised functions and the comparison of their results, or None if the pair does not apply.
+    """
+    if not case.get("path", "").endswith(".txt"):
+        return None
+    g = load_case(case)
+    size = max(1, len(g.nodes) // 2)
+
+    def extract(build):
+        sub = build()
+        return sub.adjacency_list, sub.most_connected_node_degree_value
+    return (lambda: extract(lambda: g.build_subgraph(size, degree, random.Random(rng_seed))),
+            lambda: extract(lambda: stream_random_subgraph(case["path"], size, degree, random.Random(rng_seed))), same)
+
+
+PAIRS = {
+    "compact_graph": compact_graph_pair,
+    "shared_graph": shared_graph_pair,
+    "pruned_edc": pruned_edc_pair,
+    "mapped_graph": mapped_graph_pair,
+    "temporal_graph": temporal_graph_pair,
+    "windowed_temporal_graph": windowed_temporal_graph_pair,
+    "compact_ic": compact_ic_pair,
+    "deduplicated_ic": deduplicated_ic_pair,
+    "compact_lt": compact_lt_pair,
+    "component_parallel_lt": component_parallel_lt_pair,
+    "streamed_subgraph": streamed_subgraph_pair,
+}
+
+
+def timed(function: Callable[[], Any]) -> Tuple[Any, float]:
+    """ Runs a function and measures its running time.
+
+    Parameters
+    ----------
+    function : Callable[[], Any]
+        the function.
+
+    Returns
+    -------
+    Tuple[Any, float]
+        its result and its running time in seconds.
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run_differential(cases: List[Dict[str, Any]], directory: str, pairs: List[str] = None, degrees: str = "io",
+                     rng_seed: int = 0) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """ Runs every pair on every case and degree metric, compares the results of the reference and of the optimised
+    implementation, and sums their running times.
+
+    Parameters
+    ----------
+    cases : List[Dict[str, Any]]
+        cases, see `generate_cases`.
+
+    directory : str
+        directory for the files derived from the cases.
+
+    pairs : List[str], optional
+        names of the pairs run. Defaults to all of `PAIRS`.
+
+    degrees : str, optional
+        degree metrics used: "i" and/or "o". Defaults to both.
+
+    rng_seed : int, optional
+        seed of the random number generators. Defaults to 0.
+
+    Returns
+    -------
+    Tuple[List[Dict[str, Any]], List[str]]
+        a summary per pair: runs, mismatches, reference and optimised running times and speedup,
+        and a description of each mismatch.
+    """
+    summary = []
+    mismatches = []
+    for pair_name in pairs or list(PAIRS):
+        runs = failures = 0
+        reference_time = candidate_time = 0.0
+        for case in cases:
+            for degree in degrees:
+                pair = PAIRS[pair_name](case, degree, rng_seed, directory)
+                if pair is None:
+                    continue
+                reference, candidate, compare = pair
+                reference_result, elapsed = timed(reference)
+                reference_time += elapsed
+                candidate_result, elapsed = timed(candidate)
+                candidate_time += elapsed
+                difference = compare(reference_result, candidate_result)
+                runs += 1
+                if difference is not None:
+                    failures += 1
+                    mismatches.append("%s on %s (degree %s): %s" % (pair_name, case["name"], degree, difference))
+        summary.append({"pair": pair_name, "runs": runs, "mismatches": failures, "reference_s": reference_time,
+                        "optimised_s": candidate_time, "speedup": reference_time / candidate_time if candidate_time else math.nan})
+    return summary, mismatches
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command-line entry point.
+
+    `python -m python.differential --cases 50 python/wiki-Vote.txt` checks every optimised implementation against the
+    reference on the adversarial graphs, 50 random graphs and wiki-Vote, prints the speedup of each pair,
+    and exits with status 1 if any result differs.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        exit status.
+    """
+    parser = argparse.ArgumentParser(description="Checks the optimised implementations against the reference ones.")
+    parser.add_argument("inputs", nargs="*", help="txt/tgf graph files checked in addition to the generated graphs")
+    parser.add_argument("--cases", type=int, default=20, help="number of random graphs")
+    parser.add_argument("--max-nodes", type=int, default=60, help="maximum number of nodes of the random graphs")
+    parser.add_argument("--pairs", nargs="+", choices=list(PAIRS), help="pairs run (all by default)")
+    parser.add_argument("--degrees", default="io", help="degree metrics used: i and/or o")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="csv file receiving the summary")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = generate_cases(directory, args.cases, random.Random(args.seed), args.max_nodes)
+        cases.extend({"name": os.path.basename(path), "path": path} for path in args.inputs)
+        summary, mismatches = run_differential(cases, directory, args.pairs, args.degrees, args.seed)
+
+    print("%-24s %6s %10s %12s %12s %8s" % ("pair", "runs", "mismatches", "reference_s", "optimised_s", "speedup"))
+    for row in summary:
+        print("%-24s %6d %10d %12.3f %12.3f %7.2fx" % (row["pair"], row["runs"], row["mismatches"], row["reference_s"],
+                                                      row["optimised_s"], row["speedup"]))
+    for mismatch in mismatches:
+        print("MISMATCH", mismatch)
+    if args.output is not None:
+        columns = ["pair", "runs", "mismatches", "reference_s", "optimised_s", "speedup"]
+        write_csv_rows(args.output, [columns] + [[row[column] for column in columns] for row in summary])
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import random
+from typing import Iterator, List, Tuple
+from python.graph import Graph
+from python.readers import open_text
+
+
+def stream_edges(path: str) -> Iterator[Tuple[str, str]]:
+    """ Reads the edges of a txt file one line at a time, without keeping them in memory.
+    Self loops are skipped, like in `Graph.build_adjacency_list`. Unlike it, blank lines, lines with fewer than two fields
+    and lines starting with # are skipped too, so that the comment headers of SNAP dumps are not read as edges:
+    the graph streamed is the one `Graph` builds from the file once those lines are removed.
+
+    Parameters
+    ----------
+    path : str
+        path of the txt file, possibly compressed (.gz, .bz2 or .xz).
+
+    Returns
+    -------
+    Iterator[Tuple[str, str]]
+        iterator over the tuples (`a`, `b`) denoting an edge between `a` and `b`.
+    """
+    with open_text(path) as input_file:
+        for line in input_file:
+            end_nodes = line.split()
+            if len(end_nodes) < 2 or end_nodes[0].startswith("#"):
+                continue
+            if end_nodes[0] == end_nodes[1]:
+                continue
+            yield end_nodes[0], end_nodes[1]
+
+
+class EdgeFileSampler:
+    """Extracts random induced subgraphs from a txt file too big to be loaded as a `Graph`.
+    The vertices are read once when the sampler is created; every subgraph then costs one more pass over the edges.
+    A sampler can be given to the tests of the evaluation module in place of the dataset graph.
+
+    Parameters
+    ----------
+    path : str
+        path of the txt file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.nodes = self.read_vertices()
+
+    def read_vertices(self) -> List[str]:
+        """ First pass: collects the vertices of the file.
+        They are listed in the order in which `Graph` would store them, so that a given random state selects the same nodes as `Graph.select_random_nodes`
+        on a file without the lines skipped by `stream_edges`.
+
+        Returns
+        -------
+        List[str]
+            list of vertices.
+        """
+        vertices = {}
+        for from_node, to_node in stream_edges(self.path):
+            vertices[from_node] = None
+            vertices[to_node] = None
+        return list(vertices)
+
+    def get_vertices(self) -> List[str]:
+        """Returns the vertices of the file.
+
+        Returns
+        -------
+        List[str]
+            list of vertices.
+        """
+        return self.nodes
+
+    def select_random_nodes(self, k: int, rng: random.Random = None) -> List[str]:
+        """ Returns a list of randomly selected nodes among the vertices of the file.
+
+        Parameters
+        ----------
+        k : int
+            number of nodes to be selected.
+
+        rng : random.Random, optional
+            random number generator used. Defaults to the `random` module.
+
+        Returns
+        -------
+        List[str]
+            list of randomly selected nodes.
+        """
+        return (random if rng is None else rng).sample(self.nodes, k=k)
+
+    def get_adjacency_list_of_subgraph(self, nodes: List[str]) -> dict:
+        """ Second pass: streams the edges of the file, keeping only those between two nodes of `nodes`.
+
+        Parameters
+        ----------
+        nodes : List[str]
+            nodes constituting the subgraph.
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            the adjacency list of the subgraph.
+        """
+        new_al = {node: [] for node in nodes}
+        for from_node, to_node in stream_edges(self.path):
+            if from_node in new_al and to_node in new_al:
+                new_al[from_node].append(to_node)
+        return new_al
+
+    def build_subgraph(self, number_of_nodes: int, degree_method_string: str, rng: random.Random = None) -> Graph:
+        """ Extracts a subgraph which nodes are `number_of_nodes` randomly selected vertices of the file.
+
+        Parameters
+        ----------
+        number_of_nodes : int
+            number of nodes in the subgraph.
+
+        degree_method_string : str
+            string encoding the degree metric used: in-degree or out-degree.
+
+        rng : random.Random, optional
+            random number generator used to select the nodes. Defaults to the `random` module.
+
+        Returns
+        -------
+        Graph
+            the subgraph.
+        """
+        new_al = self.get_adjacency_list_of_subgraph(self.select_random_nodes(number_of_nodes, rng))
+        return Graph.from_subgraph_adjacency_list(new_al, degree_method_string)
+
+
+def stream_random_subgraph(path: str, number_of_nodes: int, degree_method_string: str = "o", rng: random.Random = None) -> Graph:
+    """ Extracts a random induced subgraph from a txt file in two passes, without loading the whole graph.
+
+    Parameters
+    ----------
+    path : str
+        path of the txt file.
+
+    number_of_nodes : int
+        number of nodes in the subgraph.
+
+    degree_method_string : str, optional
+        string encoding the degree metric used: in-degree or out-degree. Defaults to out-degree.
+
+    rng : random.Random, optional
+        random number generator used to select the nodes. Defaults to the `random` module.
+
+    Returns
+    -------
+    Graph
+        the subgraph.
+    """
+    return EdgeFileSampler(path).build_subgraph(number_of_nodes, degree_method_string, rng)
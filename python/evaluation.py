@@ -1,12 +1,149 @@
-import csv
 from python.linear_threshold import LinearThresholdModel
 from python.independent_cascade import IndependentCascadeModel
 from python.graph import Graph
+from python.spread_cache import SpreadCache, estimate_spread
+from python.results_store import read_csv_rows, write_csv_rows, set_cells
+from python.checkpoint import Checkpoint
+import python.profiling as profiling
+import random
 import time
-from typing import List,Any
+from typing import List,Any,Callable
 
 
-def run_time_spreading_nodes_test(dataset_graph: Graph, k: int, n: int) -> float:
+def time_influential_nodes_computation(dataset_graph: Graph, k: int, rng: random.Random = None) -> float:
+    """ Measures the time taken by the IM algorithm to compute the influential nodes of one random subgraph.
+
+    Parameters
+    ----------
+    dataset_graph :  Graph
+        graph on which the test is carried out.
+
+    k :  int
+        size of subgraph.
+
+    rng : random.Random, optional
+        random number generator used to extract the subgraph. Defaults to the `random` module.
+
+    Returns
+    -------
+    float
+        running time.
+    """
+    # Extracts a subgraph using out-degree.
+    with profiling.phase("subgraph", k):
+        sub = dataset_graph.build_subgraph(k, "o", rng)
+    with profiling.phase("influential_nodes", k):
+        start = time.time()
+        sub.get_influential_nodes(sub.out_degree)
+        return time.time() - start
+
+
+def count_influential_nodes(dataset_graph: Graph, k: int, rng: random.Random = None) -> int:
+    """ Computes the number of influential nodes returned by the IM algorithm on one random subgraph.
+
+    Parameters
+    ----------
+    dataset_graph :  Graph
+        graph on which the test is carried out.
+
+    k :  int
+        size of subgraph.
+
+    rng : random.Random, optional
+        random number generator used to extract the subgraph. Defaults to the `random` module.
+
+    Returns
+    -------
+    int
+        number of influential nodes.
+    """
+    # Extracts a subgraph using in-degree.
+    with profiling.phase("subgraph", k):
+        sub = dataset_graph.build_subgraph(k, "i", rng)
+    with profiling.phase("influential_nodes", k):
+        return len(sub.get_influential_nodes(sub.in_degree))
+
+
+def compute_spreadings_of_influential_and_random_nodes(dataset_graph: Graph, k: int, rng: random.Random = None) -> List[float]:
+    """ Computes the number of nodes influenced by the influential nodes and by as many random nodes on one random subgraph.
+
+    Parameters
+    ----------
+    dataset_graph :  Graph
+        graph on which the test is carried out.
+
+    k :  int
+        size of subgraph.
+
+    rng : random.Random, optional
+        random number generator used to extract the subgraph and the random nodes. Defaults to the `random` module.
+
+    Returns
+    -------
+    List[float]
+        spreading influence values of the influential nodes and of the random nodes.
+    """
+    with profiling.phase("subgraph", k):
+        sub = dataset_graph.build_subgraph(k, "o", rng)
+    with profiling.phase("influential_nodes", k):
+        influential_nodes = sub.get_influential_nodes(sub.out_degree)
+    other_nodes = sub.select_random_nodes(len(influential_nodes), rng)
+    with profiling.phase("spreading", k):
+        # Both seed sets are evaluated on the same draws, which LT computes once for the two of them.
+        return compute_spreading_influence_values_of_seed_sets(sub, [influential_nodes, other_nodes], LinearThresholdModel, rng=rng)
+
+
+def run_iterations(iteration: Callable[[Graph, int, Any], Any], dataset_graph: Graph, k: int, n: int,
+                   rng: random.Random = None, checkpoint: Checkpoint = None) -> List[Any]:
+    """ Runs `n` iterations of a test, each on a random subgraph of size `k`.
+
+    Parameters
+    ----------
+    iteration : Callable[[Graph, int, Any], Any]
+        function computing the result of one iteration from the graph, the size of subgraph and the random number generator.
+
+    dataset_graph :  Graph
+        graph on which the test is carried out.
+
+    k :  int
+        size of subgraph.
+
+    n :  int
+        number of iterations of the test.
+
+    rng : random.Random, optional
+        random number generator used to extract the subgraphs. Defaults to the `random` module.
+
+    checkpoint : Checkpoint, optional
+        checkpoint the progress is saved to. If it holds completed iterations, the test resumes after them.
+
+    Returns
+    -------
+    List[Any]
+        results of the iterations.
+    """
+    if rng is None:
+        rng = random
+    if checkpoint is None:
+        results = []
+        first_iteration = 0
+    else:
+        first_iteration = checkpoint.resume(rng)
+        results = checkpoint.results
+    for i in range(first_iteration, n):
+        print("Iteration", i)
+        result = iteration(dataset_graph, k, rng)
+        print(result)
+        if checkpoint is None:
+            results.append(result)
+        else:
+            checkpoint.record(result, rng)
+    if checkpoint is not None:
+        checkpoint.save()
+    return results[:n]
+
+
+def run_time_spreading_nodes_test(dataset_graph: Graph, k: int, n: int, rng: random.Random = None, checkpoint: Checkpoint = None) -> float:
     """ Computes the average time taken by the IM algorithm to compute the influential nodes.
 
     Parameters
@@ -20,25 +157,22 @@ def run_time_spreading_nodes_test(dataset_graph: Graph, k: int, n: int) -> float
     n :  int
         number of iterations of the test.
 
+    rng : random.Random, optional
+        random number generator used to extract the subgraphs. Defaults to the `random` module.
+
+    checkpoint : Checkpoint, optional
+        checkpoint the progress is saved to and resumed from.
+
     Returns
     -------
     float
         average running time.
     """
-    total_elapsed = 0
-    for i in range(n):
-        print("Iteration", i)
-        # Extracts a subgraph using out-degree.
-        sub = dataset_graph.build_subgraph(k, "o")
-        start = time.time()
-        influential_nodes = sub.get_influential_nodes(sub.out_degree)
-        elapsed = time.time() - start
-        print(elapsed)
-        total_elapsed += elapsed
+    total_elapsed = sum(run_iterations(time_influential_nodes_computation, dataset_graph, k, n, rng, checkpoint))
     return total_elapsed / float(n)
 
 
-def run_influential_nodes_test(dataset_graph: Graph, k: int, n: int) -> float:
+def run_influential_nodes_test(dataset_graph: Graph, k: int, n: int, rng: random.Random = None, checkpoint: Checkpoint = None) -> float:
     """ Computes the average number of influential nodes returned by the IM algorithm.
 
     Parameters
@@ -52,23 +186,22 @@ def run_influential_nodes_test(dataset_graph: Graph, k: int, n: int) -> float:
     n :  int
         number of iterations of the test.
 
+    rng : random.Random, optional
+        random number generator used to extract the subgraphs. Defaults to the `random` module.
+
+    checkpoint : Checkpoint, optional
+        checkpoint the progress is saved to and resumed from.
+
     Returns
     -------
     float
         average running time.
     """
-    cumulated_number_of_influential_nodes = 0
-    for i in range(n):
-        print("Iteration", i)
-        # Extracts a subgraph using in-degree.
-        sub = dataset_graph.build_subgraph(k, "i")
-        influential_nodes = sub.get_influential_nodes(sub.in_degree)
-        cumulated_number_of_influential_nodes += len(influential_nodes)
-        print(len(influential_nodes))
+    cumulated_number_of_influential_nodes = sum(run_iterations(count_influential_nodes, dataset_graph, k, n, rng, checkpoint))
     return cumulated_number_of_influential_nodes / float(n)
 
 
-def run_spreading_nodes_test(dataset_graph: Graph, k: int, n: int, methods_compared: int) -> List[float]:
+def run_spreading_nodes_test(dataset_graph: Graph, k: int, n: int, methods_compared: int, rng: random.Random = None, checkpoint: Checkpoint = None) -> List[float]:
     """ Computes the average number of influenced nodes using two methods (influential vs random for example) after diffusion by a given spreading model.
 
     Parameters
@@ -85,6 +218,12 @@ def run_spreading_nodes_test(dataset_graph: Graph, k: int, n: int, methods_compa
     methods_compared :  int
         number of methods that are compared.
 
+    rng : random.Random, optional
+        random number generator used to extract the subgraphs and the random nodes. Defaults to the `random` module.
+
+    checkpoint : Checkpoint, optional
+        checkpoint the progress is saved to and resumed from.
+
     Returns
     -------
     List[float]
@@ -95,11 +234,7 @@ def run_spreading_nodes_test(dataset_graph: Graph, k: int, n: int, methods_compa
     # Hence, there will be as many sublists as compared methods.
     for j in range(methods_compared):
         average_spreadings.append([])
-    for i in range(n):
-        sub = dataset_graph.build_subgraph(k, "o")
-        influential_nodes = sub.get_influential_nodes(sub.out_degree)
-        other_nodes = sub.select_random_nodes(len(influential_nodes))
-        spreadings = compute_spreading_influence_values(sub, influential_nodes, other_nodes, LinearThresholdModel)
+    for spreadings in run_iterations(compute_spreadings_of_influential_and_random_nodes, dataset_graph, k, n, rng, checkpoint):
         # Appends the spreading obtained by each method in its associated sublist in average_spreadings
         for index,l in enumerate(average_spreadings):
             l.append(spreadings[index])
@@ -108,7 +243,8 @@ def run_spreading_nodes_test(dataset_graph: Graph, k: int, n: int, methods_compa
     return average_spreadings
 
 
-def compute_spreading_influence_values(dataset_graph: Graph, nodes_set_1: List[str], nodes_set_2: List[str], spreading_model: Any) -> List[float]:
+def compute_spreading_influence_values(dataset_graph: Graph, nodes_set_1: List[str], nodes_set_2: List[str], spreading_model: Any, cache: SpreadCache = None,
+                                       rng_seed: Any = None) -> List[float]:
     """ Computes the total number of influenced nodes after diffusion by a given spreading model. Two sets of nodes `nodes_set_1` and `nodes_set_2` are used as seed nodes.
 
     Parameters
@@ -125,22 +261,59 @@ def compute_spreading_influence_values(dataset_graph: Graph, nodes_set_1: List[s
     spreading_model : Any
         spreading model used: either IC or LT.
 
+    cache : SpreadCache, optional
+        cache of spread estimates. If given with `rng_seed`, seed sets already evaluated on `dataset_graph` are not simulated again.
+
+    rng_seed : Any, optional
+        seed of the random number generator of the cached estimates. Defaults to None, in which case nothing is cached.
+
     Returns
     -------
     List[float]
         list of average spreading influence values.
     """
     print("Influential nodes spreading")
-    sm1 = spreading_model(dataset_graph, nodes_set_1, 0.2)
-    sm2 = spreading_model(dataset_graph, nodes_set_2, 0.2)
-    n1 = sm1.get_total_number_of_influenced_nodes()
+    if cache is not None:
+        n1 = estimate_spread(dataset_graph, nodes_set_1, spreading_model, 0.2, rng_seed=rng_seed, cache=cache)
+        n2 = estimate_spread(dataset_graph, nodes_set_2, spreading_model, 0.2, rng_seed=rng_seed, cache=cache)
+    else:
+        n1 = spreading_model(dataset_graph, nodes_set_1, 0.2).get_total_number_of_influenced_nodes()
+        n2 = spreading_model(dataset_graph, nodes_set_2, 0.2).get_total_number_of_influenced_nodes()
     print(n1)
     print("Other seed nodes spreading")
-    n2 = sm2.get_total_number_of_influenced_nodes()
     print(n2)
     return [n1,n2]
 
 
+def compute_spreading_influence_values_of_seed_sets(dataset_graph: Graph, seed_sets: List[List[str]], spreading_model: Any, samples: int = 1, rng: Any = None) -> List[float]:
+    """ Computes the average number of influenced nodes after diffusion by a given spreading model, for each seed set of `seed_sets`.
+    Unlike `compute_spreading_influence_values`, all the seed sets are evaluated against the same random draws.
+
+    Parameters
+    ----------
+    dataset_graph :  Graph
+        graph on which the test is carried out.
+
+    seed_sets :  List[List[str]]
+        sets of seed nodes compared (influential nodes, random nodes, in-degree nodes etc).
+
+    spreading_model : Any
+        spreading model used: either IC or LT.
+
+    samples : int, optional
+        number of random draws averaged. Defaults to 1.
+
+    rng : random.Random, optional
+        random number generator. Defaults to the `random` module.
+
+    Returns
+    -------
+    List[float]
+        list of average spreading influence values, in the order of `seed_sets`.
+    """
+    return spreading_model.compare_seed_sets(dataset_graph, seed_sets, 0.2, samples, rng)
+
+
 def write_results_to_csv_file(path: str, i: int, j: int, data: Any) -> None:
     """ Writes `data` in the given csv file.
 
@@ -158,13 +331,9 @@ def write_results_to_csv_file(path: str, i: int, j: int, data: Any) -> None:
     data : Any
         data to write in the csv file.
     """
-    with open(path, 'r') as f:
-        # Extracts the rows, modifies them and overwrites the current content of the CSV file.
-        reader = csv.reader(f)
-        rows = list(reader)
-        rows[i][j] = data
-        writer = csv.writer(open(path, 'w'))
-        writer.writerows(rows)
+    # Extracts the rows, modifies them and overwrites the current content of the CSV file.
+    # Many measurements are better recorded in a ResultsLog, which rewrites each file once.
+    write_csv_rows(path, set_cells(read_csv_rows(path), {(i, j): data}))
 
 
 if __name__ == "__main__":
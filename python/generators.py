@@ -0,0 +1,377 @@
+import math
+import random
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, Sequence, Tuple
+from python.compact_graph import CompactGraph
+
+# An edge generator yields edges (source, target) between node identifiers, one at a time, so that graphs with
+# tens of millions of edges are never held as a list of tuples.
+Edges = Iterator[Tuple[int, int]]
+
+
+def erdos_renyi_edges(number_of_nodes: int, probability: float, rng: random.Random = None) -> Edges:
+    """ Generates a directed Erdős–Rényi graph G(n, p): each of the n(n-1) ordered pairs of distinct nodes is an edge
+    with probability `p`, independently. The pairs between two edges are skipped with a single geometric draw,
+    so the running time is proportional to the number of edges and not to n².
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes n.
+
+    probability : float
+        probability p of each edge.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    Edges
+        the edges, by increasing source then target.
+    """
+    rng = random if rng is None else rng
+    pairs = number_of_nodes * (number_of_nodes - 1)
+    if probability <= 0 or pairs == 0:
+        return
+    log_q = math.log(1 - probability) if probability < 1 else None
+    k = -1
+    while True:
+        # Number of pairs skipped before the next edge, geometrically distributed.
+        k += 1 if log_q is None else 1 + int(math.log(1 - rng.random()) / log_q)
+        if k >= pairs:
+            return
+        source, target = divmod(k, number_of_nodes - 1)
+        yield source, target + (target >= source)
+
+
+def barabasi_albert_edges(number_of_nodes: int, edges_per_node: int, rng: random.Random = None) -> Edges:
+    """ Generates a directed Barabási–Albert graph by preferential attachment: the nodes arrive one by one, and each
+    new node has edges to `edges_per_node` distinct earlier nodes chosen with probability proportional to their degree.
+    The first new node is linked to the `edges_per_node` initial nodes.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes.
+
+    edges_per_node : int
+        number of edges leaving each new node.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    Edges
+        the edges, by order of arrival of their source.
+    """
+    rng = random if rng is None else rng
+    if edges_per_node < 1 or number_of_nodes <= edges_per_node:
+        return
+    # Each node appears once per edge it is an end of, so a uniform draw from this array is proportional to degree.
+    ends = array('q')
+    targets = list(range(edges_per_node))
+    for source in range(edges_per_node, number_of_nodes):
+        for target in targets:
+            yield source, target
+        ends.extend(targets)
+        ends.extend([source] * edges_per_node)
+        chosen = set()
+        while len(chosen) < edges_per_node:
+            chosen.add(ends[int(rng.random() * len(ends))])
+        targets = list(chosen)
+
+
+def rmat_edges(scale: int, number_of_edges: int, probabilities: Tuple[float, float, float, float] = (0.57, 0.19, 0.19, 0.05),
+               rng: random.Random = None) -> Edges:
+    """ Generates an R-MAT graph, the stochastic Kronecker graph of a 2x2 initiator, on 2^`scale` nodes: each edge is placed
+    by descending `scale` times into one of the four quadrants of the adjacency matrix with the given probabilities.
+    The default probabilities are those of the Graph500 benchmark and give skewed degrees and community structure.
+    Self loops and duplicate edges are generated like any other edge.
+
+    Parameters
+    ----------
+    scale : int
+        base 2 logarithm of the number of nodes.
+
+    number_of_edges : int
+        number of edges.
+
+    probabilities : Tuple[float, float, float, float], optional
+        probabilities of the top left, top right, bottom left and bottom right quadrants, summing to 1.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    Edges
+        the edges.
+    """
+    rng = random if rng is None else rng
+    a, b, c, _ = probabilities
+    if abs(sum(probabilities) - 1) > 1e-9:
+        raise Exception("R-MAT probabilities must sum to 1, got " + str(sum(probabilities)))
+    ab = a + b
+    abc = a + b + c
+    for _ in range(number_of_edges):
+        source = target = 0
+        for _ in range(scale):
+            source <<= 1
+            target <<= 1
+            draw = rng.random()
+            if draw >= a:
+                if draw < ab:
+                    target |= 1
+                elif draw < abc:
+                    source |= 1
+                else:
+                    source |= 1
+                    target |= 1
+        yield source, target
+
+
+def shuffle_in_place(values: array, rng: random.Random) -> None:
+    """ Shuffles an array in place with the Fisher-Yates algorithm, since `random.shuffle` would first copy it to a list.
+
+    Parameters
+    ----------
+    values : array
+        the array shuffled.
+
+    rng : random.Random
+        random number generator used.
+    """
+    for i in range(len(values) - 1, 0, -1):
+        j = int(rng.random() * (i + 1))
+        values[i], values[j] = values[j], values[i]
+
+
+def configuration_model_edges(out_degrees: Sequence[int], in_degrees: Sequence[int], rng: random.Random = None) -> Edges:
+    """ Generates a directed configuration model graph: node `i` gets `out_degrees[i]` outgoing and `in_degrees[i]` incoming
+    edge ends, and the outgoing ends are matched to a uniform random permutation of the incoming ones.
+    Self loops and duplicate edges are generated like any other edge, so degrees are exact in the resulting multigraph.
+
+    Parameters
+    ----------
+    out_degrees : Sequence[int]
+        out-degree of each node.
+
+    in_degrees : Sequence[int]
+        in-degree of each node, with the same sum as the out-degrees.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    Edges
+        the edges, by increasing source.
+    """
+    rng = random if rng is None else rng
+    if len(out_degrees) != len(in_degrees):
+        raise Exception("Out-degree and in-degree sequences must have the same length")
+    if sum(out_degrees) != sum(in_degrees):
+        raise Exception("Out-degrees sum to %d but in-degrees sum to %d" % (sum(out_degrees), sum(in_degrees)))
+    ends = array('q')
+    for node, degree in enumerate(in_degrees):
+        ends.extend([node] * degree)
+    shuffle_in_place(ends, rng)
+    position = 0
+    for source, degree in enumerate(out_degrees):
+        for target in ends[position:position + degree]:
+            yield source, target
+        position += degree
+
+
+def power_law_degrees(number_of_nodes: int, average_degree: float, exponent: float = 2.5, rng: random.Random = None) -> array:
+    """ Draws a degree sequence from a discretised Pareto distribution, whose tail P(degree = k) decreases like k^-`exponent`.
+    The mean of the sequence is close to `average_degree`, and degrees are capped at `number_of_nodes` - 1.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of degrees drawn.
+
+    average_degree : float
+        expected mean degree.
+
+    exponent : float, optional
+        exponent of the power law, greater than 2 so that the mean is finite. Defaults to 2.5.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    array
+        the degrees.
+    """
+    rng = random if rng is None else rng
+    if exponent <= 2:
+        raise Exception("The exponent of the power law must be greater than 2, got " + str(exponent))
+    # The mean of x_min * paretovariate(alpha) is x_min * alpha / (alpha - 1); flooring loses 1/2 on average.
+    alpha = exponent - 1
+    x_min = (average_degree + 0.5) * (alpha - 1) / alpha
+    cap = max(number_of_nodes - 1, 0)
+    return array('q', (min(int(x_min * rng.paretovariate(alpha)), cap) for _ in range(number_of_nodes)))
+
+
+def compact_graph_from_edges(number_of_nodes: int, edges: Iterable[Tuple[int, int]]) -> CompactGraph:
+    """ Builds a compact graph from generated edges, without going through a text file. Nodes are labelled by the string
+    of their identifier, and self loops are skipped like in the files read by `Graph`.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes, identified by the integers 0 to `number_of_nodes` - 1. Nodes without edges are kept.
+
+    edges : Iterable[Tuple[int, int]]
+        the edges, consumed once.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    sources = array('q')
+    targets = array('q')
+    for source, target in edges:
+        if source != target:
+            sources.append(source)
+            targets.append(target)
+    return CompactGraph.from_edges([str(node) for node in range(number_of_nodes)], sources, targets)
+
+
+def erdos_renyi_graph(number_of_nodes: int, average_degree: float, rng: random.Random = None) -> CompactGraph:
+    """ Generates a directed Erdős–Rényi compact graph, see `erdos_renyi_edges`.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes.
+
+    average_degree : float
+        average out-degree.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    return compact_graph_from_edges(number_of_nodes,
+                                    erdos_renyi_edges(number_of_nodes, average_degree / max(number_of_nodes - 1, 1), rng))
+
+
+def barabasi_albert_graph(number_of_nodes: int, average_degree: float, rng: random.Random = None) -> CompactGraph:
+    """ Generates a directed Barabási–Albert compact graph, see `barabasi_albert_edges`.
+    The average degree is rounded to give the number of edges per new node.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes.
+
+    average_degree : float
+        average out-degree.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    return compact_graph_from_edges(number_of_nodes, barabasi_albert_edges(number_of_nodes, max(1, round(average_degree)), rng))
+
+
+def rmat_graph(number_of_nodes: int, average_degree: float, rng: random.Random = None) -> CompactGraph:
+    """ Generates an R-MAT compact graph, see `rmat_edges`.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes. Rounded up to a power of two.
+
+    average_degree : float
+        average out-degree.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    scale = max(number_of_nodes - 1, 1).bit_length()
+    return compact_graph_from_edges(1 << scale, rmat_edges(scale, int(average_degree * (1 << scale)), rng=rng))
+
+
+def configuration_model_graph(number_of_nodes: int, average_degree: float, rng: random.Random = None) -> CompactGraph:
+    """ Generates a directed configuration model compact graph, see `configuration_model_edges`,
+    whose out-degrees follow a power law and whose in-degrees are a random permutation of the out-degrees.
+
+    Parameters
+    ----------
+    number_of_nodes : int
+        number of nodes.
+
+    average_degree : float
+        average out-degree.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    rng = random if rng is None else rng
+    out_degrees = power_law_degrees(number_of_nodes, average_degree, rng=rng)
+    in_degrees = array('q', out_degrees)
+    shuffle_in_place(in_degrees, rng)
+    return compact_graph_from_edges(number_of_nodes, configuration_model_edges(out_degrees, in_degrees, rng))
+
+
+# Generators of the graphs used for scaling benchmarks: each takes a number of nodes, an average out-degree and a
+# random number generator, and returns a compact graph.
+GENERATORS: Dict[str, Callable[[int, float, random.Random], CompactGraph]] = {
+    "erdos_renyi": erdos_renyi_graph,
+    "barabasi_albert": barabasi_albert_graph,
+    "rmat": rmat_graph,
+    "configuration": configuration_model_graph,
+}
+
+
+def generate_graph(model: str, number_of_nodes: int, average_degree: float = 8, rng: random.Random = None) -> CompactGraph:
+    """ Generates a compact graph with one of the models of `GENERATORS`.
+
+    Parameters
+    ----------
+    model : str
+        name of the model: erdos_renyi, barabasi_albert, rmat or configuration.
+
+    number_of_nodes : int
+        number of nodes. Rounded up to a power of two for rmat.
+
+    average_degree : float, optional
+        average out-degree, approximate before self loops are removed. Defaults to 8.
+
+    rng : random.Random, optional
+        random number generator used. Defaults to the `random` module.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    if model not in GENERATORS:
+        raise Exception("Unknown graph model " + model + ", expected one of " + ", ".join(sorted(GENERATORS)))
+    return GENERATORS[model](number_of_nodes, average_degree, rng)
@@ -1,8 +1,11 @@
 from operator import itemgetter
 import math
+import os
 import random
-from typing import List,Callable,Tuple,Dict
+import sys
+from typing import List,Callable,Tuple,Dict,Iterable
 import itertools
+import python.profiling as profiling
 
 
 class Graph:
@@ -16,9 +19,20 @@ class Graph:
 
     al : dict, optional
         adjacency list. Defaults to None.
+
+    deduplicate : bool, optional
+        whether parallel edges are merged. Defaults to False.
+
+        By default `self` is a multigraph: every line of the file is an edge, and the successors of a node are stored
+        in a list holding a successor once per edge to it, so duplicate lines count towards the out-degree and the edges.
+        When `deduplicate` is True, the successors of a node are stored in a dictionary which entries (`s`, `m`)
+        associate each successor `s`, in order of first appearance, to the number `m` of edges to it (see `multiplicity`).
+        Membership tests on successors then take constant time, and the out-degree and the edges count each successor once.
+        The in-degree, the neighbourhoods, the LCC and the IC and LT cascades are the same in both modes,
+        since they already count each neighbour once.
     """
 
-    def __init__(self, path="", al=None):
+    def __init__(self, path="", al=None, deduplicate=False):
         """
         Constructor method.
         """
@@ -28,14 +42,22 @@ class Graph:
             raise Exception("A path to txt/tgf file or an adjacency list must be given")
         self.adjacency_list = {}
         self.nodes = []
+        self.deduplicate = deduplicate
         if path != "":
             self.process_tgf_file(path) if return_file_type(path) == "tgf" else self.process_txt_file(path)
         else:
             self.adjacency_list = al
+            if deduplicate:
+                self.adjacency_list = {node: count_successors(neighbours) for node, neighbours in al.items()}
             self.nodes = self.get_vertices()
         self.edges = self.get_edges()
+        # Number of changes of the edges made in place, by the subclasses which modify them; see `spread_cache.graph_version`.
+        self.mutations = 0
         self.most_connected_node_degree_value = None
         self.degree_centralities = {}
+        # Connected components, computed on first use.
+        self.weak_components = None
+        self.strong_components = None
 
     def get_edges(self) -> List[Tuple[str, str]]:
         """Extracts and returns the edges of `self`.
@@ -95,6 +117,13 @@ class Graph:
             # Skips if the two nodes are the same: avoid self loops.
             if from_node == to_node:
                 continue
+            if self.deduplicate:
+                # Counts the edges to each successor instead of repeating the successor.
+                successors = self.adjacency_list.setdefault(from_node, {})
+                successors[to_node] = successors.get(to_node, 0) + 1
+                if to_node not in self.adjacency_list:
+                    self.adjacency_list[to_node] = {}
+                continue
             if from_node not in self.adjacency_list.keys():
                 self.adjacency_list[from_node] = [to_node]
             else:
@@ -111,10 +140,13 @@ class Graph:
         Parameters
         ----------
         path : str
-            path of the tgf file.
+            path of the tgf file, possibly compressed (.gz, .bz2 or .xz).
         """
+        # Imported here since the readers module depends on this one.
+        from python.readers import open_text
         # split() gets rid of tab characters.
-        line_list = [' '.join(line.split()) for line in open(path, "r")]
+        with open_text(path) as input_file:
+            line_list = [' '.join(line.split()) for line in input_file]
         hashtag_index = line_list.index("#")
         # Extracts the nodes part and the edges part separated by the # symbol.
         nodes_part = line_list[:hashtag_index]
@@ -128,9 +160,11 @@ class Graph:
         Parameters
         ----------
         path : str
-            path of the txt file.
+            path of the txt file, possibly compressed (.gz, .bz2 or .xz).
         """
-        line_list = [' '.join(line.split()) for line in open(path, "r")]
+        from python.readers import open_text
+        with open_text(path) as input_file:
+            line_list = [' '.join(line.split()) for line in input_file]
         self.adjacency_list = self.build_adjacency_list(line_list)
         self.nodes = self.get_vertices()
 
@@ -165,6 +199,27 @@ class Graph:
         """
         return len(self.adjacency_list[vertex])
 
+    def multiplicity(self, from_vertex: str, to_vertex: str) -> int:
+        """ Returns the number of edges from `from_vertex` to `to_vertex`, which is more than 1 for parallel edges.
+
+        Parameters
+        ----------
+        from_vertex : str
+            head node of the edges.
+
+        to_vertex : str
+            tail node of the edges.
+
+        Returns
+        -------
+        int
+            the number of edges, 0 if there is none.
+        """
+        successors = self.adjacency_list[from_vertex]
+        if isinstance(successors, dict):
+            return successors.get(to_vertex, 0)
+        return successors.count(to_vertex)
+
     @staticmethod
     def compute_degrees(degree_method: Callable[[str], int], vertices: List[str]) -> List[Tuple[str, int]]:
         """ Computes and stores the degree values for each node, using the given degree metric.
@@ -300,7 +355,8 @@ class Graph:
             list of nodes corresponding to the neighbourhood of `vertex`.
         """
         nodes = self.adjacency_list.keys()
-        neighbours = [node for node in nodes if node in self.adjacency_list[vertex] or vertex in self.adjacency_list[node]]
+        with profiling.phase("neighbourhood", len(nodes)):
+            neighbours = [node for node in nodes if node in self.adjacency_list[vertex] or vertex in self.adjacency_list[node]]
         return neighbours
 
     def number_of_edges_within_neighbourhood(self, neighbourhood: List[str]) -> int:
@@ -317,9 +373,10 @@ class Graph:
             number of edges within neighbourhood.
         """
         neighbourhood_edges = 0
-        for neighbour in neighbourhood:
-            # Derives the number of nodes that are both in neighbourhood and in the adjacency list associated to the node called neighbour.
-            neighbourhood_edges += len(list(set(neighbourhood) & set(self.adjacency_list[neighbour])))
+        with profiling.phase("lcc_edges", len(neighbourhood)):
+            for neighbour in neighbourhood:
+                # Derives the number of nodes that are both in neighbourhood and in the adjacency list associated to the node called neighbour.
+                neighbourhood_edges += len(list(set(neighbourhood) & set(self.adjacency_list[neighbour])))
         return neighbourhood_edges
 
     def local_clustering_coefficient(self, vertex: str) -> float:
@@ -358,7 +415,8 @@ class Graph:
         """
         neighbours = self.neighbourhood(vertex)
         neighbours.append(vertex)
-        degrees = self.sort_vertices_by_degree(degree_method, neighbours)
+        with profiling.phase("nlc_degrees", len(neighbours)):
+            degrees = self.sort_vertices_by_degree(degree_method, neighbours)
         # Gets the biggest degree value in the neighbourhood.
         # This corresponds to the second element (degree value) of the first tuple of the sorted list since it is sorted in decreasing order.
         most_connections = degrees[0][1]
@@ -378,6 +436,9 @@ class Graph:
         int
             biggest degree value in the given graph.
         """
+        # In-degrees are counted in one pass rather than by scanning the whole graph for every vertex.
+        if degree_method == self.in_degree:
+            return max(self.in_degree_counts().values())
         biggest_degree_value = self.sort_vertices_by_degree(degree_method, self.get_vertices())[0][1]
         return biggest_degree_value
 
@@ -424,6 +485,37 @@ class Graph:
         self.degree_centralities[vertex] = float(degree_centrality)
         return abs(degree_centrality*lcc)
 
+    def sort_nodes_by_edc_skipping_isolated_nodes(self, degree_method: Callable[[str], int], vertices: List[str]) -> List[Tuple[str, float]]:
+        """ Sorts the nodes by EDC value, like `sort_nodes_by_edc`, without scanning the graph for the isolated nodes.
+        An isolated node has no neighbourhood: its NLC and LCC are 0, so its DC is the biggest degree value and its EDC is 0.
+
+        Parameters
+        ----------
+        degree_method : Callable[[str], int]
+            degree metric used: in-degree or out-degree.
+
+        vertices : List[str]
+            vertices of the graph.
+
+        Returns
+        -------
+        List[Tuple[str,float]
+            list of tuples (`v`, `d`) where `v` is a given vertex and `d` is its EDC value.
+        """
+        isolated = set(self.isolated_nodes())
+        if not isolated:
+            return self.sort_nodes_by_edc(degree_method, vertices)
+        edcs = []
+        with profiling.phase("centrality_scores", len(vertices)):
+            for vertex in vertices:
+                if vertex in isolated:
+                    self.degree_centralities[vertex] = float(self.most_connected_node_degree_value)
+                    edcs.append((vertex, 0.0))
+                else:
+                    edcs.append((vertex, self.enhanced_degree_centrality(degree_method, vertex)))
+        with profiling.phase("centrality_sort", len(vertices)):
+            return sorted(edcs, key=itemgetter(1), reverse=True)
+
     def successors(self, vertex: str) -> List[str]:
         """ Derives the successors of `vertex`. Those are the nodes that are connected to `vertex`, via outgoing edges from `vertex`.
 
@@ -435,7 +527,8 @@ class Graph:
         Returns
         -------
         List[str]
-            list of successors of `vertex`.
+            list of successors of `vertex`. With a deduplicated adjacency list, the dictionary of the successors of `vertex`,
+            which iterates over each successor once.
         """
         successors = self.adjacency_list[vertex]
         return successors
@@ -460,6 +553,174 @@ class Graph:
         predecessors = [v for v in vertices if vertex in self.adjacency_list[v]]
         return predecessors
 
+    def weakly_connected_components(self) -> Tuple[List[List[str]], Dict[str, int]]:
+        """ Computes the weakly connected components of `self`, that is its connected components when edges are undirected.
+        The result is cached.
+
+        Returns
+        -------
+        Tuple[List[List[str]], Dict[str, int]]
+            list of components, each listing its nodes in the order of `self`, and dictionary which entries (`v`, `c`)
+            associate each node `v` to the index `c` of its component.
+        """
+        if self.weak_components is None:
+            undirected = {node: [] for node in self.adjacency_list}
+            for node, neighbours in self.adjacency_list.items():
+                for neighbour in neighbours:
+                    undirected[node].append(neighbour)
+                    undirected[neighbour].append(node)
+            component_of = {}
+            number_of_components = 0
+            for root in self.adjacency_list:
+                if root in component_of:
+                    continue
+                # Iterative traversal: no recursion limit on large components.
+                component_of[root] = number_of_components
+                stack = [root]
+                while stack:
+                    node = stack.pop()
+                    for neighbour in undirected[node]:
+                        if neighbour not in component_of:
+                            component_of[neighbour] = number_of_components
+                            stack.append(neighbour)
+                number_of_components += 1
+            components = [[] for _ in range(number_of_components)]
+            for node in self.adjacency_list:
+                components[component_of[node]].append(node)
+            self.weak_components = (components, component_of)
+        return self.weak_components
+
+    def weak_component(self, vertex: str) -> List[str]:
+        """ Returns the weakly connected component of `vertex`, which holds all the nodes `vertex` can reach or be reached from.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex which component is returned.
+
+        Returns
+        -------
+        List[str]
+            nodes of the component, in the order of `self`.
+        """
+        components, component_of = self.weakly_connected_components()
+        return components[component_of[vertex]]
+
+    def isolated_nodes(self) -> List[str]:
+        """ Returns the nodes of `self` without any incoming or outgoing edge.
+
+        Returns
+        -------
+        List[str]
+            list of isolated nodes.
+        """
+        components = self.weakly_connected_components()[0]
+        # A node alone in its component may still have a self loop, in a graph built from an adjacency list.
+        return [component[0] for component in components if len(component) == 1 and not self.adjacency_list[component[0]]]
+
+    def strongly_connected_components(self) -> Tuple[List[List[str]], Dict[str, int]]:
+        """ Computes the strongly connected components of `self` with an iterative version of Tarjan's algorithm.
+        The components are listed in reverse topological order: no edge leaves a component towards a component listed after it.
+        The result is cached.
+
+        Returns
+        -------
+        Tuple[List[List[str]], Dict[str, int]]
+            list of components and dictionary which entries (`v`, `c`) associate each node `v` to the index `c` of its component.
+        """
+        if self.strong_components is None:
+            index = {}
+            low_link = {}
+            on_stack = set()
+            stack = []
+            components = []
+            component_of = {}
+            for root in self.adjacency_list:
+                if root in index:
+                    continue
+                index[root] = low_link[root] = len(index)
+                stack.append(root)
+                on_stack.add(root)
+                # Each entry holds a node and the iterator over its successors that remain to be explored.
+                work = [(root, iter(self.adjacency_list[root]))]
+                while work:
+                    node, successors = work[-1]
+                    descended = False
+                    for successor in successors:
+                        if successor not in index:
+                            index[successor] = low_link[successor] = len(index)
+                            stack.append(successor)
+                            on_stack.add(successor)
+                            work.append((successor, iter(self.adjacency_list[successor])))
+                            descended = True
+                            break
+                        if successor in on_stack:
+                            low_link[node] = min(low_link[node], index[successor])
+                    if descended:
+                        continue
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[node])
+                    if low_link[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component_of[member] = len(components)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+            self.strong_components = (components, component_of)
+        return self.strong_components
+
+    def condensation(self) -> List[List[int]]:
+        """ Computes the condensation of `self`: the directed acyclic graph which nodes are the strongly connected components of `self`.
+
+        Returns
+        -------
+        List[List[int]]
+            list which entry `c` lists the components reached by an edge leaving component `c`.
+            Components are indexed as in `strongly_connected_components`.
+        """
+        components, component_of = self.strongly_connected_components()
+        dag = [set() for _ in components]
+        for node, neighbours in self.adjacency_list.items():
+            for neighbour in neighbours:
+                if component_of[node] != component_of[neighbour]:
+                    dag[component_of[node]].add(component_of[neighbour])
+        return [sorted(targets) for targets in dag]
+
+    def reachable_upper_bound(self, seeds: List[str], dag: List[List[int]] = None) -> int:
+        """ Computes the number of nodes reachable from `seeds`, seeds included.
+        No spreading model can influence more nodes, whatever its probabilities.
+
+        Parameters
+        ----------
+        seeds : List[str]
+            list of seed nodes.
+
+        dag : List[List[int]], optional
+            condensation of `self`, as returned by `condensation`. Computed if not given.
+
+        Returns
+        -------
+        int
+            number of reachable nodes.
+        """
+        components, component_of = self.strongly_connected_components()
+        if dag is None:
+            dag = self.condensation()
+        reached = set(component_of[seed] for seed in seeds)
+        stack = list(reached)
+        while stack:
+            for target in dag[stack.pop()]:
+                if target not in reached:
+                    reached.add(target)
+                    stack.append(target)
+        return sum(len(components[c]) for c in reached)
+
     @staticmethod
     def average_enhanced_degree_centrality(edcs: List[Tuple[str, float]]) -> float:
         """ Calculates the average enhanced degree centrality over `edcs`.
@@ -499,8 +760,10 @@ class Graph:
         """
         # The advanced metric takes the basic metric as parameter.
         # For instance, EDC takes out-degree or in-degree as parameter.
-        degrees_tuples = [(vertex, advanced_metric(basic_metric, vertex)) for vertex in vertices]
-        degrees_sorted = sorted(degrees_tuples, key=itemgetter(1), reverse=True)
+        with profiling.phase("centrality_scores", len(vertices)):
+            degrees_tuples = [(vertex, advanced_metric(basic_metric, vertex)) for vertex in vertices]
+        with profiling.phase("centrality_sort", len(vertices)):
+            degrees_sorted = sorted(degrees_tuples, key=itemgetter(1), reverse=True)
         return degrees_sorted
 
     def sort_nodes_by_edc(self, degree_method: Callable[[str], int], vertices: List[str]) -> List[Tuple[str, float]]:
@@ -591,13 +854,204 @@ class Graph:
         """
         graph_nodes = self.nodes
         if self.most_connected_node_degree_value is None:
-            self.most_connected_node_degree_value = self.compute_biggest_degree_value(degree_method)
-        edcs = self.sort_nodes_by_edc(degree_method, graph_nodes)
-        average_edc = self.average_enhanced_degree_centrality(edcs)
-        fn = self.filter_out_nodes_edc_threshold(edcs, average_edc)
+            with profiling.phase("max_degree", len(graph_nodes)):
+                self.most_connected_node_degree_value = self.compute_biggest_degree_value(degree_method)
+        edcs = self.sort_nodes_by_edc_skipping_isolated_nodes(degree_method, graph_nodes)
+        with profiling.phase("average_edc", len(edcs)):
+            average_edc = self.average_enhanced_degree_centrality(edcs)
+        with profiling.phase("edc_filter", len(edcs)):
+            fn = self.filter_out_nodes_edc_threshold(edcs, average_edc)
         return self.active_nodes(fn)
 
-    def select_random_nodes(self, k: int) -> List[str]:
+    def get_influential_nodes_pruned(self, degree_method: Callable[[str], int]) -> List[str]:
+        """ Computes the same influential nodes as `get_influential_nodes`, without computing the LCC of most nodes.
+
+        The DC of every node is computed, which takes a single neighbourhood per node. Since LCC <= 1, and since the
+        neighbours of a node with `k` neighbours have at most min(out-degree, `k` - 1) successors among them,
+        `abs(DC) * min(1, sum of those / (k * (k - 1)))` bounds the EDC of each node from above, and 0 from below.
+        The exact EDC, which needs the expensive LCC, is then computed in decreasing order of upper bound,
+        in batches growing geometrically:
+
+        - until the bounds of the average EDC, widened by the worst rounding error of its sum, decide for every node
+          whether its DC reaches the average;
+        - then among the nodes kept, until the exact EDCs of the top quarter are bigger than the upper bound of any
+          node not computed.
+
+        If every EDC ends up being computed, the average is computed as in `get_influential_nodes`. This happens when
+        a DC lies very close to the average, which is common on large graphs: the neighbourhood of each node is then
+        still computed once instead of twice, and its LCC without rebuilding a set per neighbour.
+
+        Parameters
+        ----------
+        degree_method : Callable[[str], int]
+            degree metric used: in-degree or out-degree.
+
+        Returns
+        -------
+        List[str]
+            list of influential nodes.
+        """
+        graph_nodes = self.nodes
+        if self.most_connected_node_degree_value is None:
+            with profiling.phase("max_degree", len(graph_nodes)):
+                self.most_connected_node_degree_value = self.compute_biggest_degree_value(degree_method)
+        neighbourhoods = {}
+        upper_bounds = {}
+        with profiling.phase("centrality_bounds", len(graph_nodes)):
+            for vertex in graph_nodes:
+                neighbourhood = self.neighbourhood(vertex)
+                degree_centrality = self.degree_centrality_of_neighbourhood(degree_method, vertex, neighbourhood)
+                self.degree_centralities[vertex] = float(degree_centrality)
+                neighbourhoods[vertex] = neighbourhood
+                upper_bounds[vertex] = abs(degree_centrality) * self.lcc_upper_bound(neighbourhood)
+        edcs = {}
+        # Nodes which EDC is not known yet, by increasing upper bound so that the biggest are popped first.
+        pending = sorted((vertex for vertex in graph_nodes if upper_bounds[vertex] > 0), key=upper_bounds.get)
+        for vertex in graph_nodes:
+            if upper_bounds[vertex] == 0:
+                edcs[vertex] = 0.0
+
+        def compute_next_batch(candidates: List[str], batch_size: int) -> None:
+            with profiling.phase("centrality_scores", min(batch_size, len(candidates))):
+                for _ in range(min(batch_size, len(candidates))):
+                    vertex = candidates.pop()
+                    degree_centrality = self.degree_centralities[vertex]
+                    lcc = self.local_clustering_coefficient_of_neighbourhood(neighbourhoods.pop(vertex))
+                    edcs[vertex] = abs(degree_centrality * lcc)
+
+        # Decides which nodes have a DC reaching the average EDC.
+        batch_size = 64
+        # Relative error bound of the sum of the EDCs in any order, and of the roundings of the bounds.
+        slack = 2 * (len(graph_nodes) + 2) * sys.float_info.epsilon
+        while True:
+            if not pending:
+                with profiling.phase("average_edc", len(edcs)):
+                    sorted_edcs = sorted(((vertex, edcs[vertex]) for vertex in graph_nodes), key=itemgetter(1), reverse=True)
+                    average_edc = self.average_enhanced_degree_centrality(sorted_edcs)
+                kept = {vertex for vertex in graph_nodes if self.degree_centralities[vertex] >= average_edc}
+                break
+            exact_sum = math.fsum(edcs.values())
+            lower_average = exact_sum * (1 - slack) / len(graph_nodes)
+            upper_average = (exact_sum + math.fsum(upper_bounds[vertex] for vertex in pending)) * (1 + slack) / len(graph_nodes)
+            if not any(lower_average <= self.degree_centralities[vertex] < upper_average for vertex in graph_nodes):
+                kept = {vertex for vertex in graph_nodes if self.degree_centralities[vertex] >= upper_average}
+                break
+            compute_next_batch(pending, batch_size)
+            batch_size *= 2
+
+        # Determines the top quarter of the nodes kept, by EDC.
+        positions = {vertex: i for i, vertex in enumerate(graph_nodes)}
+        quarter = math.ceil(len(kept)/4)
+        pending = [vertex for vertex in pending if vertex in kept]
+        batch_size = max(64, quarter)
+        with profiling.phase("edc_filter", len(kept)):
+            while True:
+                ranked = sorted((vertex for vertex in edcs if vertex in kept), key=lambda v: (-edcs[v], positions[v]))
+                if not pending or (len(ranked) >= quarter and (quarter == 0 or edcs[ranked[quarter - 1]] > upper_bounds[pending[-1]])):
+                    return ranked[:quarter]
+                compute_next_batch(pending, batch_size)
+                batch_size *= 2
+
+    def degree_centrality_of_neighbourhood(self, degree_method: Callable[[str], int], vertex: str, neighbourhood: List[str]) -> float:
+        """ Computes `DC(vertex)` like `degree_centrality`, from the neighbourhood of `vertex` computed beforehand.
+
+        Parameters
+        ----------
+        degree_method : Callable[[str], int]
+            degree metric used: in-degree or out-degree.
+
+        vertex : str
+            vertex for which the degree centrality is computed.
+
+        neighbourhood : List[str]
+            neighbourhood of `vertex`.
+
+        Returns
+        -------
+        float
+            `DC(vertex)`
+        """
+        degrees = [degree_method(neighbour) for neighbour in neighbourhood]
+        vertex_degree = degree_method(vertex)
+        most_connections = max(degrees + [vertex_degree])
+        node_level_centrality = sum(most_connections - degree for degree in degrees) + most_connections - vertex_degree
+        if node_level_centrality != 0:
+            return (self.most_connected_node_degree_value - vertex_degree) / node_level_centrality
+        return self.most_connected_node_degree_value - vertex_degree
+
+    def local_clustering_coefficient_of_neighbourhood(self, neighbourhood: List[str]) -> float:
+        """ Computes the LCC of a vertex like `local_clustering_coefficient`, from its neighbourhood computed beforehand.
+        The neighbourhood is turned into a set once, rather than once per neighbour.
+
+        Parameters
+        ----------
+        neighbourhood : List[str]
+            neighbourhood of the vertex.
+
+        Returns
+        -------
+        float
+            LCC of the vertex.
+        """
+        if len(neighbourhood) < 2:
+            return 0.0
+        members = set(neighbourhood)
+        with profiling.phase("lcc_edges", len(neighbourhood)):
+            # intersection() counts each successor once, like the intersection of sets in `number_of_edges_within_neighbourhood`.
+            neighbourhood_edges = sum(len(members.intersection(self.adjacency_list[neighbour])) for neighbour in neighbourhood)
+        return neighbourhood_edges / (len(neighbourhood) * (len(neighbourhood)-1))
+
+    def lcc_upper_bound(self, neighbourhood: List[str]) -> float:
+        """ Bounds from above the LCC of a vertex from the out-degrees of its neighbours, without looking at their edges.
+        Each neighbour has at most min(out-degree, `k` - 1) successors in a neighbourhood of `k` nodes.
+
+        Parameters
+        ----------
+        neighbourhood : List[str]
+            neighbourhood of the vertex.
+
+        Returns
+        -------
+        float
+            upper bound of the LCC of the vertex.
+        """
+        k = len(neighbourhood)
+        if k < 2:
+            return 0.0
+        return min(1.0, sum(min(self.out_degree(neighbour), k - 1) for neighbour in neighbourhood) / (k * (k - 1)))
+
+    def get_reachability_ranked_nodes(self, number_of_nodes: int, act_prob: float = 0.2, k: int = 64, instances: int = 16,
+                                      rng: random.Random = None) -> List[str]:
+        """ Selects seed nodes by their expected spread under the IC model, estimated with combined bottom-k
+        reachability sketches rather than with the IM algorithm or Monte Carlo cascades.
+
+        Parameters
+        ----------
+        number_of_nodes : int
+            number of nodes selected.
+
+        act_prob : float, optional
+            activation probability. Defaults to 0.2.
+
+        k : int, optional
+            size of the sketches. Defaults to 64.
+
+        instances : int, optional
+            number of live-edge graphs sampled. Defaults to 16.
+
+        rng : random.Random, optional
+            random number generator used. Defaults to the `random` module.
+
+        Returns
+        -------
+        List[str]
+            the nodes with the biggest estimated spreads, in decreasing order.
+        """
+        # Imported here since the sketches module depends on this one.
+        from python.reachability_sketch import ReachabilitySketches
+        return ReachabilitySketches(self, k, instances, act_prob, rng).top_nodes(number_of_nodes)
+
+    def select_random_nodes(self, k: int, rng: random.Random = None) -> List[str]:
         """ Returns a list of randomly selected nodes among the nodes of `self`.
 
         Parameters
@@ -605,35 +1059,105 @@ class Graph:
         k : int
             number of nodes to be selected.
 
+        rng : random.Random, optional
+            random number generator used. Defaults to the `random` module.
+
         Returns
         -------
         List[str]
             list of randomly selected nodes.
         """
-        vertices = self.get_vertices()
-        selected_nodes = random.sample(vertices, k=k)
+        # The vertices of the adjacency list, not `self.nodes`: the nodes declared in a tgf file without any edge are
+        # not in the adjacency list, so they could not be part of a subgraph.
+        selected_nodes = (random if rng is None else rng).sample(self.get_vertices(), k=k)
         return selected_nodes
 
-    def get_adjacency_list_of_subgraph(self, nodes: List[str]) -> Dict[str, List[str]]:
+    def get_adjacency_list_of_subgraph(self, nodes: Iterable[str]) -> Dict[str, List[str]]:
         """ Builds from a set of nodes, a new adjacency list that will be associated to the subgraph which vertices are `nodes`.
 
         Parameters
         ----------
-        nodes : str
-            nodes constituting the subgraph.
+        nodes : Iterable[str]
+            nodes constituting the subgraph, as a list or a set.
 
         Returns
         -------
         Dict[str, List[str]]
             the adjacency list
         """
+        # Membership is tested against a set so that each outgoing edge is checked in constant time.
+        node_set = nodes if isinstance(nodes, (set, frozenset)) else set(nodes)
         new_al = {}
         for node in nodes:
-            out_nodes = [out_node for out_node in self.adjacency_list[node] if out_node in nodes]
-            new_al[node] = out_nodes
+            successors = self.adjacency_list[node]
+            if isinstance(successors, dict):
+                # Deduplicated adjacency: the subgraph keeps the multiplicities of the edges.
+                new_al[node] = {out_node: count for out_node, count in successors.items() if out_node in node_set}
+            else:
+                new_al[node] = [out_node for out_node in successors if out_node in node_set]
         return new_al
 
-    def build_subgraph(self, number_of_nodes: int, degree_method_string: str) -> 'Graph':
+    def in_degree_counts(self) -> Dict[str, int]:
+        """ Computes the in-degree of every vertex of `self` in a single pass over the adjacency list.
+
+        Returns
+        -------
+        Dict[str, int]
+            dictionary which entries (`v`, `d`) associate each node `v` to its in-degree `d`.
+        """
+        counts = dict.fromkeys(self.adjacency_list, 0)
+        for neighbours in self.adjacency_list.values():
+            # A predecessor counts once, even if it has several edges to the same node.
+            for neighbour in set(neighbours):
+                counts[neighbour] += 1
+        return counts
+
+    def subgraph(self, nodes: Iterable[str], degree_method_string: str = "o") -> 'Graph':
+        """ Extracts the subgraph of `self` induced by `nodes`.
+
+        Parameters
+        ----------
+        nodes : Iterable[str]
+            nodes constituting the subgraph, as a list or a set.
+
+        degree_method_string : str, optional
+            string encoding the degree metric used: in-degree or out-degree. Defaults to out-degree.
+
+        Returns
+        -------
+        Graph
+            subgraph of `self`
+        """
+        # The subgraph of a deduplicated graph keeps the successors as dictionaries of multiplicities.
+        return Graph.from_subgraph_adjacency_list(self.get_adjacency_list_of_subgraph(nodes), degree_method_string, self.deduplicate)
+
+    @classmethod
+    def from_subgraph_adjacency_list(cls, al: Dict[str, List[str]], degree_method_string: str = "o", deduplicate: bool = False) -> 'Graph':
+        """ Builds a subgraph from its adjacency list, as returned by `get_adjacency_list_of_subgraph`,
+        and computes its biggest degree value with the given degree metric.
+
+        Parameters
+        ----------
+        al : Dict[str, List[str]]
+            adjacency list of the subgraph.
+
+        degree_method_string : str, optional
+            string encoding the degree metric used: in-degree or out-degree. Defaults to out-degree.
+
+        deduplicate : bool, optional
+            whether the successors of `al` are dictionaries of multiplicities. Defaults to False.
+
+        Returns
+        -------
+        Graph
+            the subgraph.
+        """
+        sub = cls("", al, deduplicate)
+        degree_method = sub.in_degree if degree_method_string == "i" else sub.out_degree
+        sub.most_connected_node_degree_value = sub.compute_biggest_degree_value(degree_method)
+        return sub
+
+    def build_subgraph(self, number_of_nodes: int, degree_method_string: str, rng: random.Random = None) -> 'Graph':
         """ Extracts a subgraph of `self`. This subgraph's nodes are `number_of_nodes` randomly selected vertices from the nodes of `self`.
 
         Parameters
@@ -644,16 +1168,15 @@ class Graph:
         degree_method_string : str
             string encoding the degree metric used: in-degree or our-degree.
 
+        rng : random.Random, optional
+            random number generator used to select the nodes. Defaults to the `random` module.
+
         Returns
         -------
         Graph
             subgraph of `self`
         """
-        new_al = self.get_adjacency_list_of_subgraph(self.select_random_nodes(number_of_nodes))
-        sub = Graph("", new_al)
-        degree_method = sub.in_degree if degree_method_string == "i" else sub.out_degree
-        sub.most_connected_node_degree_value = sub.compute_biggest_degree_value(degree_method)
-        return sub
+        return self.subgraph(self.select_random_nodes(number_of_nodes, rng), degree_method_string)
 
 
 def return_file_type(filename: str) -> str:
@@ -667,12 +1190,36 @@ def return_file_type(filename: str) -> str:
     Returns
     -------
     str
-        file type
+        file type, the last extension of the file name before any compression extension, or "" if there is none.
     """
-    file = list(filename)
-    dot_index = file.index(".")
-    file_type = "".join(filename[dot_index+1:])
-    return file_type
+    # Only the extensions of the file name count, not the dots of the directories, as in "../wiki-Vote.txt".
+    # A compression extension is skipped: the type of "graph.tgf.gz" is "tgf".
+    stem, extension = os.path.splitext(os.path.basename(filename))
+    if extension[1:].lower() in ("gz", "bz2", "xz"):
+        extension = os.path.splitext(stem)[1]
+    return extension[1:]
+
+
+def count_successors(successors: Iterable[str]) -> Dict[str, int]:
+    """ Converts the successors of a node to the deduplicated format of `Graph`.
+
+    Parameters
+    ----------
+    successors : Iterable[str]
+        successors of a node, listed once per edge, or already deduplicated.
+
+    Returns
+    -------
+    Dict[str, int]
+        dictionary which entries (`s`, `m`) associate each successor `s`, in order of first appearance,
+        to the number `m` of edges to it.
+    """
+    if isinstance(successors, dict):
+        return successors
+    counts = {}
+    for successor in successors:
+        counts[successor] = counts.get(successor, 0) + 1
+    return counts
 
 
 def write_nodes_to_txt_file(path: str, nodes: List[str]) -> None:
@@ -686,12 +1233,9 @@ def write_nodes_to_txt_file(path: str, nodes: List[str]) -> None:
     nodes : List[str]
         list of nodes to be put in the txt file.
     """
-    # Reads the given file in write mode.
+    # Writes all the nodes at once, one per line, without a trailing newline.
     with open(path, 'w') as output_file:
-        for index, node in enumerate(nodes):
-            output_file.write(node)
-            if index != len(nodes) - 1:
-                output_file.write("\n")
+        output_file.write("\n".join(nodes))
 
 
 if __name__ == "__main__":
@@ -1,12 +1,57 @@
-import copy
 import random
-from typing import List,Tuple,Set
+import time
+from typing import List,Tuple,Set,Any
 from python.graph import Graph
+from python.cascade_result import CascadeResult
+import python.profiling as profiling
 
 # The below reference is a python implementation of the IC model. It is reused for the implementation of this class.
 # Hung-Hsuan Chen (19 nov 2016) independent_cascade.py source code [Source code]. https://github.com/hhchen1105/networkx_addon/blob/master/information_propagation/independent_cascade.py
 
 
+class LiveEdgeSample:
+    """Live-edge graph sampled lazily for the IC model.
+    The coin flip of an edge is drawn the first time the edge is tried and reused afterwards,
+    so that several seed sets diffusing on the same sample share their random numbers.
+
+    Parameters
+    ----------
+    act_prob : float
+        activation probability.
+
+    rng : random.Random, optional
+        random number generator used for the coin flips. Defaults to the `random` module.
+    """
+
+    def __init__(self, act_prob, rng=None):
+        self.act_prob = act_prob
+        self.rng = random if rng is None else rng
+        self.live_edges = {}
+
+    def is_live(self, from_node: str, to_node: str) -> bool:
+        """ Returns whether the edge between `from_node` and `to_node` is live in this sample.
+
+        Parameters
+        ----------
+        from_node : str
+            head of the edge.
+
+        to_node : str
+            tail of the edge.
+
+        Returns
+        -------
+        bool
+            whether the activation attempt along the edge succeeds.
+        """
+        edge = (from_node, to_node)
+        live = self.live_edges.get(edge)
+        if live is None:
+            live = IndependentCascadeModel.prop_success(self.act_prob, self.rng)
+            self.live_edges[edge] = live
+        return live
+
+
 class IndependentCascadeModel:
     """Independent Cascade model class
 
@@ -20,21 +65,36 @@ class IndependentCascadeModel:
 
        act_prob : float
             probability of a node being influenced.
+
+       rng : random.Random, optional
+            random number generator used for the activation attempts. Defaults to the `random` module.
     """
-    def __init__(self, g, seeds, act_prob):
-        self.all_influenced_nodes = [[]]
+    def __init__(self, g, seeds, act_prob, rng=None):
+        self.result = None
         self.total_number_of_nodes = 0
-        self.all_influenced_nodes, self.total_number_of_nodes = self.cascade(g, seeds, act_prob)
+        self.rng = random if rng is None else rng
+        self.result, self.total_number_of_nodes = self.cascade(g, seeds, act_prob)
 
     def get_influenced_nodes(self) -> List[List[str]]:
         """Returns a list of all the influenced nodes after carrying out the diffusion process.
+        The lists are built from the cascade result on each call; `get_cascade_result` avoids building them.
 
         Returns
         -------
         List[List[str]]
             list of influenced nodes.
         """
-        return self.all_influenced_nodes
+        return self.result.to_layers()
+
+    def get_cascade_result(self) -> CascadeResult:
+        """Returns the nodes influenced at each round of the diffusion process.
+
+        Returns
+        -------
+        CascadeResult
+            the influenced nodes, round by round.
+        """
+        return self.result
 
     def get_total_number_of_influenced_nodes(self) -> int:
         """Returns the total number of influenced nodes after carrying out the diffusion process.
@@ -47,7 +107,7 @@ class IndependentCascadeModel:
         return self.total_number_of_nodes
 
     @staticmethod
-    def prop_success(act_prob: float) -> bool:
+    def prop_success(act_prob: float, rng=random) -> bool:
         """Generates a random number and returns whether it is below `act_prob`.
 
         Parameters
@@ -55,13 +115,16 @@ class IndependentCascadeModel:
         act_prob : float
             probability of a node being influenced.
 
+        rng : random.Random, optional
+            random number generator used. Defaults to the `random` module.
+
         Returns
         -------
         bool
             whether the generated random number is below `act_prob`.
         """
         # Rounds the number to 1 number after the decimal point.
-        random_number = round(random.random(), 1)
+        random_number = round(rng.random(), 1)
         return random_number <= act_prob
 
     def diffuse_one_round(self, g: Graph, seed_nodes: List[str], tried_edges: Set[Tuple[str, str]], act_prob: float) -> Tuple[List[str],List[str],Set[Tuple[str,str]]]:
@@ -86,7 +149,9 @@ class IndependentCascadeModel:
         Tuple[List[str],List[str],Set[Tuple[str,str]]]
             the list of the new seed nodes, the list of the nodes that got influenced at the given round and the list of edges that got visited at the given round .
         """
-        activated_nodes_of_this_round = set()
+        # An insertion-ordered dictionary rather than a set: the nodes of a round, and so the order of the coin flips of the
+        # next rounds, follow the order of the attempts and not string hashes, which differ between processes.
+        activated_nodes_of_this_round = {}
         tried_edges_of_this_round = set()
         for s in seed_nodes:
             nbs = g.successors(s)
@@ -96,14 +161,14 @@ class IndependentCascadeModel:
                 # the edge between s and nb has already been tried/explored before.
                 if nb in seed_nodes or (s, nb) in tried_edges or (s, nb) in tried_edges_of_this_round:
                     continue
-                if self.prop_success(act_prob):
-                    activated_nodes_of_this_round.add(nb)
+                if self.prop_success(act_prob, self.rng):
+                    activated_nodes_of_this_round[nb] = None
                 tried_edges_of_this_round.add((s, nb))
         activated_nodes_of_this_round = list(activated_nodes_of_this_round)
         seed_nodes.extend(activated_nodes_of_this_round)
         return seed_nodes, activated_nodes_of_this_round, tried_edges_of_this_round
 
-    def diffuse_all(self, g: Graph, seed_nodes: List[str], act_prob: float) -> Tuple[List[List[str]], int]:
+    def diffuse_all(self, g: Graph, seed_nodes: List[str], act_prob: float) -> Tuple[CascadeResult, int]:
         """ Executes the diffusion process until no more nodes can be influenced.
 
         Parameters
@@ -112,32 +177,34 @@ class IndependentCascadeModel:
             graph on which IC is performed.
 
         seed_nodes : List[str]
-            list of seed nodes.
+            list of seed nodes. It is not modified.
 
         act_prob : float
             activation probability.
 
         Returns
         -------
-        Tuple[List[List[str]], int]
-            list of lists of influenced nodes as well as the total number of influenced nodes.
+        Tuple[CascadeResult, int]
+            nodes influenced at each round as well as the total number of influenced nodes.
         """
         tried_edges = set()
-        # Each sublist at index i stores the nodes influenced at round i.
-        # So initially, at round 0, the seed nodes are the only influenced nodes.
-        layer_i_nodes = [[i for i in seed_nodes]]
-        total_influenced_nodes = len(layer_i_nodes[0])
+        # Round 0 holds the seed nodes. The active nodes, in activation order, are the nodes of the result:
+        # each round appends the nodes it influences to them.
+        result = CascadeResult(seed_nodes)
         while True:
-            len_old = len(seed_nodes)
-            (seed_nodes, activated_nodes_of_this_round, tried_edges_of_this_round) = \
-                self.diffuse_one_round(g, seed_nodes, tried_edges, act_prob)
-            layer_i_nodes.append(activated_nodes_of_this_round)
-            total_influenced_nodes += len(activated_nodes_of_this_round)
+            len_old = len(result.nodes)
+            start = time.perf_counter_ns()
+            (_, activated_nodes_of_this_round, tried_edges_of_this_round) = \
+                self.diffuse_one_round(g, result.nodes, tried_edges, act_prob)
+            if profiling.active_profiler is not None:
+                profiling.active_profiler.add_round("IC", len(result), len_old, len(tried_edges_of_this_round),
+                                                    len(activated_nodes_of_this_round), time.perf_counter_ns() - start)
+            result.end_round()
             tried_edges = tried_edges.union(tried_edges_of_this_round)
             # If no more nodes have been influenced at the round that has just happened, the process halts.
-            if len(seed_nodes) == len_old:
+            if len(result.nodes) == len_old:
                 break
-        return layer_i_nodes,total_influenced_nodes
+        return result, result.total()
 
     def cascade(self, g, seeds, act_prob):
         """ Executes the IC diffusion process.
@@ -154,8 +221,8 @@ class IndependentCascadeModel:
             activation probability
         Returns
         -------
-        Tuple[List[List[str]], int]
-            list of lists of influenced nodes as well as the total number of influenced nodes.
+        Tuple[CascadeResult, int]
+            nodes influenced at each round as well as the total number of influenced nodes.
         """
         for s in seeds:
             if s not in g.get_vertices():
@@ -164,6 +231,86 @@ class IndependentCascadeModel:
         if act_prob > 1:
           raise Exception("edge activation probability cannot be larger than 1")
 
-        # perform diffusion
-        seed_nodes = copy.deepcopy(seeds)  # prevent side effect
-        return self.diffuse_all(g, seed_nodes, act_prob)
+        # perform diffusion; the result copies the seeds, which prevents side effects.
+        with profiling.phase("cascade", len(seeds)):
+            return self.diffuse_all(g, seeds, act_prob)
+
+    @staticmethod
+    def diffuse_live_edges(g: Graph, seeds: List[str], sample: LiveEdgeSample) -> Tuple[CascadeResult, int]:
+        """ Executes the diffusion process on a sampled live-edge graph.
+        A node is influenced at round i if it is reachable from the seeds through i live edges but not fewer.
+
+        Parameters
+        ----------
+        g :  Graph
+            graph on which IC is performed.
+
+        seeds : List[str]
+            list of seed nodes.
+
+        sample : LiveEdgeSample
+            live-edge graph sampled from `g`.
+
+        Returns
+        -------
+        Tuple[CascadeResult, int]
+            nodes influenced at each round as well as the total number of influenced nodes.
+        """
+        result = CascadeResult(seeds)
+        influenced = set(seeds)
+        frontier = result.layer(0)
+        while True:
+            len_old = len(result.nodes)
+            for s in frontier:
+                for nb in g.successors(s):
+                    if nb not in influenced and sample.is_live(s, nb):
+                        influenced.add(nb)
+                        result.nodes.append(nb)
+            result.end_round()
+            if len(result.nodes) == len_old:
+                break
+            frontier = result.layer(len(result) - 1)
+        return result, result.total()
+
+    @classmethod
+    def compare_seed_sets(cls, g: Graph, seed_sets: List[List[str]], act_prob: float, samples: int = 1, rng: Any = None) -> List[float]:
+        """ Computes the average number of nodes influenced by each of the given seed sets, using common random numbers:
+        every seed set diffuses on the same `samples` live-edge graphs, so that their spreads are compared on equal terms.
+
+        Parameters
+        ----------
+        g :  Graph
+            graph on which IC is performed.
+
+        seed_sets : List[List[str]]
+            seed sets compared.
+
+        act_prob : float
+            activation probability.
+
+        samples : int, optional
+            number of live-edge graphs sampled. Defaults to 1.
+
+        rng : random.Random, optional
+            random number generator used for the coin flips. Defaults to the `random` module.
+
+        Returns
+        -------
+        List[float]
+            average number of influenced nodes of each seed set.
+        """
+        vertices = set(g.get_vertices())
+        for seeds in seed_sets:
+            for s in seeds:
+                if s not in vertices:
+                    raise Exception("seed", s, "is not in graph")
+
+        if act_prob > 1:
+            raise Exception("edge activation probability cannot be larger than 1")
+
+        totals = [0] * len(seed_sets)
+        for _ in range(samples):
+            sample = LiveEdgeSample(act_prob, rng)
+            for index, seeds in enumerate(seed_sets):
+                totals[index] += cls.diffuse_live_edges(g, seeds, sample)[1]
+        return [total / float(samples) for total in totals]
@@ -1,6 +1,8 @@
-import copy
-from typing import List,Tuple,Dict
+import time
+from typing import List,Tuple,Dict,Any
 from python.graph import Graph
+from python.cascade_result import CascadeResult
+import python.profiling as profiling
 
 # The below reference is a python implementation of the LT model. It is reused for the implementation of this class.
 # Hung-Hsuan Chen (19 nov 2016) linear_threshold.py source code [Source code]. https://github.com/hhchen1105/networkx_addon/blob/master/information_propagation/linear_threshold.py
@@ -15,22 +17,43 @@ class LinearThresholdModel:
 
     seeds : List[str]
          list of seed nodes
+
+    act_prob : float, optional
+         unused, accepted so that LT can be constructed like IC.
+
+    rng : random.Random, optional
+         unused, accepted so that LT can be constructed like IC. LT is deterministic.
+
+    influences_and_thresholds : Tuple[Dict[str, float], Dict[str, float]], optional
+         influences and thresholds of the nodes of `g` as returned by `compute_influences_and_thresholds`.
+         Computed from `g` if not given.
     """
 
-    def __init__(self, g, seeds):
-        self.all_influenced_nodes = [[]]
+    def __init__(self, g, seeds, act_prob=None, rng=None, influences_and_thresholds=None):
+        self.result = None
         self.total_number_of_nodes = 0
-        self.all_influenced_nodes, self.total_number_of_nodes = self.cascade(g,seeds)
+        self.result, self.total_number_of_nodes = self.cascade(g,seeds,influences_and_thresholds)
 
     def get_influenced_nodes(self):
         """Returns a list of all the influenced nodes at the end of the diffusion process.
+        The lists are built from the cascade result on each call; `get_cascade_result` avoids building them.
 
         Returns
         -------
         List[List[str]]
             list of influenced nodes.
         """
-        return self.all_influenced_nodes
+        return self.result.to_layers()
+
+    def get_cascade_result(self):
+        """Returns the nodes influenced at each round of the diffusion process.
+
+        Returns
+        -------
+        CascadeResult
+            the influenced nodes, round by round.
+        """
+        return self.result
 
     def get_total_number_of_influenced_nodes(self):
         """Returns the total number of influenced nodes after carrying out the diffusion process.
@@ -84,22 +107,25 @@ class LinearThresholdModel:
         Tuple[List[str],List[str]]
             The list of the new seed nodes as well as a list of the nodes that got influenced at the given round.
         """
-        activated_nodes_of_this_round = set()
-        all_vertices = g.nodes
+        # Insertion-ordered rather than sets, so that the rounds and the order in which influences are summed do not depend
+        # on string hashes, which differ between processes.
+        activated_nodes_of_this_round = {}
+        seed_node_set = set(seed_nodes)
         for s in seed_nodes:
             nbs = g.successors(s)
             for nb in nbs:
-                if nb in seed_nodes:
+                if nb in seed_node_set:
                     continue
                 # Extracts the predecessors of nb that are seed nodes.
-                active_nb = list(set(g.predecessors(all_vertices,nb)).intersection(set(seed_nodes)))
+                # They all belong to the weakly connected component of nb, so the other components are not scanned.
+                active_nb = [p for p in g.predecessors(g.weak_component(nb),nb) if p in seed_node_set]
                 if self.compute_influence_sum(active_nb, influences) >= thresholds[nb]:
-                    activated_nodes_of_this_round.add(nb)
+                    activated_nodes_of_this_round[nb] = None
         activated_nodes_of_this_round = list(activated_nodes_of_this_round)
         seed_nodes.extend(activated_nodes_of_this_round)
         return seed_nodes, activated_nodes_of_this_round
 
-    def diffuse_all(self, g: Graph, seed_nodes: List[str], influences:  Dict[str, float], thresholds:  Dict[str, float]) -> Tuple[List[List[str]], int]:
+    def diffuse_all(self, g: Graph, seed_nodes: List[str], influences:  Dict[str, float], thresholds:  Dict[str, float]) -> Tuple[CascadeResult, int]:
         """ Executes the diffusion process until no more nodes can be influenced.
 
         Parameters
@@ -108,7 +134,7 @@ class LinearThresholdModel:
             graph on which LT is performed.
 
         seed_nodes : List[str]
-            list of seed nodes.
+            list of seed nodes. It is not modified.
 
         influences : Dict[str, float]
             a dictionary which entries (`v`, `i`) associate each node `v` to its influence value `e`.
@@ -118,24 +144,50 @@ class LinearThresholdModel:
 
         Returns
         -------
-        Tuple[List[List[str]], int]
-            list of lists of influenced nodes as well as the total number of influenced nodes.
+        Tuple[CascadeResult, int]
+            nodes influenced at each round as well as the total number of influenced nodes.
         """
-        # Each sublist at index i stores the nodes influenced at round i.
-        # So initially, at round 0, the seed nodes are the only influenced nodes.
-        layer_i_nodes = [[i for i in seed_nodes]]
-        total_influenced_nodes = len(layer_i_nodes[0])
+        # Round 0 holds the seed nodes. The active nodes, in activation order, are the nodes of the result:
+        # each round appends the nodes it influences to them.
+        result = CascadeResult(seed_nodes)
         while True:
-            len_old = len(seed_nodes)
-            (seed_nodes, activated_nodes_of_this_round) = self.diffuse_one_round(g, seed_nodes, influences, thresholds)
-            total_influenced_nodes += len(activated_nodes_of_this_round)
-            layer_i_nodes.append(activated_nodes_of_this_round)
+            len_old = len(result.nodes)
+            start = time.perf_counter_ns()
+            (_, activated_nodes_of_this_round) = self.diffuse_one_round(g, result.nodes, influences, thresholds)
+            if profiling.active_profiler is not None:
+                # The round tries every edge leaving an active node of the previous round.
+                edges_tried = sum(len(g.successors(s)) for s in result.nodes[:len_old])
+                profiling.active_profiler.add_round("LT", len(result), len_old, edges_tried,
+                                                    len(activated_nodes_of_this_round), time.perf_counter_ns() - start)
+            result.end_round()
             # If no more nodes have been influenced at the round that has just happened, the process halts.
-            if len(seed_nodes) == len_old:
+            if len(result.nodes) == len_old:
                 break
-        return layer_i_nodes,total_influenced_nodes
+        return result, result.total()
+
+    @staticmethod
+    def compute_influences_and_thresholds(g: Graph) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """ Computes the influence and the threshold of every node of `g`.
+
+        Parameters
+        ----------
+        g :  Graph
+            graph on which LT is performed.
 
-    def cascade(self, g: Graph, seeds: List[str]) -> Tuple[List[List[str]], int]:
+        Returns
+        -------
+        Tuple[Dict[str, float], Dict[str, float]]
+            the influences and the thresholds of the nodes.
+        """
+        influences = {}
+        thresholds = {}
+        for n in g.get_vertices():
+            ind = g.in_degree(n)
+            influences[n] = 1 if ind == 0 else 1 / float(ind)
+            thresholds[n] = 0.5
+        return influences, thresholds
+
+    def cascade(self, g: Graph, seeds: List[str], influences_and_thresholds: Tuple[Dict[str, float], Dict[str, float]] = None) -> Tuple[CascadeResult, int]:
         """ Executes the LT diffusion process.
 
         Parameters
@@ -145,25 +197,57 @@ class LinearThresholdModel:
 
         seeds : List[str]
             list of seed nodes.
+
+        influences_and_thresholds : Tuple[Dict[str, float], Dict[str, float]], optional
+            influences and thresholds of the nodes. Computed from `g` if not given.
         Returns
         -------
-        Tuple[List[List[str]], int]
-            list of lists of influenced nodes as well as the total number of influenced nodes.
+        Tuple[CascadeResult, int]
+            nodes influenced at each round as well as the total number of influenced nodes.
         """
-        influences = {}
-        thresholds = {}
         for s in seeds:
             if s not in g.get_vertices():
                 raise Exception('seed', s, 'is not in graph')
 
         # Initialises the influences and thresholds
-        for n in g.get_vertices():
-            ind = g.in_degree(n)
-            influences[n] = 1 if ind == 0 else 1 / float(ind)
-            thresholds[n] = 0.5
+        if influences_and_thresholds is None:
+            influences_and_thresholds = self.compute_influences_and_thresholds(g)
+        influences, thresholds = influences_and_thresholds
 
-        seed_nodes = copy.deepcopy(seeds)  # prevent side effect
-        return self.diffuse_all(g, seed_nodes, influences, thresholds)
+        # The result copies the seeds, which prevents side effects.
+        with profiling.phase("cascade", len(seeds)):
+            return self.diffuse_all(g, seeds, influences, thresholds)
+
+    @classmethod
+    def compare_seed_sets(cls, g: Graph, seed_sets: List[List[str]], act_prob: float = None, samples: int = 1, rng: Any = None) -> List[float]:
+        """ Computes the number of nodes influenced by each of the given seed sets.
+        The thresholds are fixed in this model, so they are computed once and shared by all the seed sets.
+
+        Parameters
+        ----------
+        g :  Graph
+            graph on which LT is performed.
+
+        seed_sets : List[List[str]]
+            seed sets compared.
+
+        act_prob : float, optional
+            unused, accepted so that LT can be compared like IC.
+
+        samples : int, optional
+            unused, LT is deterministic and a single cascade per seed set is enough.
+
+        rng : random.Random, optional
+            unused, LT is deterministic.
+
+        Returns
+        -------
+        List[float]
+            number of influenced nodes of each seed set.
+        """
+        influences_and_thresholds = cls.compute_influences_and_thresholds(g)
+        return [float(cls(g, seeds, influences_and_thresholds=influences_and_thresholds).get_total_number_of_influenced_nodes())
+                for seeds in seed_sets]
 
 
 
@@ -0,0 +1,571 @@
+import heapq
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from python.compact_graph import CompactGraph
+from python.edge_stream import stream_edges
+
+# Files of a converted graph, each holding an array of 64-bit integers, except for the label bytes.
+ARRAY_FILES = ("offsets", "targets", "in_offsets", "in_sources", "label_offsets", "label_order")
+LABEL_BYTES_FILE = "label_bytes"
+# Written last by the converter: a directory without it holds an incomplete conversion.
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def write_run(directory: str, pairs: array) -> str:
+    """ Writes a sorted run of pairs of node identifiers to a temporary file.
+
+    Parameters
+    ----------
+    directory : str
+        directory of the temporary file.
+
+    pairs : array
+        sorted pairs, packed one after the other in an array of 64-bit integers.
+
+    Returns
+    -------
+    str
+        path of the run.
+    """
+    descriptor, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(descriptor, "wb") as run_file:
+        pairs.tofile(run_file)
+    return path
+
+
+def sort_run(sources: array, targets: array) -> Tuple[array, array]:
+    """ Sorts a run of edges by source, keeping the order of the file among the edges of a source, and by target then source.
+    Each edge is sorted as one integer packing two identifiers of less than 32 bits, the source and the position of the edge
+    in the run, or the target and the source, so that no tuple is built.
+
+    Parameters
+    ----------
+    sources : array
+        source of each edge of the run.
+
+    targets : array
+        target of each edge of the run.
+
+    Returns
+    -------
+    Tuple[array, array]
+        the pairs (source, target) sorted by source and the pairs (target, source) sorted, each packed in an array.
+    """
+    mask = (1 << 32) - 1
+    forward = array('q', bytes(16 * len(sources)))
+    keys = [(source << 32) | position for position, source in enumerate(sources)]
+    keys.sort()
+    forward[0::2] = array('q', (key >> 32 for key in keys))
+    forward[1::2] = array('q', (targets[key & mask] for key in keys))
+    del keys
+    reverse = array('q', bytes(16 * len(sources)))
+    keys = [(target << 32) | source for source, target in zip(sources, targets)]
+    keys.sort()
+    reverse[0::2] = array('q', (key >> 32 for key in keys))
+    reverse[1::2] = array('q', (key & mask for key in keys))
+    return forward, reverse
+
+
+def read_run(path: str, buffer_pairs: int = 65536) -> Iterator[Tuple[int, int]]:
+    """ Reads back the pairs of a run, a buffer at a time.
+
+    Parameters
+    ----------
+    path : str
+        path of the run.
+
+    buffer_pairs : int, optional
+        number of pairs read at once. Defaults to 65536.
+
+    Returns
+    -------
+    Iterator[Tuple[int, int]]
+        iterator over the pairs, in the order in which they were written.
+    """
+    with open(path, "rb") as run_file:
+        while True:
+            data = run_file.read(16 * buffer_pairs)
+            if not data:
+                return
+            items = array('q')
+            items.frombytes(data)
+            yield from zip(items[0::2], items[1::2])
+
+
+def write_csr(path_offsets: str, path_items: str, number_of_nodes: int, pairs: Iterator[Tuple[int, int]]) -> None:
+    """ Writes the CSR form of pairs (`node`, `item`) sorted by node, streaming the items to disk.
+
+    Parameters
+    ----------
+    path_offsets : str
+        path of the offsets file.
+
+    path_items : str
+        path of the items file.
+
+    number_of_nodes : int
+        number of nodes.
+
+    pairs : Iterator[Tuple[int, int]]
+        pairs sorted by node.
+    """
+    offsets = array('q', [0])
+    buffer = array('q')
+    with open(path_items, "wb") as items_file:
+        for node, item in pairs:
+            while len(offsets) <= node + 1:
+                offsets.append(offsets[-1])
+            offsets[-1] += 1
+            buffer.append(item)
+            if len(buffer) >= 65536:
+                buffer.tofile(items_file)
+                buffer = array('q')
+        buffer.tofile(items_file)
+    while len(offsets) <= number_of_nodes:
+        offsets.append(offsets[-1])
+    with open(path_offsets, "wb") as offsets_file:
+        offsets.tofile(offsets_file)
+
+
+def distinct(pairs: Iterator[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+    """ Skips the repetitions of a pair in a sorted stream of pairs.
+
+    Parameters
+    ----------
+    pairs : Iterator[Tuple[int, int]]
+        sorted pairs.
+
+    Returns
+    -------
+    Iterator[Tuple[int, int]]
+        iterator over the distinct pairs.
+    """
+    previous = None
+    for pair in pairs:
+        if pair != previous:
+            yield pair
+            previous = pair
+
+
+def convert_edge_list(path: str, directory: str, run_size: int = 1 << 20, source: Dict[str, Any] = None) -> None:
+    """ Converts a txt edge list into the files of a `MappedGraph`, by external sort: edges are sorted in runs of
+    `run_size` edges written to temporary files, which are then merged. Only one run is held in memory, as arrays of
+    identifiers, while it is sorted, so the memory taken by the edges is bounded by `run_size`.
+    The converter still holds a dictionary from each node label to its identifier, and the offsets, which grow with the
+    number of nodes: the graphs it converts must have few enough nodes for their labels to fit in memory, and less than 2^32.
+    Nodes are numbered in the order in which `Graph` stores them and successors keep the order of the file,
+    so the converted graph gives the same results as the `Graph` loaded from the same file.
+
+    Parameters
+    ----------
+    path : str
+        path of the txt file.
+
+    directory : str
+        directory receiving the files of the graph. Created if needed.
+
+    run_size : int, optional
+        number of edges sorted in memory at once, less than 2^32. Defaults to 1048576, about 100 MB while a run is sorted.
+
+    source : Dict[str, Any], optional
+        description of the file the graph is built from, for callers using the files as a cache. Defaults to None.
+    """
+    if not 0 < run_size < 1 << 32:
+        raise Exception("The run size must be positive and less than 2^32, got " + str(run_size))
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    index = {}
+    forward_runs = []
+    reverse_runs = []
+    number_of_edges = 0
+    with tempfile.TemporaryDirectory(dir=directory) as runs_directory:
+        sources = array('q')
+        targets = array('q')
+        for from_node, to_node in stream_edges(path):
+            sources.append(index.setdefault(from_node, len(index)))
+            targets.append(index.setdefault(to_node, len(index)))
+            if len(sources) >= run_size:
+                forward, reverse = sort_run(sources, targets)
+                forward_runs.append(write_run(runs_directory, forward))
+                reverse_runs.append(write_run(runs_directory, reverse))
+                number_of_edges += len(sources)
+                sources = array('q')
+                targets = array('q')
+        if sources:
+            forward, reverse = sort_run(sources, targets)
+            forward_runs.append(write_run(runs_directory, forward))
+            reverse_runs.append(write_run(runs_directory, reverse))
+            number_of_edges += len(sources)
+        # Releases the last run before the merge.
+        sources = targets = forward = reverse = None
+        number_of_nodes = len(index)
+        # heapq.merge takes equal keys from earlier runs first, so the order of the file is kept across runs.
+        write_csr(os.path.join(directory, "offsets"), os.path.join(directory, "targets"), number_of_nodes,
+                  heapq.merge(*[read_run(run_path) for run_path in forward_runs], key=itemgetter(0)))
+        # A predecessor is stored once per node, sorted by identifier, as in `CompactGraph`.
+        write_csr(os.path.join(directory, "in_offsets"), os.path.join(directory, "in_sources"), number_of_nodes,
+                  distinct(heapq.merge(*[read_run(run_path) for run_path in reverse_runs])))
+    labels = list(index)
+    del index
+    write_labels(directory, labels)
+    write_meta(directory, number_of_nodes, number_of_edges, source)
+
+
+def write_labels(directory: str, labels: Sequence[str]) -> None:
+    """ Writes the label files of a graph: the encoded labels, their offsets, and the identifiers sorted by label.
+
+    Parameters
+    ----------
+    directory : str
+        directory of the graph files.
+
+    labels : Sequence[str]
+        label of each node, indexed by identifier.
+    """
+    encoded = [label.encode() for label in labels]
+    label_offsets = array('q', [0])
+    with open(os.path.join(directory, LABEL_BYTES_FILE), "wb") as label_file:
+        for label in encoded:
+            label_file.write(label)
+            label_offsets.append(label_offsets[-1] + len(label))
+    with open(os.path.join(directory, "label_offsets"), "wb") as offsets_file:
+        label_offsets.tofile(offsets_file)
+    # Identifiers sorted by label, searched by bisection to find the identifier of a label.
+    label_order = array('q', sorted(range(len(encoded)), key=encoded.__getitem__))
+    with open(os.path.join(directory, "label_order"), "wb") as order_file:
+        label_order.tofile(order_file)
+
+
+def write_meta(directory: str, number_of_nodes: int, number_of_edges: int, source: Dict[str, Any] = None) -> None:
+    """ Writes the description of a graph, which marks its files as complete.
+
+    Parameters
+    ----------
+    directory : str
+        directory of the graph files.
+
+    number_of_nodes : int
+        number of nodes.
+
+    number_of_edges : int
+        number of edges.
+
+    source : Dict[str, Any], optional
+        description of the file the graph was built from, for callers using the files as a cache. Defaults to None.
+    """
+    meta = {"version": FORMAT_VERSION, "nodes": number_of_nodes, "edges": number_of_edges,
+            "byteorder": sys.byteorder, "itemsize": array('q').itemsize, "source": source}
+    with open(os.path.join(directory, META_FILE), "w") as meta_file:
+        json.dump(meta, meta_file)
+
+
+def read_meta(directory: str) -> Dict[str, Any]:
+    """ Reads the description of a graph written by `convert_edge_list` or `save_compact_graph`,
+    checking that its files are complete and readable on this platform.
+
+    Parameters
+    ----------
+    directory : str
+        directory of the graph files.
+
+    Returns
+    -------
+    Dict[str, Any]
+        the description.
+    """
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        raise Exception("No converted graph in", directory)
+    with open(meta_path) as meta_file:
+        meta = json.load(meta_file)
+    if meta["version"] != FORMAT_VERSION or meta["byteorder"] != sys.byteorder or meta["itemsize"] != array('q').itemsize:
+        raise Exception("The graph in", directory, "was converted for another format or platform")
+    return meta
+
+
+def save_compact_graph(g: CompactGraph, directory: str, source: Dict[str, Any] = None) -> None:
+    """ Writes a compact graph in the format of `convert_edge_list`, to be reloaded with `load_compact_graph` or `MappedGraph`.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph written.
+
+    directory : str
+        directory receiving the files of the graph. Created if needed.
+
+    source : Dict[str, Any], optional
+        description of the file the graph was built from. Defaults to None.
+    """
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for name in ("offsets", "targets", "in_offsets", "in_sources"):
+        with open(os.path.join(directory, name), "wb") as array_file:
+            array('q', getattr(g, name)).tofile(array_file)
+    write_labels(directory, g.labels)
+    write_meta(directory, len(g.labels), len(g.targets), source)
+
+
+def load_compact_graph(directory: str) -> CompactGraph:
+    """ Reads the files of a graph into memory, unlike `MappedGraph` which maps them.
+    Loading costs one read of each file, without parsing any text.
+
+    Parameters
+    ----------
+    directory : str
+        directory of the graph files.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    read_meta(directory)
+    arrays = {}
+    for name in ARRAY_FILES:
+        arrays[name] = array('q')
+        with open(os.path.join(directory, name), "rb") as array_file:
+            arrays[name].frombytes(array_file.read())
+    with open(os.path.join(directory, LABEL_BYTES_FILE), "rb") as label_file:
+        label_bytes = label_file.read()
+    label_offsets = arrays["label_offsets"]
+    labels = [label_bytes[label_offsets[i]:label_offsets[i + 1]].decode() for i in range(len(label_offsets) - 1)]
+    return CompactGraph(labels, arrays["offsets"], arrays["targets"], arrays["in_offsets"], arrays["in_sources"])
+
+
+class MappedLabels(Sequence):
+    """Labels of a `MappedGraph`, decoded from the memory-mapped label bytes when accessed.
+    The most recently decoded labels are kept in a cache of bounded size.
+
+    Parameters
+    ----------
+    label_offsets : Sequence[int]
+        offsets of each label in `label_bytes`.
+
+    label_bytes : memoryview
+        encoded labels, one after the other.
+
+    cache_size : int, optional
+        number of decoded labels cached. Defaults to 65536.
+    """
+
+    def __init__(self, label_offsets, label_bytes, cache_size=1 << 16):
+        self.label_offsets = label_offsets
+        self.label_bytes = label_bytes
+        self.decode = lru_cache(maxsize=cache_size)(self.decode_label)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.decode(i)
+
+    def __len__(self):
+        return len(self.label_offsets) - 1
+
+    def __iter__(self):
+        # Iterating over all the labels bypasses the cache, which it would only flush.
+        for i in range(len(self.label_offsets) - 1):
+            yield self.decode_label(i)
+
+    def encoded(self, i: int) -> bytes:
+        """ Returns the encoded label of the node identified by `i`.
+
+        Parameters
+        ----------
+        i : int
+            identifier of the node.
+
+        Returns
+        -------
+        bytes
+            the encoded label.
+        """
+        return bytes(self.label_bytes[self.label_offsets[i]:self.label_offsets[i + 1]])
+
+    def decode_label(self, i: int) -> str:
+        """ Decodes the label of the node identified by `i`, without the cache.
+
+        Parameters
+        ----------
+        i : int
+            identifier of the node.
+
+        Returns
+        -------
+        str
+            the label.
+        """
+        return self.encoded(i).decode()
+
+
+class SortedLabels(Sequence):
+    """Encoded labels of a `MappedGraph` in sorted order, as searched by `bisect`.
+
+    Parameters
+    ----------
+    labels : MappedLabels
+        labels of the graph.
+
+    label_order : Sequence[int]
+        identifiers sorted by encoded label.
+    """
+
+    def __init__(self, labels, label_order):
+        self.labels = labels
+        self.label_order = label_order
+
+    def __getitem__(self, i):
+        return self.labels.encoded(self.label_order[i])
+
+    def __len__(self):
+        return len(self.label_order)
+
+
+class MappedLabelIndex(Mapping):
+    """Index mapping each label of a `MappedGraph` to its identifier, by bisection over the identifiers sorted by label.
+    It replaces the dictionary of `CompactGraph`, which would hold every label in memory;
+    the most recent lookups are kept in a cache of bounded size instead.
+
+    Parameters
+    ----------
+    labels : MappedLabels
+        labels of the graph.
+
+    label_order : Sequence[int]
+        identifiers sorted by encoded label.
+
+    cache_size : int, optional
+        number of lookups cached. Defaults to 65536.
+    """
+
+    def __init__(self, labels, label_order, cache_size=1 << 16):
+        self.labels = labels
+        self.label_order = label_order
+        self.sorted_labels = SortedLabels(labels, label_order)
+        self.lookup = lru_cache(maxsize=cache_size)(self.find)
+
+    def __getitem__(self, label):
+        i = self.lookup(label) if isinstance(label, str) else None
+        if i is None:
+            raise KeyError(label)
+        return i
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def find(self, label: str) -> Optional[int]:
+        """ Searches the identifier of `label`, without the cache.
+
+        Parameters
+        ----------
+        label : str
+            label searched.
+
+        Returns
+        -------
+        Optional[int]
+            identifier of the node, or None if no node has this label.
+        """
+        encoded = label.encode()
+        position = bisect_left(self.sorted_labels, encoded)
+        if position == len(self.label_order) or self.sorted_labels[position] != encoded:
+            return None
+        return self.label_order[position]
+
+
+class MappedGraph(CompactGraph):
+    """Out-of-core `CompactGraph` which arrays are memory-mapped from the files written by `convert_edge_list`.
+    The operating system pages the arrays in on demand and can evict them at any time, so the edges do not need to fit in memory.
+    Node labels are decoded when accessed and looked up by bisection, with caches of bounded size,
+    so nothing proportional to the number of edges is kept in memory.
+    Computations over all the nodes, such as the influential nodes, still build dictionaries with one entry per node.
+    The graph is read-only; its files are released by `close`, or when leaving a `with MappedGraph(directory) as g:` block.
+
+    Parameters
+    ----------
+    directory : str
+        directory holding the files of the graph.
+
+    label_cache_size : int, optional
+        number of decoded labels, and of label lookups, cached. Defaults to 65536.
+    """
+
+    def __init__(self, directory, label_cache_size=1 << 16):
+        read_meta(directory)
+        self.directory = directory
+        self.maps = []
+        self.views = []
+        try:
+            arrays = {name: self.map_file(os.path.join(directory, name), 'q') for name in ARRAY_FILES}
+            label_bytes = self.map_file(os.path.join(directory, LABEL_BYTES_FILE), 'B')
+        except BaseException:
+            self.close()
+            raise
+        labels = MappedLabels(arrays["label_offsets"], label_bytes, label_cache_size)
+        index = MappedLabelIndex(labels, arrays["label_order"], label_cache_size)
+        super().__init__(labels, arrays["offsets"], arrays["targets"], arrays["in_offsets"], arrays["in_sources"], index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def map_file(self, path: str, typecode: str) -> memoryview:
+        """ Maps a file in memory, read-only.
+
+        Parameters
+        ----------
+        path : str
+            path of the file.
+
+        typecode : str
+            type of the items of the file: 'q' for 64-bit integers, 'B' for bytes.
+
+        Returns
+        -------
+        memoryview
+            view of the items of the file.
+        """
+        if os.path.getsize(path) == 0:
+            # An empty file cannot be mapped.
+            return memoryview(b"").cast(typecode)
+        with open(path, "rb") as mapped_file:
+            mapped = mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps.append(mapped)
+        items = memoryview(mapped).cast(typecode)
+        self.views.append(items)
+        return items
+
+    def close(self) -> None:
+        """ Releases the mapped files. The graph cannot be used afterwards."""
+        self.offsets = self.targets = self.in_offsets = self.in_sources = None
+        if isinstance(getattr(self, "labels", None), MappedLabels):
+            self.labels.decode.cache_clear()
+            self.index.lookup.cache_clear()
+        self.labels = self.nodes = self.index = None
+        for items in self.views:
+            items.release()
+        for mapped in self.maps:
+            mapped.close()
+        self.views = []
+        self.maps = []
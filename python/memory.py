@@ -0,0 +1,270 @@
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, Set
+from python.compact_graph import CompactGraph
+from python.graph import Graph
+from python.mapped_graph import MappedLabels
+from python.profiling import Profiler
+
+
+def container_size(obj: Any, seen: Set[int] = None) -> int:
+    """ Computes the memory taken by `obj` and by the containers and numbers it references, strings excluded.
+    Objects already in `seen` are not counted again.
+
+    Parameters
+    ----------
+    obj : Any
+        object measured: a dictionary, list, tuple, set or scalar.
+
+    seen : Set[int], optional
+        ids of the objects already counted. Updated with the objects counted.
+
+    Returns
+    -------
+    int
+        size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, str) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return size
+
+
+def strings_size(strings: Iterable[str], seen: Set[int] = None) -> int:
+    """ Computes the memory taken by distinct string objects.
+
+    Parameters
+    ----------
+    strings : Iterable[str]
+        strings measured.
+
+    seen : Set[int], optional
+        ids of the objects already counted. Updated with the strings counted.
+
+    Returns
+    -------
+    int
+        size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    for string in strings:
+        if id(string) not in seen:
+            seen.add(id(string))
+            size += sys.getsizeof(string)
+    return size
+
+
+def array_size(values: Any) -> int:
+    """ Computes the memory taken by an array of a `CompactGraph`: an `array`, or a memoryview of shared or memory-mapped
+    memory, which is counted by the bytes it spans although it does not belong to the heap of the process.
+
+    Parameters
+    ----------
+    values : Any
+        array measured.
+
+    Returns
+    -------
+    int
+        size in bytes.
+    """
+    return values.nbytes if isinstance(values, memoryview) else sys.getsizeof(values)
+
+
+def compact_graph_memory_report(g: CompactGraph) -> Dict[str, int]:
+    """ Breaks down the memory taken by a compact graph by structure: its CSR arrays, its labels and its label index.
+    The labels of a `MappedGraph` are counted by their mapped offsets and bytes, and its index by the identifiers sorted
+    by label, without the bounded caches of decoded labels and lookups.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph measured.
+
+    Returns
+    -------
+    Dict[str, int]
+        dictionary which entries (`s`, `b`) associate each structure `s` to its size `b` in bytes, plus the total.
+    """
+    report = {name: array_size(getattr(g, name)) for name in ("offsets", "targets", "in_offsets", "in_sources")}
+    if isinstance(g.labels, MappedLabels):
+        report["labels"] = array_size(g.labels.label_offsets) + array_size(g.labels.label_bytes)
+        report["index"] = array_size(g.index.label_order)
+        report["nodes"] = 0 if g.nodes is g.labels else container_size(g.nodes)
+    else:
+        seen = set()
+        # The labels are shared by the list of labels, the index and the nodes, and counted once with the list.
+        report["labels"] = container_size(g.labels, seen) + strings_size(g.labels)
+        report["index"] = container_size(g.index, seen)
+        report["nodes"] = container_size(g.nodes, seen)
+    report["degree_centralities"] = container_size(g.degree_centralities)
+    report["total"] = sum(report.values())
+    return report
+
+
+def graph_memory_report(g: Graph) -> Dict[str, int]:
+    """ Breaks down the memory taken by `g` by structure.
+    Containers are counted in the structure that holds them, and node labels, which are shared by all the structures, are counted apart.
+    Compact graphs are measured by `compact_graph_memory_report`, so that the representations of a graph can be compared.
+    The edges are only counted when `g` holds their list, which the subclasses of `Graph` build on demand.
+
+    Parameters
+    ----------
+    g : Graph
+        graph measured.
+
+    Returns
+    -------
+    Dict[str, int]
+        dictionary which entries (`s`, `b`) associate each structure `s` to its size `b` in bytes, plus the total.
+    """
+    if isinstance(g, CompactGraph):
+        return compact_graph_memory_report(g)
+    seen = set()
+    report = {
+        "adjacency_list": container_size(g.adjacency_list, seen),
+        "nodes": container_size(g.nodes, seen),
+        "edges": container_size(vars(g)["edges"], seen) if "edges" in vars(g) else 0,
+        "degree_centralities": container_size(g.degree_centralities, seen),
+    }
+    seen_labels = set()
+    report["labels"] = strings_size(g.nodes, seen_labels) + strings_size(g.adjacency_list.keys(), seen_labels) + strings_size(
+        (label for neighbours in g.adjacency_list.values() for label in neighbours), seen_labels)
+    report["total"] = sum(report.values())
+    return report
+
+
+class MemoryPhaseTimer:
+    """Context manager measuring the running time and the peak allocation of one execution of a phase.
+
+    Parameters
+    ----------
+    recorder : MemoryRecorder
+        recorder receiving the measurement.
+
+    name : str
+        name of the phase.
+
+    items : int
+        number of items processed by the phase.
+    """
+
+    __slots__ = ("recorder", "name", "items", "start")
+
+    def __init__(self, recorder, name, items):
+        self.recorder = recorder
+        self.name = name
+        self.items = items
+        self.start = 0
+
+    def __enter__(self):
+        self.recorder.enter_phase()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed_ns = time.perf_counter_ns() - self.start
+        self.recorder.add(self.name, elapsed_ns, self.items)
+        self.recorder.exit_phase(self.name)
+
+
+class MemoryRecorder(Profiler):
+    """Profiler which also records, with tracemalloc, the peak memory allocated during each phase above the memory allocated when it started.
+    Used as `with MemoryRecorder() as m:` around an evaluation test, it records the phases of its iterations
+    (subgraph extraction, influential nodes computation, spreading) and of the cascades, which includes their layers and tried edges.
+
+    Parameters
+    ----------
+    phases : Iterable[str], optional
+        names of the phases recorded. Defaults to the phases of the evaluation tests and the cascades; None records every phase, which is slow.
+    """
+
+    def __init__(self, phases=("subgraph", "influential_nodes", "spreading", "cascade")):
+        super().__init__()
+        self.recorded_phases = None if phases is None else set(phases)
+        self.peaks = {}
+        # Each open phase is a list [allocation at start, highest peak observed so far].
+        self.open_phases = []
+        self.started_tracing = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def timer(self, name: str, items: int = 0) -> Any:
+        """ Returns the context manager measuring one execution of a phase, or one doing nothing if the phase is not recorded.
+
+        Parameters
+        ----------
+        name : str
+            name of the phase.
+
+        items : int, optional
+            number of items processed by the phase. Defaults to 0.
+
+        Returns
+        -------
+        Any
+            context manager.
+        """
+        if self.recorded_phases is not None and name not in self.recorded_phases:
+            return super().timer(name, items)
+        return MemoryPhaseTimer(self, name, items)
+
+    def enter_phase(self) -> None:
+        """ Starts measuring the peak allocation of a phase."""
+        current, peak = tracemalloc.get_traced_memory()
+        # The peak is reset for the new phase, so the enclosing phase keeps the peak reached so far.
+        if self.open_phases:
+            self.open_phases[-1][1] = max(self.open_phases[-1][1], peak)
+        tracemalloc.reset_peak()
+        self.open_phases.append([current, current])
+
+    def exit_phase(self, name: str) -> None:
+        """ Stops measuring the peak allocation of a phase and records it.
+
+        Parameters
+        ----------
+        name : str
+            name of the phase.
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        start, highest = self.open_phases.pop()
+        highest = max(highest, peak)
+        self.peaks[name] = max(self.peaks.get(name, 0), highest - start)
+        if self.open_phases:
+            self.open_phases[-1][1] = max(self.open_phases[-1][1], highest)
+        tracemalloc.reset_peak()
+
+    def memory_report(self) -> Dict[str, int]:
+        """ Returns the peak allocation of each phase, over all its executions.
+
+        Returns
+        -------
+        Dict[str, int]
+            dictionary which entries (`p`, `b`) associate each phase `p` to its peak allocation `b` in bytes.
+        """
+        return dict(self.peaks)
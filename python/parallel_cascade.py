@@ -0,0 +1,162 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+from typing import Any, List, Sequence, Tuple
+from python.cascade_result import CascadeResult
+from python.compact_graph import CompactGraph, build_reverse_csr
+from python.graph import Graph
+from python.independent_cascade import IndependentCascadeModel
+
+
+def split_seeds_by_component(g: Graph, seeds: List[str]) -> List[Tuple[int, List[str]]]:
+    """ Groups the seed nodes by weakly connected component.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which the diffusion is performed.
+
+    seeds : List[str]
+        list of seed nodes.
+
+    Returns
+    -------
+    List[Tuple[int, List[str]]]
+        list of tuples (`c`, `s`) where `c` is the index of a component and `s` the seeds it contains,
+        in the order in which the components first appear in `seeds`.
+    """
+    component_of = g.weakly_connected_components()[1]
+    groups = {}
+    for seed in seeds:
+        if seed not in component_of:
+            raise Exception("seed", seed, "is not in graph")
+        groups.setdefault(component_of[seed], []).append(seed)
+    return list(groups.items())
+
+
+def component_csr(g: Graph, nodes: List[str]) -> Tuple[List[str], array, array]:
+    """ Extracts the successors of the nodes of a weakly connected component in CSR form, with identifiers local to the component,
+    so that a worker receives two integer arrays rather than a dictionary of lists of labels.
+    A weakly connected component is closed under edges, so the successors of its nodes are all in it.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which the diffusion is performed.
+
+    nodes : List[str]
+        nodes of the component.
+
+    Returns
+    -------
+    Tuple[List[str], array, array]
+        labels of the nodes, indexed by local identifier, offsets of their successors and successors.
+    """
+    index = {node: i for i, node in enumerate(nodes)}
+    offsets = array('q', [0])
+    # Local identifiers fit in 32 bits, which halves the successors sent.
+    targets = array('i' if len(nodes) < 2 ** 31 else 'q')
+    for node in nodes:
+        # Successors keep their order; those of a deduplicated graph are listed once, which changes neither cascade.
+        targets.extend(index[successor] for successor in g.adjacency_list[node])
+        offsets.append(len(targets))
+    return nodes, offsets, targets
+
+
+def run_component_cascade(task: Tuple[List[str], array, array, List[str], Any, float, Any]) -> CascadeResult:
+    """ Runs a cascade on the compact graph of one component.
+
+    Parameters
+    ----------
+    task : Tuple[List[str], array, array, List[str], Any, float, Any]
+        labels, offsets and successors of the component (see `component_csr`), seeds, spreading model, activation probability
+        and seed of the random number generator.
+
+    Returns
+    -------
+    CascadeResult
+        nodes influenced at each round, sent back to the parent process as two flat arrays rather than one list per round.
+    """
+    labels, offsets, targets, seeds, spreading_model, act_prob, rng_seed = task
+    in_offsets, in_sources = build_reverse_csr(len(labels), offsets, targets)
+    g = CompactGraph(labels, offsets, targets, in_offsets, in_sources)
+    return spreading_model(g, seeds, act_prob, random.Random(rng_seed)).get_cascade_result()
+
+
+def merge_layers(seeds: List[str], component_layers: List[Sequence[List[str]]]) -> Tuple[List[List[str]], int]:
+    """ Merges the rounds of the cascades of several components: round i of the merged cascade holds the nodes influenced at round i in any component.
+
+    Parameters
+    ----------
+    seeds : List[str]
+        list of seed nodes, which form round 0.
+
+    component_layers : List[Sequence[List[str]]]
+        rounds of the cascade of each component, as cascade results or lists of lists.
+
+    Returns
+    -------
+    Tuple[List[List[str]], int]
+        list of lists of influenced nodes as well as the total number of influenced nodes.
+    """
+    layer_i_nodes = [[i for i in seeds]]
+    total_influenced_nodes = len(seeds)
+    number_of_rounds = max(len(layers) for layers in component_layers)
+    for round_index in range(1, number_of_rounds):
+        activated_nodes_of_this_round = []
+        for layers in component_layers:
+            if round_index < len(layers):
+                activated_nodes_of_this_round.extend(layers[round_index])
+        layer_i_nodes.append(activated_nodes_of_this_round)
+        total_influenced_nodes += len(activated_nodes_of_this_round)
+    return layer_i_nodes, total_influenced_nodes
+
+
+def component_parallel_cascade(g: Graph, seeds: List[str], spreading_model: Any = IndependentCascadeModel, act_prob: float = 0.2,
+                               processes: int = None, rng_seed: Any = None) -> Tuple[List[List[str]], int]:
+    """ Executes a diffusion process by running the cascade of each weakly connected component holding seeds in its own worker process.
+    Cascades in different components never interact, so the merged rounds follow the same model as a cascade on the whole graph.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which the diffusion is performed.
+
+    seeds : List[str]
+        list of seed nodes.
+
+    spreading_model : Any, optional
+        spreading model used: either IC or LT. Defaults to IC.
+
+    act_prob : float, optional
+        activation probability. Defaults to 0.2.
+
+    processes : int, optional
+        number of worker processes. Defaults to the number of CPUs. With 1 process, or a single component, no worker is started.
+
+    rng_seed : Any, optional
+        seed from which the random number generator of each component is derived. Defaults to None. With a seed, the result
+        only depends on it: the cascades draw their random numbers in an order which does not depend on string hashes,
+        so it is the same whichever worker runs a component, and whatever its start method and PYTHONHASHSEED.
+
+    Returns
+    -------
+    Tuple[List[List[str]], int]
+        list of lists of influenced nodes, in the format of the spreading models, as well as the total number of influenced nodes.
+    """
+    components = g.weakly_connected_components()[0]
+    tasks = []
+    for component_index, component_seeds in split_seeds_by_component(g, seeds):
+        component_rng_seed = None if rng_seed is None else "%s:%d" % (rng_seed, component_index)
+        tasks.append(component_csr(g, components[component_index]) + (component_seeds, spreading_model, act_prob, component_rng_seed))
+    if not tasks:
+        return [[], []], 0
+    if processes == 1 or len(tasks) == 1:
+        component_layers = [run_component_cascade(task) for task in tasks]
+    else:
+        processes = min(processes or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            # Small components are sent in batches so that process overhead does not dominate.
+            component_layers = list(executor.map(run_component_cascade, tasks, chunksize=max(1, len(tasks) // (4 * processes))))
+    return merge_layers(seeds, component_layers)
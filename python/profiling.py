@@ -0,0 +1,186 @@
+import time
+from typing import Any, Dict
+
+# Profiler receiving the measurements, None when profiling is disabled.
+active_profiler = None
+
+
+class PhaseTimer:
+    """Context manager timing one execution of a phase.
+
+    Parameters
+    ----------
+    profiler : Profiler
+        profiler receiving the measurement.
+
+    name : str
+        name of the phase.
+
+    items : int
+        number of items processed by the phase.
+    """
+
+    __slots__ = ("profiler", "name", "items", "start")
+
+    def __init__(self, profiler, name, items):
+        self.profiler = profiler
+        self.name = name
+        self.items = items
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.add(self.name, time.perf_counter_ns() - self.start, self.items)
+
+
+class NullTimer:
+    """Context manager doing nothing, used when profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+NULL_TIMER = NullTimer()
+
+
+class Profiler:
+    """Records the time spent in each phase of the IM algorithm and the statistics of each cascade round.
+    Measurements are only taken inside a `with Profiler() as p:` block.
+
+    Parameters
+    ----------
+    on_round : Callable[[Dict[str, Any]], None], optional
+        function called with the statistics of each cascade round as it ends. Defaults to None.
+    """
+
+    def __init__(self, on_round=None):
+        self.on_round = on_round
+        self.phases = {}
+        self.rounds = []
+        self.previous = None
+
+    def __enter__(self):
+        global active_profiler
+        self.previous = active_profiler
+        active_profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global active_profiler
+        active_profiler = self.previous
+        self.previous = None
+
+    def timer(self, name: str, items: int = 0) -> Any:
+        """ Returns the context manager measuring one execution of a phase.
+
+        Parameters
+        ----------
+        name : str
+            name of the phase.
+
+        items : int, optional
+            number of items processed by the phase. Defaults to 0.
+
+        Returns
+        -------
+        Any
+            context manager.
+        """
+        return PhaseTimer(self, name, items)
+
+    def add(self, name: str, elapsed_ns: int, items: int = 0) -> None:
+        """ Adds one execution of a phase.
+
+        Parameters
+        ----------
+        name : str
+            name of the phase.
+
+        elapsed_ns : int
+            running time in nanoseconds.
+
+        items : int, optional
+            number of items processed. Defaults to 0.
+        """
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = {"calls": 0, "total_ns": 0, "items": 0}
+        stats["calls"] += 1
+        stats["total_ns"] += elapsed_ns
+        stats["items"] += items
+
+    def add_round(self, model: str, round_index: int, frontier: int, edges_tried: int, activations: int, elapsed_ns: int) -> None:
+        """ Adds the statistics of one cascade round.
+
+        Parameters
+        ----------
+        model : str
+            name of the spreading model.
+
+        round_index : int
+            index of the round, starting at 1.
+
+        frontier : int
+            number of active nodes trying to influence their successors.
+
+        edges_tried : int
+            number of edges along which an activation was attempted.
+
+        activations : int
+            number of nodes influenced during the round.
+
+        elapsed_ns : int
+            running time of the round in nanoseconds.
+        """
+        stats = {"model": model, "round": round_index, "frontier": frontier, "edges_tried": edges_tried,
+                 "activations": activations, "elapsed_ns": elapsed_ns}
+        self.rounds.append(stats)
+        if self.on_round is not None:
+            self.on_round(stats)
+
+    def report(self) -> str:
+        """ Formats the phases, slowest first, followed by the cascade rounds.
+
+        Returns
+        -------
+        str
+            human-readable report.
+        """
+        lines = ["%-24s %10s %12s %12s" % ("phase", "calls", "total ms", "items")]
+        for name, stats in sorted(self.phases.items(), key=lambda entry: entry[1]["total_ns"], reverse=True):
+            lines.append("%-24s %10d %12.3f %12d" % (name, stats["calls"], stats["total_ns"] / 1e6, stats["items"]))
+        if self.rounds:
+            lines.append("%-6s %6s %10s %12s %12s %12s" % ("model", "round", "frontier", "edges tried", "activations", "ms"))
+            for r in self.rounds:
+                lines.append("%-6s %6d %10d %12d %12d %12.3f" % (r["model"], r["round"], r["frontier"], r["edges_tried"],
+                                                                  r["activations"], r["elapsed_ns"] / 1e6))
+        return "\n".join(lines)
+
+
+def phase(name: str, items: int = 0) -> Any:
+    """ Returns a context manager timing a phase for the active profiler, or one doing nothing if profiling is disabled.
+
+    Parameters
+    ----------
+    name : str
+        name of the phase.
+
+    items : int, optional
+        number of items processed by the phase. Defaults to 0.
+
+    Returns
+    -------
+    Any
+        context manager.
+    """
+    if active_profiler is None:
+        return NULL_TIMER
+    return active_profiler.timer(name, items)
@@ -0,0 +1,221 @@
+import heapq
+import itertools
+import random
+from typing import Any, Dict, List, Tuple
+from python.graph import Graph
+from python.independent_cascade import LiveEdgeSample
+
+
+def merge_bottom_k(sketches: List[List[float]], k: int) -> List[float]:
+    """ Merges sorted bottom-k sketches into the bottom-k sketch of their union.
+    A rank held by several sketches, such as a node reached by several seeds, is counted once.
+
+    Parameters
+    ----------
+    sketches : List[List[float]]
+        sketches merged, each sorted in increasing order.
+
+    k : int
+        size of the sketches.
+
+    Returns
+    -------
+    List[float]
+        the `k` smallest distinct ranks of the sketches, in increasing order.
+    """
+    distinct_ranks = (rank for rank, _ in itertools.groupby(heapq.merge(*sketches)))
+    return list(itertools.islice(distinct_ranks, k))
+
+
+def estimate_reach(sketch: List[float], k: int) -> float:
+    """ Estimates the number of ranked items from their bottom-k sketch.
+    A sketch with fewer than `k` ranks holds all the items; otherwise the estimate is (k-1) / (k-th smallest rank).
+
+    Parameters
+    ----------
+    sketch : List[float]
+        smallest ranks of the items, in increasing order.
+
+    k : int
+        size of the sketches.
+
+    Returns
+    -------
+    float
+        estimated number of items.
+    """
+    if len(sketch) < k:
+        return float(len(sketch))
+    return (k - 1) / sketch[k - 1]
+
+
+class ReachabilitySketches:
+    """Combined bottom-k reachability sketches of the nodes of a graph under the IC model,
+    after E. Cohen, D. Delling, T. Pajor and R. F. Werneck (2014), Sketch-based Influence Maximization and Computation.
+
+    `instances` live-edge graphs are sampled with the coin flips of `IndependentCascadeModel`, and every pair
+    (node, instance) gets a random rank. The sketch of a node holds the `k` smallest ranks of the pairs it reaches,
+    from which the expected spread of the node, or of a seed set, is estimated in O(k) per node,
+    without running any cascade. Estimates are exact while a node reaches fewer than `k` pairs.
+
+    The sketches are built instance by instance with reverse traversals along the live edges, in increasing rank order,
+    pruned at the nodes which sketch for the instance is already full; the sketches of an instance are then merged into
+    the combined ones, so only O(`k`) ranks per node are kept at any time.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which IC is performed.
+
+    k : int, optional
+        size of the sketches. The relative error of the estimates is about 1 / sqrt(k - 2). Defaults to 64.
+
+    instances : int, optional
+        number of live-edge graphs sampled. Defaults to 16.
+
+    act_prob : float, optional
+        activation probability. Defaults to 0.2.
+
+    rng : random.Random, optional
+        random number generator used for the ranks and the coin flips. Defaults to the `random` module.
+    """
+
+    def __init__(self, g, k=64, instances=16, act_prob=0.2, rng=None):
+        if k < 2:
+            raise Exception("Sketches must hold at least 2 ranks")
+        if act_prob > 1:
+            raise Exception("edge activation probability cannot be larger than 1")
+        self.k = k
+        self.instances = instances
+        self.nodes = list(g.adjacency_list)
+        self.sketches = {node: [] for node in self.nodes}
+        rng = random if rng is None else rng
+        predecessors = self.compute_predecessors(g)
+        for _ in range(instances):
+            instance_sketches = self.sketch_instance(predecessors, LiveEdgeSample(act_prob, rng), rng)
+            for node, instance_sketch in instance_sketches.items():
+                if instance_sketch:
+                    self.sketches[node] = merge_bottom_k([self.sketches[node], instance_sketch], k)
+
+    @staticmethod
+    def compute_predecessors(g: Graph) -> Dict[str, List[str]]:
+        """ Computes the distinct predecessors of every node of `g` in one pass over the adjacency list.
+
+        Parameters
+        ----------
+        g : Graph
+            graph which predecessors are computed.
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            dictionary which entries (`v`, `p`) associate each node `v` to its predecessors `p`.
+        """
+        predecessors = {node: [] for node in g.adjacency_list}
+        for node, successors in g.adjacency_list.items():
+            for successor in dict.fromkeys(successors):
+                predecessors[successor].append(node)
+        return predecessors
+
+    def sketch_instance(self, predecessors: Dict[str, List[str]], sample: LiveEdgeSample, rng: Any) -> Dict[str, List[float]]:
+        """ Computes the bottom-k reachability sketches of the nodes in one live-edge graph.
+
+        Parameters
+        ----------
+        predecessors : Dict[str, List[str]]
+            predecessors of each node.
+
+        sample : LiveEdgeSample
+            live-edge graph.
+
+        rng : random.Random
+            random number generator used for the ranks.
+
+        Returns
+        -------
+        Dict[str, List[float]]
+            dictionary which entries (`v`, `s`) associate each node `v` to the sorted ranks of the nodes it reaches.
+        """
+        k = self.k
+        sketches = {node: [] for node in self.nodes}
+        ranked_nodes = sorted((rng.random(), node) for node in self.nodes)
+        for rank, node in ranked_nodes:
+            if len(sketches[node]) >= k:
+                continue
+            # Visits the nodes reaching `node`. Ranks come in increasing order, so appending keeps the sketches sorted;
+            # a node which sketch is full already holds k smaller ranks, and so do all the nodes reaching it through it.
+            sketches[node].append(rank)
+            visited = {node}
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                for predecessor in predecessors[current]:
+                    if predecessor in visited or not sample.is_live(predecessor, current):
+                        continue
+                    visited.add(predecessor)
+                    sketch = sketches[predecessor]
+                    if len(sketch) < k:
+                        sketch.append(rank)
+                        stack.append(predecessor)
+        return sketches
+
+    def node_spread(self, vertex: str) -> float:
+        """ Estimates the expected number of nodes influenced by `vertex` alone, itself included.
+
+        Parameters
+        ----------
+        vertex : str
+            seed node.
+
+        Returns
+        -------
+        float
+            estimated spread.
+        """
+        return estimate_reach(self.sketches[vertex], self.k) / self.instances
+
+    def seed_set_spread(self, seeds: List[str]) -> float:
+        """ Estimates the expected number of nodes influenced by a seed set, seeds included, from the union of their sketches.
+
+        Parameters
+        ----------
+        seeds : List[str]
+            list of seed nodes.
+
+        Returns
+        -------
+        float
+            estimated spread.
+        """
+        for s in seeds:
+            if s not in self.sketches:
+                raise Exception("seed", s, "is not in graph")
+        sketch = merge_bottom_k([self.sketches[s] for s in set(seeds)], self.k)
+        return estimate_reach(sketch, self.k) / self.instances
+
+    def ranking(self) -> List[Tuple[str, float]]:
+        """ Ranks the nodes by estimated spread.
+
+        Returns
+        -------
+        List[Tuple[str, float]]
+            list of tuples (`v`, `s`) where `v` is a given vertex and `s` its estimated spread, in decreasing order of spread
+            and ties in the order of the nodes of the graph.
+        """
+        spreads = [(node, self.node_spread(node)) for node in self.nodes]
+        return sorted(spreads, key=lambda entry: entry[1], reverse=True)
+
+    def top_nodes(self, number_of_nodes: int) -> List[str]:
+        """ Returns the nodes with the biggest estimated spreads.
+
+        Parameters
+        ----------
+        number_of_nodes : int
+            number of nodes returned.
+
+        Returns
+        -------
+        List[str]
+            the nodes, by decreasing estimated spread.
+        """
+        return [node for node, _ in self.ranking()[:number_of_nodes]]
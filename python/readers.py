@@ -0,0 +1,406 @@
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import threading
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from python.compact_graph import CompactGraph
+from python.graph import Graph, return_file_type
+
+# Openers of the compressed files, by extension. Decompression releases the GIL, so it overlaps with parsing.
+COMPRESSED_OPENERS = {"gz": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+# Default delimiter of the delimited formats, by file type. None splits on any whitespace.
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+# Number of edges parsed before being handed over to the builder.
+BATCH_SIZE = 8192
+
+
+def compression_of(path: str) -> Optional[str]:
+    """ Returns the compression of a file, from its extension.
+
+    Parameters
+    ----------
+    path : str
+        path of the file.
+
+    Returns
+    -------
+    Optional[str]
+        "gz", "bz2" or "xz", or None if the file is not compressed.
+    """
+    extension = os.path.splitext(path)[1][1:].lower()
+    return extension if extension in COMPRESSED_OPENERS else None
+
+
+def open_text(path: str) -> TextIO:
+    """ Opens a text file for reading, decompressing it on the fly if its extension is .gz, .bz2 or .xz.
+
+    Parameters
+    ----------
+    path : str
+        path of the file.
+
+    Returns
+    -------
+    TextIO
+        the file, to be closed by the caller.
+    """
+    compression = compression_of(path)
+    if compression is None:
+        return open(path, "r")
+    return COMPRESSED_OPENERS[compression](path, "rt")
+
+
+def parse_edge_list(lines: Iterable[str], delimiter: str = None, comment_prefix: str = "#") -> Iterator[Tuple[str, Optional[str]]]:
+    """ Parses the lines of a delimited edge list. Blank lines and comments are skipped, as well as fields after the second.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        lines of the file.
+
+    delimiter : str, optional
+        delimiter of the fields. Defaults to None, which splits on any whitespace.
+
+    comment_prefix : str, optional
+        prefix of the comment lines. Defaults to "#". None or "" keeps every line.
+
+    Returns
+    -------
+    Iterator[Tuple[str, Optional[str]]]
+        iterator over the tuples (`a`, `b`) denoting an edge between `a` and `b`.
+    """
+    for line in lines:
+        if comment_prefix and line.startswith(comment_prefix):
+            continue
+        fields = line.split(delimiter)
+        if len(fields) < 2:
+            if line.strip():
+                raise Exception("Line %r does not hold an edge" % line)
+            continue
+        yield fields[0].strip(), fields[1].strip()
+
+
+def parse_tgf(lines: Iterable[str], delimiter: str = None, comment_prefix: str = None) -> Iterator[Tuple[str, Optional[str]]]:
+    """ Parses the lines of a tgf file: the declared nodes, then the "#" line, then the edges.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        lines of the file.
+
+    delimiter : str, optional
+        delimiter of the fields. Defaults to None, which splits on any whitespace.
+
+    comment_prefix : str, optional
+        prefix of the comment lines in the edges part. Defaults to None, which keeps every line.
+
+    Returns
+    -------
+    Iterator[Tuple[str, Optional[str]]]
+        iterator over the tuples (`v`, None) declaring a node `v`, followed by the tuples (`a`, `b`) denoting an edge
+        between `a` and `b`.
+    """
+    lines = iter(lines)
+    for line in lines:
+        if line.strip() == "#":
+            break
+        fields = line.split(delimiter)
+        if fields and fields[0].strip():
+            yield fields[0].strip(), None
+    else:
+        raise Exception("The tgf file has no # line")
+    yield from parse_edge_list(lines, delimiter, comment_prefix)
+
+
+# Parsers of the supported formats, by file type. A parser takes the lines of a file, a delimiter and a comment prefix,
+# and yields the tuples (`a`, `b`) of its edges, and the tuples (`v`, None) of the nodes it declares.
+PARSERS = {"txt": parse_edge_list, "csv": parse_edge_list, "tsv": parse_edge_list, "tgf": parse_tgf}
+
+
+def register_parser(file_type: str, parser: Callable[[Iterable[str], Optional[str], Optional[str]], Iterator[Tuple[str, Optional[str]]]]) -> None:
+    """ Registers the parser of a file type, which `read_edges` then uses for the files with that extension.
+
+    Parameters
+    ----------
+    file_type : str
+        extension of the files, without the compression extension.
+
+    parser : Callable[[Iterable[str], Optional[str], Optional[str]], Iterator[Tuple[str, Optional[str]]]]
+        the parser, see `PARSERS`.
+    """
+    PARSERS[file_type] = parser
+
+
+def read_batches(path: str, file_type: str = None, delimiter: str = None, comment_prefix: Optional[str] = "#") -> Iterator[List[Tuple[str, Optional[str]]]]:
+    """ Reads and parses a graph file in the current thread.
+
+    Parameters
+    ----------
+    path : str
+        path of the file, compressed or not.
+
+    file_type : str, optional
+        format of the file, a key of `PARSERS`. Defaults to the extension of the file, or "txt" if it is unknown.
+
+    delimiter : str, optional
+        delimiter of the fields. Defaults to "," for csv files, a tab for tsv files and any whitespace otherwise.
+
+    comment_prefix : str, optional
+        prefix of the comment lines. Defaults to "#", except in the nodes part of tgf files. None keeps every line.
+
+    Returns
+    -------
+    Iterator[List[Tuple[str, Optional[str]]]]
+        iterator over batches of edges (`a`, `b`) and node declarations (`v`, None), in the order of the file.
+    """
+    if file_type is None:
+        file_type = return_file_type(path)
+        if file_type not in PARSERS:
+            file_type = "txt"
+    if delimiter is None:
+        delimiter = DELIMITERS.get(file_type)
+    with open_text(path) as input_file:
+        items = PARSERS[file_type](input_file, delimiter, comment_prefix)
+        while True:
+            batch = [item for _, item in zip(range(BATCH_SIZE), items)]
+            if not batch:
+                return
+            yield batch
+
+
+def read_edge_batches(path: str, file_type: str = None, delimiter: str = None, comment_prefix: Optional[str] = "#",
+                      threaded: bool = True, queue_size: int = 16) -> Iterator[List[Tuple[str, Optional[str]]]]:
+    """ Streams the edges of a graph file in batches. With `threaded`, the file is read, decompressed and parsed in a background
+    thread which hands the batches over through a bounded queue, so that reading the file overlaps with consuming its edges.
+
+    Parameters
+    ----------
+    path : str
+        path of the file, compressed or not.
+
+    file_type : str, optional
+        format of the file, see `read_batches`.
+
+    delimiter : str, optional
+        delimiter of the fields, see `read_batches`.
+
+    comment_prefix : str, optional
+        prefix of the comment lines, see `read_batches`.
+
+    threaded : bool, optional
+        whether the file is read in a background thread. Defaults to True.
+
+    queue_size : int, optional
+        number of batches the background thread can read ahead. Defaults to 16.
+
+    Returns
+    -------
+    Iterator[List[Tuple[str, Optional[str]]]]
+        iterator over batches of edges (`a`, `b`) and node declarations (`v`, None), in the order of the file.
+    """
+    batches = read_batches(path, file_type, delimiter, comment_prefix)
+    if not threaded:
+        yield from batches
+        return
+    handover = queue.Queue(queue_size)
+    stopped = threading.Event()
+    end = object()
+
+    def hand_over(item):
+        # Gives up if the consumer stopped reading, rather than blocking forever on a full queue.
+        while not stopped.is_set():
+            try:
+                handover.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not hand_over(batch):
+                    return
+            hand_over(end)
+        except BaseException as error:
+            hand_over(error)
+        finally:
+            batches.close()
+
+    producer = threading.Thread(target=produce, name="graph-reader", daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch = handover.get()
+            if batch is end:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield batch
+    finally:
+        stopped.set()
+        producer.join()
+
+
+def read_edges(path: str, file_type: str = None, delimiter: str = None, comment_prefix: Optional[str] = "#",
+               threaded: bool = True) -> Iterator[Tuple[str, Optional[str]]]:
+    """ Streams the edges of a graph file, see `read_edge_batches`.
+
+    Parameters
+    ----------
+    path : str
+        path of the file, compressed or not.
+
+    file_type : str, optional
+        format of the file, see `read_batches`.
+
+    delimiter : str, optional
+        delimiter of the fields, see `read_batches`.
+
+    comment_prefix : str, optional
+        prefix of the comment lines, see `read_batches`.
+
+    threaded : bool, optional
+        whether the file is read in a background thread. Defaults to True.
+
+    Returns
+    -------
+    Iterator[Tuple[str, Optional[str]]]
+        iterator over the edges (`a`, `b`) and the node declarations (`v`, None), in the order of the file.
+    """
+    batches = read_edge_batches(path, file_type, delimiter, comment_prefix, threaded)
+    try:
+        for batch in batches:
+            yield from batch
+    finally:
+        # Stops the background thread when the caller closes the iterator before the end of the file.
+        batches.close()
+
+
+def build_adjacency_list(items: Iterable[Tuple[str, Optional[str]]], deduplicate: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+    """ Builds an adjacency list like `Graph.build_adjacency_list`: nodes in order of first appearance, self loops skipped.
+
+    Parameters
+    ----------
+    items : Iterable[Tuple[str, Optional[str]]]
+        edges (`a`, `b`) and node declarations (`v`, None).
+
+    deduplicate : bool, optional
+        whether parallel edges are merged, see `Graph`. Defaults to False.
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], List[str]]
+        the adjacency list, and the declared nodes in order of declaration.
+    """
+    al = {}
+    declared = []
+    for from_node, to_node in items:
+        if to_node is None:
+            declared.append(from_node)
+            continue
+        if from_node == to_node:
+            continue
+        successors = al.get(from_node)
+        if successors is None:
+            successors = al[from_node] = {} if deduplicate else []
+        if deduplicate:
+            successors[to_node] = successors.get(to_node, 0) + 1
+        else:
+            successors.append(to_node)
+        if to_node not in al:
+            al[to_node] = {} if deduplicate else []
+    return al, declared
+
+
+def read_graph(path: str, file_type: str = None, delimiter: str = None, comment_prefix: Optional[str] = "#",
+               deduplicate: bool = False, threaded: bool = True) -> Graph:
+    """ Reads a graph file into a `Graph`, possibly compressed, in any format of `PARSERS`.
+
+    The graph is the one `Graph(path)` builds from the same file once decompressed, except that blank and comment lines
+    are skipped, and that nodes declared in a tgf file without any edge are kept as isolated nodes.
+    As in `Graph`, the nodes of a tgf file are the declared ones, in order of declaration.
+
+    Parameters
+    ----------
+    path : str
+        path of the file, compressed or not.
+
+    file_type : str, optional
+        format of the file, see `read_batches`.
+
+    delimiter : str, optional
+        delimiter of the fields, see `read_batches`.
+
+    comment_prefix : str, optional
+        prefix of the comment lines, see `read_batches`.
+
+    deduplicate : bool, optional
+        whether parallel edges are merged, see `Graph`. Defaults to False.
+
+    threaded : bool, optional
+        whether the file is read in a background thread. Defaults to True.
+
+    Returns
+    -------
+    Graph
+        the graph.
+    """
+    al, declared = build_adjacency_list(read_edges(path, file_type, delimiter, comment_prefix, threaded), deduplicate)
+    for node in declared:
+        if node not in al:
+            al[node] = {} if deduplicate else []
+    g = Graph("", al, deduplicate)
+    if declared:
+        g.nodes = declared
+    return g
+
+
+def read_compact_graph(path: str, file_type: str = None, delimiter: str = None, comment_prefix: Optional[str] = "#",
+                       threaded: bool = True) -> CompactGraph:
+    """ Reads a graph file directly into a `CompactGraph`, without building an adjacency list of strings first.
+    The graph is the same as `CompactGraph.from_graph(read_graph(path))`, apart from the declared nodes of tgf files,
+    which are added after the nodes of the edges.
+
+    Parameters
+    ----------
+    path : str
+        path of the file, compressed or not.
+
+    file_type : str, optional
+        format of the file, see `read_batches`.
+
+    delimiter : str, optional
+        delimiter of the fields, see `read_batches`.
+
+    comment_prefix : str, optional
+        prefix of the comment lines, see `read_batches`.
+
+    threaded : bool, optional
+        whether the file is read in a background thread. Defaults to True.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    index = {}
+    sources = array('q')
+    targets = array('q')
+    declared = []
+    for batch in read_edge_batches(path, file_type, delimiter, comment_prefix, threaded):
+        for from_node, to_node in batch:
+            if to_node is None:
+                declared.append(from_node)
+            elif from_node != to_node:
+                # Identifiers are given in order of first appearance, the head of an edge before its tail.
+                sources.append(index.setdefault(from_node, len(index)))
+                targets.append(index.setdefault(to_node, len(index)))
+    for node in declared:
+        index.setdefault(node, len(index))
+    return CompactGraph.from_edges(list(index), sources, targets)
@@ -0,0 +1,370 @@
+import argparse
+import math
+import random
+import sys
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, List, Sequence
+from python.compact_graph import CompactGraph, build_reverse_csr
+from python.graph import Graph
+
+
+def as_compact_graph(g: Graph) -> CompactGraph:
+    """ Returns `g` if it is a `CompactGraph`, and its compact form otherwise.
+
+    Parameters
+    ----------
+    g : Graph
+        graph.
+
+    Returns
+    -------
+    CompactGraph
+        the compact graph.
+    """
+    return g if isinstance(g, CompactGraph) else CompactGraph.from_graph(g)
+
+
+def total_degrees(g: CompactGraph) -> array:
+    """ Computes the number of successors plus the number of predecessors of every node.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph.
+
+    Returns
+    -------
+    array
+        degree of each node, indexed by identifier.
+    """
+    offsets = g.offsets
+    in_offsets = g.in_offsets
+    return array('q', (offsets[i + 1] - offsets[i] + in_offsets[i + 1] - in_offsets[i] for i in range(len(g.labels))))
+
+
+def undirected_neighbour_ids(g: CompactGraph, node: int) -> List[int]:
+    """ Returns the identifiers of the successors and predecessors of a node, without duplicates.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph.
+
+    node : int
+        identifier of the node.
+
+    Returns
+    -------
+    List[int]
+        identifiers of the neighbours, in increasing order.
+    """
+    neighbours = set(g.successor_ids(node))
+    neighbours.update(g.predecessor_ids(node))
+    neighbours.discard(node)
+    return sorted(neighbours)
+
+
+def degree_order(g: CompactGraph) -> array:
+    """ Orders the nodes by decreasing total degree, so that the hubs, which most edges lead to, are stored together.
+    Nodes of equal degree keep their relative order.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph.
+
+    Returns
+    -------
+    array
+        identifiers of the nodes in their new order.
+    """
+    degrees = total_degrees(g)
+    return array('q', sorted(range(len(g.labels)), key=lambda node: -degrees[node]))
+
+
+def bfs_order(g: CompactGraph) -> array:
+    """ Orders the nodes by breadth-first search on the undirected edges, so that the neighbours of a node get close identifiers.
+    Each weakly connected component is searched from its node of highest degree, components by decreasing degree of that node,
+    and the neighbours of a node are visited by increasing identifier.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph.
+
+    Returns
+    -------
+    array
+        identifiers of the nodes in their new order.
+    """
+    number_of_nodes = len(g.labels)
+    visited = bytearray(number_of_nodes)
+    order = array('q')
+    for root in degree_order(g):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for neighbour in undirected_neighbour_ids(g, node):
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    queue.append(neighbour)
+    return order
+
+
+def reverse_cuthill_mckee_order(g: CompactGraph) -> array:
+    """ Orders the nodes with the reverse Cuthill-McKee algorithm on the undirected edges, which reduces the bandwidth of the
+    adjacency matrix: breadth-first search from a node of lowest degree of each weakly connected component,
+    visiting the neighbours of a node by increasing degree, and reversal of the whole order.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph.
+
+    Returns
+    -------
+    array
+        identifiers of the nodes in their new order.
+    """
+    number_of_nodes = len(g.labels)
+    degrees = total_degrees(g)
+    visited = bytearray(number_of_nodes)
+    order = array('q')
+    for root in sorted(range(number_of_nodes), key=degrees.__getitem__):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            neighbours = [neighbour for neighbour in undirected_neighbour_ids(g, node) if not visited[neighbour]]
+            neighbours.sort(key=degrees.__getitem__)
+            for neighbour in neighbours:
+                visited[neighbour] = 1
+                queue.append(neighbour)
+    order.reverse()
+    return order
+
+
+def community_order(g: CompactGraph, iterations: int = 10, rng: random.Random = None) -> array:
+    """ Orders the nodes community by community, so that densely connected nodes get close identifiers.
+    Communities are found by label propagation on the undirected edges: each node repeatedly takes the community most
+    frequent among its neighbours, the smallest on ties, until no node changes or `iterations` rounds are done.
+    Communities are then stored by decreasing size, and the nodes of a community in the order of `bfs_order`.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph.
+
+    iterations : int, optional
+        maximum number of label propagation rounds. Defaults to 10.
+
+    rng : random.Random, optional
+        random number generator used to shuffle the nodes at each round. Defaults to the `random` module.
+
+    Returns
+    -------
+    array
+        identifiers of the nodes in their new order.
+    """
+    rng = random if rng is None else rng
+    number_of_nodes = len(g.labels)
+    community = array('q', range(number_of_nodes))
+    neighbourhoods = [undirected_neighbour_ids(g, node) for node in range(number_of_nodes)]
+    nodes = list(range(number_of_nodes))
+    for _ in range(iterations):
+        rng.shuffle(nodes)
+        changed = False
+        for node in nodes:
+            neighbours = neighbourhoods[node]
+            if not neighbours:
+                continue
+            counts = {}
+            for neighbour in neighbours:
+                label = community[neighbour]
+                counts[label] = counts.get(label, 0) + 1
+            best = max(counts.values())
+            label = min(label for label, count in counts.items() if count == best)
+            if label != community[node]:
+                community[node] = label
+                changed = True
+        if not changed:
+            break
+    sizes = {}
+    for label in community:
+        sizes[label] = sizes.get(label, 0) + 1
+    rank = array('q', bytes(8 * number_of_nodes))
+    for i, node in enumerate(bfs_order(g)):
+        rank[node] = i
+    return array('q', sorted(range(number_of_nodes), key=lambda node: (-sizes[community[node]], community[node], rank[node])))
+
+
+# Node orderings: each takes a compact graph and returns the identifiers of its nodes in their new order.
+ORDERINGS: Dict[str, Callable[[CompactGraph], Sequence[int]]] = {
+    "degree": degree_order,
+    "bfs": bfs_order,
+    "rcm": reverse_cuthill_mckee_order,
+    "community": community_order,
+}
+
+
+def relabel(g: CompactGraph, order: Sequence[int]) -> CompactGraph:
+    """ Renumbers the nodes of a compact graph, so that the node identified by `order[i]` in `g` is identified by `i`.
+    Only the layout changes: labels, successors and their order are kept, and `nodes` keeps the order of `g`,
+    so the influential nodes and the cascades computed on the new graph are those computed on `g`.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph renumbered.
+
+    order : Sequence[int]
+        identifiers of the nodes of `g` in their new order, a permutation of the identifiers of `g`.
+
+    Returns
+    -------
+    CompactGraph
+        the renumbered graph.
+    """
+    number_of_nodes = len(g.labels)
+    if len(order) != number_of_nodes or len(set(order)) != number_of_nodes:
+        raise Exception("The order must be a permutation of the %d nodes of the graph" % number_of_nodes)
+    new_id = array('q', bytes(8 * number_of_nodes))
+    for i, node in enumerate(order):
+        new_id[node] = i
+    offsets = array('q', [0])
+    targets = array('q')
+    for node in order:
+        targets.extend(new_id[target] for target in g.successor_ids(node))
+        offsets.append(len(targets))
+    in_offsets, in_sources = build_reverse_csr(number_of_nodes, offsets, targets)
+    labels = [g.labels[node] for node in order]
+    relabelled = CompactGraph(labels, offsets, targets, in_offsets, in_sources)
+    relabelled.nodes = list(g.nodes)
+    relabelled.most_connected_node_degree_value = g.most_connected_node_degree_value
+    return relabelled
+
+
+def locality(g: CompactGraph) -> Dict[str, float]:
+    """ Measures how close the two ends of the edges of a compact graph are stored, which drives the cache misses of the
+    loops following edges. The gap of an edge is the absolute difference of the identifiers of its ends.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph measured.
+
+    Returns
+    -------
+    Dict[str, float]
+        mean gap, mean base 2 logarithm of 1 + gap, largest gap (the bandwidth), and fraction of the edges which ends
+        are less than 8 identifiers apart, that is within the 64 bytes of a cache line of an integer array.
+    """
+    offsets = g.offsets
+    targets = g.targets
+    total = 0
+    total_log = 0.0
+    bandwidth = 0
+    near = 0
+    for node in range(len(g.labels)):
+        for target in targets[offsets[node]:offsets[node + 1]]:
+            gap = abs(target - node)
+            total += gap
+            total_log += math.log2(1 + gap)
+            if gap > bandwidth:
+                bandwidth = gap
+            if gap < 8:
+                near += 1
+    number_of_edges = max(len(targets), 1)
+    return {"mean_gap": total / number_of_edges, "mean_log_gap": total_log / number_of_edges,
+            "bandwidth": bandwidth, "near_fraction": near / number_of_edges}
+
+
+def reorder(g: Graph, method: str = "rcm", rng: random.Random = None) -> CompactGraph:
+    """ Renumbers the nodes of a graph with one of the orderings of `ORDERINGS`.
+
+    Parameters
+    ----------
+    g : Graph
+        graph renumbered, converted to a `CompactGraph` if needed.
+
+    method : str, optional
+        ordering: degree, bfs, rcm or community. Defaults to rcm.
+
+    rng : random.Random, optional
+        random number generator of the community ordering. Defaults to the `random` module.
+
+    Returns
+    -------
+    CompactGraph
+        the renumbered graph.
+    """
+    if method not in ORDERINGS:
+        raise Exception("Unknown ordering " + method + ", expected one of " + ", ".join(sorted(ORDERINGS)))
+    compact = as_compact_graph(g)
+    order = community_order(compact, rng=rng) if method == "community" else ORDERINGS[method](compact)
+    return relabel(compact, order)
+
+
+def locality_report(g: Graph, methods: List[str] = None, rng: random.Random = None) -> List[Dict[str, Any]]:
+    """ Measures the locality of a graph in its original order and after each ordering.
+
+    Parameters
+    ----------
+    g : Graph
+        graph measured.
+
+    methods : List[str], optional
+        orderings compared. Defaults to all of them.
+
+    rng : random.Random, optional
+        random number generator of the community ordering. Defaults to the `random` module.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        one entry per order, the original one first, with its name and its `locality` measures.
+    """
+    compact = as_compact_graph(g)
+    report = [dict(order="original", **locality(compact))]
+    for method in methods or sorted(ORDERINGS):
+        report.append(dict(order=method, **locality(reorder(compact, method, rng))))
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command-line entry point.
+
+    `python -m python.reorder wiki-Vote.txt` prints the locality of the graph in its original order and after each ordering.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        exit status.
+    """
+    parser = argparse.ArgumentParser(description="Compares the locality of node orderings of a graph.")
+    parser.add_argument("graph", help="txt/tgf graph file")
+    parser.add_argument("--orders", nargs="+", choices=sorted(ORDERINGS), help="orderings compared (all by default)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("%-10s %12s %12s %10s %12s" % ("order", "mean_gap", "mean_log_gap", "bandwidth", "near_fraction"))
+    for row in locality_report(Graph(args.graph), args.orders, random.Random(args.seed)):
+        print("%-10s %12.1f %12.3f %10d %12.3f" % (row["order"], row["mean_gap"], row["mean_log_gap"], row["bandwidth"], row["near_fraction"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import csv
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple, TextIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked.
+    fcntl = None
+
+
+def read_csv_rows(path: str) -> List[List[str]]:
+    """ Reads the rows of a csv file.
+
+    Parameters
+    ----------
+    path :  str
+        path of the csv file.
+
+    Returns
+    -------
+    List[List[str]]
+        rows of the csv file.
+    """
+    with open(path, 'r', newline='') as f:
+        return list(csv.reader(f))
+
+
+def file_mode(path: str) -> int:
+    """ Returns the permissions a file rewritten at `path` should have: those of the existing file,
+    or those `open` would give a new file under the current umask.
+
+    Parameters
+    ----------
+    path :  str
+        path of the file.
+
+    Returns
+    -------
+    int
+        the permission bits.
+    """
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        # The umask can only be read by setting it, so it is restored at once.
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_open(path: str, newline: str = None) -> Iterator[TextIO]:
+    """ Opens a temporary text file which replaces the file at `path` once it is written, flushed to disk and given the
+    permissions of `file_mode`, so that an interrupted write never leaves a truncated or empty file behind.
+    If the block raises, the temporary file is removed and `path` is left untouched.
+
+    Parameters
+    ----------
+    path :  str
+        path of the file written.
+
+    newline : str, optional
+        newline mode of the file, as for `open`. Defaults to None.
+
+    Returns
+    -------
+    Iterator[TextIO]
+        the temporary file, open for writing.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, 'w', newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file with mode 0600 whatever the umask.
+        os.chmod(temporary_path, file_mode(path))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def write_csv_rows(path: str, rows: List[List[Any]]) -> None:
+    """ Overwrites a csv file with `rows` atomically: the rows are written to a temporary file which then replaces the csv file,
+    so that an interrupted write never leaves a truncated file behind.
+
+    Parameters
+    ----------
+    path :  str
+        path of the csv file.
+
+    rows :  List[List[Any]]
+        rows to write.
+    """
+    with atomic_open(path, newline='') as f:
+        csv.writer(f).writerows(rows)
+
+
+def set_cells(rows: List[List[Any]], cells: Dict[Tuple[int, int], Any]) -> List[List[Any]]:
+    """ Writes values in the cells of a table, adding empty rows and cells where the table is too small.
+
+    Parameters
+    ----------
+    rows :  List[List[Any]]
+        rows of the table.
+
+    cells :  Dict[Tuple[int, int], Any]
+        dictionary which entries ((`i`, `j`), `d`) associate the cell `j` of row `i` to its value `d`.
+
+    Returns
+    -------
+    List[List[Any]]
+        the modified rows.
+    """
+    for (i, j), data in cells.items():
+        while len(rows) <= i:
+            rows.append([])
+        while len(rows[i]) <= j:
+            rows[i].append("")
+        rows[i][j] = data
+    return rows
+
+
+class ResultsLog:
+    """Buffered, append-only log of measurements destined to csv tables.
+    Several processes can write to the same log: each flush appends its buffered measurements in a single locked write.
+    The log is turned into the csv tables by `compact`.
+
+    Parameters
+    ----------
+    path : str
+        path of the log file.
+
+    buffer_size : int, optional
+        number of measurements buffered before they are appended to the log. Defaults to 100.
+    """
+
+    def __init__(self, path, buffer_size=100):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def record(self, csv_path: str, i: int, j: int, data: Any) -> None:
+        """ Records that `data` belongs to the cell `j` of row `i` of the csv file `csv_path`.
+
+        Parameters
+        ----------
+        csv_path :  str
+            path of the csv file.
+
+        i :  int
+            index of the row of the csv file.
+
+        j :  int
+            index of the cell within the row of the csv file.
+
+        data : Any
+            JSON-serialisable data to write in the csv file.
+        """
+        self.buffer.append({"path": csv_path, "row": i, "column": j, "data": data})
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Appends the buffered measurements to the log."""
+        if not self.buffer:
+            return
+        payload = "".join(json.dumps(measurement) + "\n" for measurement in self.buffer).encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            written = 0
+            while written < len(payload):
+                written += os.write(fd, payload[written:])
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.buffer = []
+
+    def compact(self) -> List[str]:
+        """ Flushes the buffer then applies every measurement of the log to its csv table, each table being read and
+        rewritten once. When a cell was recorded several times, the last measurement wins. The log is emptied afterwards.
+
+        Returns
+        -------
+        List[str]
+            paths of the csv files written.
+        """
+        self.flush()
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r') as log:
+            if fcntl is not None:
+                fcntl.flock(log.fileno(), fcntl.LOCK_EX)
+            tables = {}
+            for line in log:
+                # A line without its end of line was being written when the process died: it is ignored.
+                if not line.endswith("\n"):
+                    break
+                measurement = json.loads(line)
+                tables.setdefault(measurement["path"], {})[(measurement["row"], measurement["column"])] = measurement["data"]
+            for csv_path, cells in tables.items():
+                rows = read_csv_rows(csv_path) if os.path.exists(csv_path) else []
+                write_csv_rows(csv_path, set_cells(rows, cells))
+            os.truncate(self.path, 0)
+        return list(tables)
@@ -0,0 +1,672 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import re
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from python.cli import MODELS, load_graph, source_description
+from python.compact_graph import CompactGraph
+from python.spread_cache import SpreadCache
+
+# Graphs loaded by a worker process, by source description, kept for the lifetime of the worker.
+_worker_graphs = {}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def worker_graph(path: str, cache_directory: Optional[str]) -> CompactGraph:
+    """ Returns the graph of a file in a worker process, loading it on first use only.
+
+    Parameters
+    ----------
+    path : str
+        path of the graph file.
+
+    cache_directory : str, optional
+        directory of the binary graph cache, see `python.cli.load_graph`.
+
+    Returns
+    -------
+    CompactGraph
+        the graph.
+    """
+    key = repr(sorted(source_description(path).items()))
+    g = _worker_graphs.get(key)
+    if g is None:
+        g = _worker_graphs[key] = load_graph(path, cache_directory)
+    return g
+
+
+def worker_influential_nodes(path: str, cache_directory: Optional[str], degree: str) -> List[str]:
+    """ Computes the influential nodes of a graph in a worker process.
+
+    Parameters
+    ----------
+    path : str
+        path of the graph file.
+
+    cache_directory : str, optional
+        directory of the binary graph cache.
+
+    degree : str
+        degree metric: "i" for in-degree, "o" for out-degree.
+
+    Returns
+    -------
+    List[str]
+        the influential nodes, by decreasing EDC.
+    """
+    g = worker_graph(path, cache_directory)
+    # The biggest degree is cached by the graph for the first metric used, so it is recomputed for each metric.
+    g.most_connected_node_degree_value = None
+    return g.get_influential_nodes(g.in_degree if degree == "i" else g.out_degree)
+
+
+def worker_spread(path: str, cache_directory: Optional[str], model_name: str, seeds: List[str], act_prob: float,
+                  replicas: int, seed: int) -> List[int]:
+    """ Runs cascades from a seed set in a worker process.
+
+    Parameters
+    ----------
+    path : str
+        path of the graph file.
+
+    cache_directory : str, optional
+        directory of the binary graph cache.
+
+    model_name : str
+        name of the spreading model: IC or LT.
+
+    seeds : List[str]
+        list of seed nodes.
+
+    act_prob : float
+        activation probability.
+
+    replicas : int
+        number of cascades.
+
+    seed : int
+        seed of the random number generator.
+
+    Returns
+    -------
+    List[int]
+        number of nodes influenced by each cascade, seeds included.
+    """
+    g = worker_graph(path, cache_directory)
+    model = MODELS[model_name]
+    rng = random.Random(seed)
+    return [model(g, seeds, act_prob, rng).get_total_number_of_influenced_nodes() for _ in range(replicas)]
+
+
+class LatencyMetrics:
+    """Latency of the requests served, per route, over the most recent requests.
+
+    Parameters
+    ----------
+    window : int, optional
+        number of most recent requests kept per route. Defaults to 1024.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self.started = time.time()
+        self.samples = {}
+        self.counts = {}
+        self.errors = {}
+        self.in_flight = 0
+
+    def record(self, route: str, elapsed: float, failed: bool) -> None:
+        """ Records a request.
+
+        Parameters
+        ----------
+        route : str
+            name of the route of the request.
+
+        elapsed : float
+            time taken to serve the request, in seconds.
+
+        failed : bool
+            whether the request failed.
+        """
+        self.samples.setdefault(route, deque(maxlen=self.window)).append(elapsed)
+        self.counts[route] = self.counts.get(route, 0) + 1
+        self.errors[route] = self.errors.get(route, 0) + failed
+
+    @staticmethod
+    def percentile(sorted_samples: List[float], fraction: float) -> float:
+        """ Returns a percentile of sorted samples, by the nearest-rank method.
+
+        Parameters
+        ----------
+        sorted_samples : List[float]
+            samples, in increasing order.
+
+        fraction : float
+            rank of the percentile, between 0 and 1.
+
+        Returns
+        -------
+        float
+            the percentile.
+        """
+        return sorted_samples[max(0, math.ceil(len(sorted_samples) * fraction) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """ Summarises the latencies, in milliseconds.
+
+        Returns
+        -------
+        Dict[str, Any]
+            uptime and requests in flight, and for each route the number of requests and errors,
+            and the mean, median, 95th percentile and maximum latency over the most recent requests.
+        """
+        routes = {}
+        for route, samples in self.samples.items():
+            sorted_samples = sorted(samples)
+            routes[route] = {"requests": self.counts[route], "errors": self.errors[route],
+                             "mean_ms": 1000 * sum(sorted_samples) / len(sorted_samples),
+                             "p50_ms": 1000 * self.percentile(sorted_samples, 0.5),
+                             "p95_ms": 1000 * self.percentile(sorted_samples, 0.95),
+                             "max_ms": 1000 * sorted_samples[-1]}
+        return {"uptime_s": time.time() - self.started, "in_flight": self.in_flight, "routes": routes}
+
+
+class InfluenceService:
+    """Graphs held in memory and the queries answered on them.
+    Cheap queries, such as the neighbourhood of a node, are answered in the event loop from the graph kept by the service.
+    The influential nodes and the cascades run in a pool of worker processes, each loading a graph once and keeping it;
+    their results are kept by the service, and concurrent identical queries share a single computation.
+
+    Parameters
+    ----------
+    workers : int, optional
+        number of worker processes. Defaults to the number of CPUs.
+
+    cache_directory : str, optional
+        directory of the binary graph cache, which lets the workers load graphs without parsing them. Defaults to None.
+
+    max_spreads : int, optional
+        number of spread estimates kept. Defaults to 4096.
+    """
+
+    def __init__(self, workers=None, cache_directory=None, max_spreads=4096):
+        self.cache_directory = cache_directory
+        # Spawned rather than forked, so the workers do not inherit the listening socket of the server. Each worker
+        # has its own hash seed, which does not change the cascades: IC and LT activate nodes in insertion order.
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.graphs = {}
+        self.sources = {}
+        self.lccs = {}
+        self.influential_nodes = {}
+        self.spreads = SpreadCache(max_spreads)
+        self.pending_spreads = {}
+        self.metrics = LatencyMetrics()
+
+    def close(self) -> None:
+        """ Shuts the worker processes down."""
+        self.executor.shutdown(cancel_futures=True)
+
+    def graph(self, name: str) -> CompactGraph:
+        """ Returns a loaded graph.
+
+        Parameters
+        ----------
+        name : str
+            name of the graph.
+
+        Returns
+        -------
+        CompactGraph
+            the graph.
+        """
+        if name not in self.graphs:
+            raise KeyError("graph %s is not loaded" % name)
+        return self.graphs[name]
+
+    async def load(self, name: str, path: str) -> Dict[str, Any]:
+        """ Loads a graph, or reloads it if it was loaded already, and forgets the results computed on the previous version.
+
+        Parameters
+        ----------
+        name : str
+            name given to the graph in the queries.
+
+        path : str
+            path of the graph file.
+
+        Returns
+        -------
+        Dict[str, Any]
+            name, path, number of nodes and edges of the graph.
+        """
+        g = await asyncio.get_running_loop().run_in_executor(None, load_graph, path, self.cache_directory)
+        self.graphs[name] = g
+        self.sources[name] = path
+        self.lccs[name] = {}
+        for key in [key for key in self.influential_nodes if key[0] == name]:
+            del self.influential_nodes[key]
+        return self.describe(name)
+
+    def describe(self, name: str) -> Dict[str, Any]:
+        """ Describes a loaded graph.
+
+        Parameters
+        ----------
+        name : str
+            name of the graph.
+
+        Returns
+        -------
+        Dict[str, Any]
+            name, path, number of nodes and edges of the graph.
+        """
+        g = self.graph(name)
+        return {"name": name, "path": self.sources[name], "nodes": len(g.labels), "edges": len(g.targets)}
+
+    async def top_influential_nodes(self, name: str, k: Optional[int], degree: str = "o") -> Dict[str, Any]:
+        """ Returns the `k` most influential nodes of a graph, by the IM algorithm.
+
+        Parameters
+        ----------
+        name : str
+            name of the graph.
+
+        k : int, optional
+            number of nodes returned. Defaults to None, which returns all the influential nodes.
+
+        degree : str, optional
+            degree metric: "i" for in-degree, "o" for out-degree. Defaults to "o".
+
+        Returns
+        -------
+        Dict[str, Any]
+            the influential nodes, by decreasing EDC, and their total number.
+        """
+        if degree not in ("i", "o"):
+            raise Exception("degree must be i or o")
+        self.graph(name)
+        key = (name, degree)
+        if key not in self.influential_nodes:
+            path = self.sources[name]
+            future = asyncio.get_running_loop().run_in_executor(self.executor, worker_influential_nodes, path,
+                                                                self.cache_directory, degree)
+            self.influential_nodes[key] = asyncio.ensure_future(future)
+        try:
+            nodes = await asyncio.shield(self.influential_nodes[key])
+        except Exception:
+            self.influential_nodes.pop(key, None)
+            raise
+        return {"graph": name, "degree": degree, "count": len(nodes), "nodes": nodes[:k] if k is not None else nodes}
+
+    async def spread(self, name: str, seeds: List[str], model_name: str = "IC", act_prob: float = 0.2,
+                     replicas: int = 100, seed: int = 0) -> Dict[str, Any]:
+        """ Estimates the average number of nodes influenced by a seed set.
+
+        Parameters
+        ----------
+        name : str
+            name of the graph.
+
+        seeds : List[str]
+            list of seed nodes.
+
+        model_name : str, optional
+            name of the spreading model: IC or LT. Defaults to IC.
+
+        act_prob : float, optional
+            activation probability. Defaults to 0.2.
+
+        replicas : int, optional
+            number of cascades averaged. Defaults to 100.
+
+        seed : int, optional
+            seed of the random number generator. The spread is the same whichever worker computes it. Defaults to 0.
+
+        Returns
+        -------
+        Dict[str, Any]
+            average number of influenced nodes, seeds included, and whether it was cached.
+        """
+        g = self.graph(name)
+        if model_name not in MODELS:
+            raise Exception("unknown spreading model %s" % model_name)
+        if replicas < 1:
+            raise Exception("replicas must be positive")
+        for s in seeds:
+            if s not in g.index:
+                raise Exception("seed %s is not in graph" % s)
+        seed_nodes = sorted(set(seeds))
+        # LT is deterministic: the activation probability and the replicas do not change its outcome.
+        if model_name == "LT":
+            act_prob, replicas = None, 1
+        version = repr(sorted(source_description(self.sources[name]).items()))
+        key = self.spreads.make_key(version, model_name, {"act_prob": act_prob, "replicas": replicas}, seed_nodes, seed)
+        spread = self.spreads.get(key)
+        cached = spread is not None
+        if not cached:
+            if key not in self.pending_spreads:
+                future = asyncio.get_running_loop().run_in_executor(self.executor, worker_spread, self.sources[name],
+                                                                    self.cache_directory, model_name, seed_nodes,
+                                                                    act_prob, replicas, seed)
+                self.pending_spreads[key] = asyncio.ensure_future(future)
+            try:
+                totals = await asyncio.shield(self.pending_spreads[key])
+            finally:
+                self.pending_spreads.pop(key, None)
+            spread = sum(totals) / float(len(totals))
+            self.spreads.put(key, spread)
+        return {"graph": name, "model": model_name, "act_prob": act_prob, "replicas": replicas, "seed": seed,
+                "seeds": seed_nodes, "spread": spread, "cached": cached}
+
+    def node(self, name: str, vertex: str) -> Dict[str, Any]:
+        """ Describes a node: its degrees, neighbourhood and local clustering coefficient.
+
+        Parameters
+        ----------
+        name : str
+            name of the graph.
+
+        vertex : str
+            the node.
+
+        Returns
+        -------
+        Dict[str, Any]
+            in-degree, out-degree, neighbourhood and LCC of the node.
+        """
+        g = self.graph(name)
+        if vertex not in g.index:
+            raise KeyError("node %s is not in graph %s" % (vertex, name))
+        lccs = self.lccs[name]
+        if vertex not in lccs:
+            lccs[vertex] = g.local_clustering_coefficient(vertex)
+        return {"graph": name, "node": vertex, "in_degree": g.in_degree(vertex), "out_degree": g.out_degree(vertex),
+                "neighbourhood": g.neighbourhood(vertex), "lcc": lccs[vertex]}
+
+    def route(self, method: str, target: str, body: Dict[str, Any]) -> Tuple[str, Optional[Awaitable[Any]], List[str]]:
+        """ Finds the route of a request.
+
+        Routes:
+
+        - `GET /graphs`: the loaded graphs.
+        - `POST /graphs` with `{"name": ..., "path": ...}`: loads a graph.
+        - `GET /graphs/<name>/influential?k=10&degree=o`: the `k` most influential nodes.
+        - `POST /graphs/<name>/spread` with `{"seeds": [...], "model": "IC", "act_prob": 0.2, "replicas": 100, "seed": 0}`:
+          average spread of a seed set.
+        - `GET /graphs/<name>/nodes/<node>`: neighbourhood and LCC of a node.
+        - `GET /metrics`: latency of the requests served, per route.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the request.
+
+        target : str
+            target of the request: path and query string.
+
+        body : Dict[str, Any]
+            JSON body of the request, empty if it had none.
+
+        Returns
+        -------
+        Tuple[str, Optional[Awaitable[Any]], List[str]]
+            name of the route, the answer to await, which is JSON-serialisable, or None if the route does not accept
+            `method`, and the methods the path accepts.
+        """
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        # Answers by method of the path, built only for the method of the request.
+        if parts == ["metrics"]:
+            methods = {"GET": ("metrics", lambda: answer(self.metrics.snapshot))}
+        elif parts == ["graphs"]:
+            methods = {"GET": ("graphs", lambda: answer(lambda: [self.describe(name) for name in self.graphs])),
+                       "POST": ("load", lambda: self.load(body["name"], body["path"]))}
+        elif len(parts) == 3 and parts[0] == "graphs" and parts[2] == "influential":
+            methods = {"GET": ("influential", lambda: self.top_influential_nodes(
+                parts[1], int(query["k"]) if "k" in query else None, query.get("degree", "o")))}
+        elif len(parts) == 3 and parts[0] == "graphs" and parts[2] == "spread":
+            methods = {"POST": ("spread", lambda: self.spread(parts[1], body["seeds"], body.get("model", "IC"),
+                                                              body.get("act_prob", 0.2), body.get("replicas", 100),
+                                                              body.get("seed", 0)))}
+        elif len(parts) == 4 and parts[0] == "graphs" and parts[2] == "nodes":
+            methods = {"GET": ("node", lambda: answer(self.node, parts[1], parts[3]))}
+        else:
+            raise KeyError("no route for %s" % url.path)
+        allowed = sorted(methods)
+        if method not in methods:
+            return next(iter(methods.values()))[0], None, allowed
+        name, call = methods[method]
+        return name, call(), allowed
+
+
+async def answer(function: Callable[..., Any], *args: Any) -> Any:
+    """ Calls a function answering a request in the event loop, for routes which answer without awaiting.
+
+    Parameters
+    ----------
+    function : Callable[..., Any]
+        the function.
+
+    *args : Any
+        its arguments.
+
+    Returns
+    -------
+    Any
+        the answer.
+    """
+    return function(*args)
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+    """ Reads an HTTP request.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        stream of the connection.
+
+    Returns
+    -------
+    Optional[Tuple[str, str, Dict[str, Any]]]
+        method, target and JSON body of the request, or None if the connection was closed.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        header, _, value = line.decode("latin-1").partition(":")
+        headers[header.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = json.loads(await reader.readexactly(length)) if length else {}
+    return method.upper(), target, body
+
+
+def encode_response(status: int, payload: Any, headers: Dict[str, str] = None) -> bytes:
+    """ Encodes an HTTP response with a JSON body.
+
+    Parameters
+    ----------
+    status : int
+        status code.
+
+    payload : Any
+        JSON-serialisable body.
+
+    headers : Dict[str, str], optional
+        additional headers, such as the `Allow` header of a 405 response. Defaults to None.
+
+    Returns
+    -------
+    bytes
+        the response.
+    """
+    body = json.dumps(payload).encode()
+    extra = "".join("%s: %s\r\n" % (header, value) for header, value in (headers or {}).items())
+    head = "HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%sConnection: close\r\n\r\n" \
+           % (status, REASONS[status], len(body), extra)
+    return head.encode("latin-1") + body
+
+
+def error_status(error: Exception) -> int:
+    """ Maps an error raised while answering a request to an HTTP status code.
+
+    Parameters
+    ----------
+    error : Exception
+        the error.
+
+    Returns
+    -------
+    int
+        the status code.
+    """
+    if isinstance(error, KeyError) and error.args and str(error.args[0]).startswith(("graph ", "node ", "no route ")):
+        return 404
+    return 400
+
+
+def make_handler(service: InfluenceService) -> Any:
+    """ Builds the connection handler of the server: one request per connection, answered in JSON.
+
+    Parameters
+    ----------
+    service : InfluenceService
+        service answering the requests.
+
+    Returns
+    -------
+    Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]
+        the handler.
+    """
+    async def handle(reader, writer):
+        start = time.perf_counter()
+        route, status, request = "invalid", 400, ()
+        service.metrics.in_flight += 1
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            headers = None
+            try:
+                route, result, allowed = service.route(*request)
+                if result is None:
+                    status, headers = 405, {"Allow": ", ".join(allowed)}
+                    payload = {"error": "%s is not allowed on %s, expected %s" % (request[0], route, " or ".join(allowed))}
+                else:
+                    payload = await result
+                    status = 200
+            except Exception as error:
+                status = error_status(error)
+                payload = {"error": str(error.args[0]) if len(error.args) == 1 else str(error)}
+            writer.write(encode_response(status, payload, headers))
+            await writer.drain()
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError) as error:
+            writer.write(encode_response(400, {"error": str(error)}))
+        finally:
+            service.metrics.in_flight -= 1
+            if request is not None:
+                service.metrics.record(route, time.perf_counter() - start, status != 200)
+            writer.close()
+    return handle
+
+
+async def serve(service: InfluenceService, host: str = "127.0.0.1", port: int = 8765, unix_socket: str = None,
+                graphs: Dict[str, str] = None) -> None:
+    """ Loads graphs and serves requests until cancelled.
+
+    Parameters
+    ----------
+    service : InfluenceService
+        service answering the requests.
+
+    host : str, optional
+        address listened on. Defaults to 127.0.0.1.
+
+    port : int, optional
+        TCP port listened on. Defaults to 8765.
+
+    unix_socket : str, optional
+        path of a Unix socket listened on instead of the TCP port. Defaults to None.
+
+    graphs : Dict[str, str], optional
+        graphs loaded before serving, by name. Defaults to None.
+    """
+    for name, path in (graphs or {}).items():
+        print("loaded", await service.load(name, path))
+    try:
+        # Stops serving on SIGTERM as on Ctrl-C, so the worker processes are shut down.
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    handler = make_handler(service)
+    if unix_socket is not None:
+        server = await asyncio.start_unix_server(handler, path=unix_socket)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+    print("serving on", unix_socket or "http://%s:%d" % (host, port))
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command-line entry point.
+
+    `python -m python.server wiki=wiki-Vote.txt --cache-dir .graph-cache` loads wiki-Vote once and answers, for instance,
+    `curl 'localhost:8765/graphs/wiki/influential?k=10'` or
+    `curl -d '{"seeds": ["30", "8"], "replicas": 1000}' localhost:8765/graphs/wiki/spread`.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        exit status.
+    """
+    parser = argparse.ArgumentParser(description="Serves influence queries on graphs kept in memory.")
+    parser.add_argument("graphs", nargs="*", help="graphs loaded at start-up, as name=path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="path of a Unix socket listened on instead of the TCP port")
+    parser.add_argument("--workers", type=int, help="number of worker processes (number of CPUs by default)")
+    parser.add_argument("--cache-dir", help="directory of the binary graph cache (disabled by default)")
+    args = parser.parse_args(argv)
+
+    graphs = {}
+    for argument in args.graphs:
+        match = re.fullmatch(r"([^=]+)=(.+)", argument)
+        if match is None:
+            parser.error("graphs must be given as name=path")
+        graphs[match.group(1)] = match.group(2)
+    service = InfluenceService(args.workers, args.cache_dir)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix_socket, graphs))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Dict
+from python.compact_graph import CompactGraph
+
+# Integer arrays of a CompactGraph exported to shared memory.
+ARRAYS = ("offsets", "targets", "in_offsets", "in_sources")
+
+# Graph attached by a worker process, see `set_worker_shared_graph`.
+worker_graph = None
+
+
+class SharedGraph:
+    """Copy of a graph's compact arrays and labels in `multiprocessing.shared_memory` blocks, owned by the process which created it.
+    Worker processes receive `descriptor`, which is small and picklable, and attach the graph with `attach_shared_graph`
+    instead of receiving a pickled copy of the whole graph.
+    The blocks are freed by `unlink`, or when leaving a `with SharedGraph(g) as shared:` block.
+
+    Parameters
+    ----------
+    g : Graph
+        graph exported. Converted to a `CompactGraph` first if needed.
+    """
+
+    def __init__(self, g):
+        compact = g if isinstance(g, CompactGraph) else CompactGraph.from_graph(g)
+        self.blocks = []
+        self.descriptor = {"most_connected_node_degree_value": compact.most_connected_node_degree_value}
+        try:
+            for name in ARRAYS:
+                self.descriptor[name] = self.export(array('q', getattr(compact, name)))
+            encoded = [label.encode() for label in compact.labels]
+            label_offsets = array('q', [0])
+            for label in encoded:
+                label_offsets.append(label_offsets[-1] + len(label))
+            self.descriptor["label_offsets"] = self.export(label_offsets)
+            self.descriptor["label_bytes"] = self.export(b"".join(encoded))
+        except BaseException:
+            self.unlink()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unlink()
+
+    def export(self, data: Any) -> Dict[str, Any]:
+        """ Copies `data` into a new shared memory block.
+
+        Parameters
+        ----------
+        data : Any
+            array of 64-bit integers or bytes.
+
+        Returns
+        -------
+        Dict[str, Any]
+            name of the block, number of items and number of bytes stored.
+        """
+        raw = data.tobytes() if isinstance(data, array) else data
+        # A block cannot be empty.
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(raw)))
+        self.blocks.append(block)
+        block.buf[:len(raw)] = raw
+        return {"name": block.name, "length": len(data), "nbytes": len(raw)}
+
+    def unlink(self) -> None:
+        """ Closes and frees the shared memory blocks. Graphs attached by workers must be detached first."""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def attach_shared_graph(descriptor: Dict[str, Any]) -> CompactGraph:
+    """ Attaches a graph exported by `SharedGraph`. Its arrays are read in place from shared memory, without any copy;
+    only the labels are decoded into the memory of the calling process. The graph must not be modified.
+
+    Parameters
+    ----------
+    descriptor : Dict[str, Any]
+        descriptor of the exported graph.
+
+    Returns
+    -------
+    CompactGraph
+        the graph, to be released with `detach_shared_graph`.
+    """
+    blocks = []
+    views = []
+
+    def view(entry, typecode):
+        block = shared_memory.SharedMemory(name=entry["name"])
+        blocks.append(block)
+        # Blocks may be larger than the bytes stored, since their size is rounded up to a whole number of pages
+        # and an empty array is stored in a 1-byte block, so the bytes are sliced before being cast.
+        items = block.buf[:entry["nbytes"]].cast(typecode).toreadonly()
+        views.append(items)
+        return items
+
+    try:
+        arrays = [view(descriptor[name], 'q') for name in ARRAYS]
+        label_offsets = view(descriptor["label_offsets"], 'q')
+        label_bytes = view(descriptor["label_bytes"], 'B')
+        labels = [bytes(label_bytes[label_offsets[i]:label_offsets[i + 1]]).decode() for i in range(len(label_offsets) - 1)]
+    except BaseException:
+        # Releases the views first, since a block cannot be closed while a view of it exists.
+        arrays = label_offsets = label_bytes = None
+        for items in views:
+            items.release()
+        for block in blocks:
+            block.close()
+        raise
+    g = CompactGraph(labels, *arrays)
+    g.most_connected_node_degree_value = descriptor["most_connected_node_degree_value"]
+    g.shared_blocks = blocks
+    g.shared_views = views
+    return g
+
+
+def detach_shared_graph(g: CompactGraph) -> None:
+    """ Releases a graph attached by `attach_shared_graph`. The graph cannot be used afterwards.
+
+    Parameters
+    ----------
+    g : CompactGraph
+        graph attached.
+    """
+    g.offsets = g.targets = g.in_offsets = g.in_sources = None
+    for items in g.shared_views:
+        items.release()
+    for block in g.shared_blocks:
+        block.close()
+    g.shared_views = []
+    g.shared_blocks = []
+
+
+def set_worker_shared_graph(descriptor: Dict[str, Any]) -> None:
+    """ Initializer of worker processes: attaches the exported graph once per worker, as `worker_graph`.
+
+    Parameters
+    ----------
+    descriptor : Dict[str, Any]
+        descriptor of the exported graph.
+    """
+    global worker_graph
+    worker_graph = attach_shared_graph(descriptor)
@@ -0,0 +1,312 @@
+import hashlib
+import heapq
+import random
+import shelve
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from python.graph import Graph
+from python.independent_cascade import IndependentCascadeModel
+from python.linear_threshold import LinearThresholdModel
+
+# Graph versions are content hashes, computed once per Graph object and number of changes of its edges, and forgotten with it.
+_graph_versions = weakref.WeakKeyDictionary()
+
+
+def graph_version(g: Graph) -> str:
+    """ Returns a version string identifying the content of `g`.
+    Two graphs with the same vertices and adjacency list share the same version, even across processes.
+    The version is computed again when the edges of `g` changed since, as counted by `g.mutations`.
+
+    Parameters
+    ----------
+    g : Graph
+        graph which version is computed.
+
+    Returns
+    -------
+    str
+        hexadecimal digest of the vertices and edges of `g`.
+    """
+    mutations, version = _graph_versions.get(g, (None, None))
+    if version is None or mutations != g.mutations:
+        digest = hashlib.sha1()
+        for node, neighbours in g.adjacency_list.items():
+            digest.update(node.encode())
+            digest.update(b"\x00")
+            digest.update("\x01".join(neighbours).encode())
+            digest.update(b"\x02")
+        version = digest.hexdigest()
+        _graph_versions[g] = (g.mutations, version)
+    return version
+
+
+def invalidate_graph_version(g: Graph) -> None:
+    """ Forgets the version of `g`. Must be called after modifying the adjacency list of `g` in place without counting
+    the change in `g.mutations`, as the subclasses of `Graph` which modify their edges do.
+
+    Parameters
+    ----------
+    g : Graph
+        graph which version is forgotten.
+    """
+    _graph_versions.pop(g, None)
+
+
+class SpreadCache:
+    """Bounded cache of spread estimates with least recently used eviction.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        maximum number of estimates kept in memory. Defaults to 1024.
+
+    path : str, optional
+        path of a shelve file used as a second, unbounded tier. Defaults to None (memory only).
+    """
+
+    def __init__(self, max_entries=1024, path=None):
+        if max_entries < 1:
+            raise Exception("the cache must hold at least one entry")
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.disk = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def make_key(version: str, model_name: str, parameters: Dict[str, Any], seeds: Iterable[str], rng_seed: Any) -> str:
+        """ Builds the key of a spread estimate.
+
+        Parameters
+        ----------
+        version : str
+            version of the graph, see `graph_version`.
+
+        model_name : str
+            name of the spreading model.
+
+        parameters : Dict[str, Any]
+            parameters of the spreading model.
+
+        seeds : Iterable[str]
+            seed nodes. Their order and duplicates are ignored.
+
+        rng_seed : Any
+            seed of the random number generator used for the estimate.
+
+        Returns
+        -------
+        str
+            the key.
+        """
+        # Sorting makes the key independent of the seed order. The estimate it identifies is the same in every process,
+        # since the cascade models draw their random numbers in an order which does not depend on string hashes.
+        parts = [version, model_name, repr(sorted(parameters.items())), "\t".join(sorted(set(seeds))), repr(rng_seed)]
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+    def open_disk(self) -> Optional[shelve.Shelf]:
+        """ Opens the on-disk tier if a path was given and it is not open yet.
+
+        Returns
+        -------
+        Optional[shelve.Shelf]
+            the on-disk tier, or None if the cache lives in memory only.
+        """
+        if self.disk is None and self.path is not None:
+            self.disk = shelve.open(self.path)
+        return self.disk
+
+    def get(self, key: str) -> Optional[float]:
+        """ Looks up a spread estimate, first in memory then on disk.
+
+        Parameters
+        ----------
+        key : str
+            key built by `make_key`.
+
+        Returns
+        -------
+        Optional[float]
+            the cached estimate, or None if it is unknown.
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        disk = self.open_disk()
+        if disk is not None and key in disk:
+            value = disk[key]
+            self.remember(key, value)
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: float) -> None:
+        """ Stores a spread estimate in memory and on disk.
+
+        Parameters
+        ----------
+        key : str
+            key built by `make_key`.
+
+        value : float
+            spread estimate.
+        """
+        self.remember(key, value)
+        disk = self.open_disk()
+        if disk is not None:
+            disk[key] = value
+
+    def remember(self, key: str, value: float) -> None:
+        """ Stores a spread estimate in memory, evicting the least recently used one if the cache is full.
+
+        Parameters
+        ----------
+        key : str
+            key built by `make_key`.
+
+        value : float
+            spread estimate.
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Empties the in-memory tier. The on-disk tier is kept."""
+        self.entries.clear()
+
+    def close(self) -> None:
+        """ Closes the on-disk tier, flushing it."""
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+
+default_cache = SpreadCache()
+
+
+def estimate_spread(g: Graph, seeds: Iterable[str], spreading_model: Any = IndependentCascadeModel, act_prob: float = 0.2,
+                    replicas: int = 1, rng_seed: Any = None, cache: SpreadCache = None) -> float:
+    """ Returns the average number of nodes influenced by `seeds`, reusing the cached value if the same estimate was already made.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which the diffusion is performed.
+
+    seeds : Iterable[str]
+        seed nodes. Their order and duplicates are ignored.
+
+    spreading_model : Any, optional
+        spreading model used: either IC or LT. Defaults to IC.
+
+    act_prob : float, optional
+        activation probability. Defaults to 0.2.
+
+    replicas : int, optional
+        number of cascades averaged. Defaults to 1.
+
+    rng_seed : Any, optional
+        seed of the random number generator. Defaults to None, in which case the estimate is random and is not cached.
+
+    cache : SpreadCache, optional
+        cache used. Defaults to the module-wide cache.
+
+    Returns
+    -------
+    float
+        average number of influenced nodes.
+    """
+    if cache is None:
+        cache = default_cache
+    # LT is deterministic: the activation probability and the replicas do not change its outcome.
+    if spreading_model is LinearThresholdModel:
+        act_prob, replicas = None, 1
+    seed_nodes = sorted(set(seeds))
+    key = None
+    if rng_seed is not None:
+        parameters = {"act_prob": act_prob, "replicas": replicas}
+        key = cache.make_key(graph_version(g), spreading_model.__name__, parameters, seed_nodes, rng_seed)
+        spread = cache.get(key)
+        if spread is not None:
+            return spread
+    rng = random.Random(rng_seed)
+    total = 0
+    for _ in range(replicas):
+        total += spreading_model(g, seed_nodes, act_prob, rng).get_total_number_of_influenced_nodes()
+    spread = total / float(replicas)
+    if key is not None:
+        cache.put(key, spread)
+    return spread
+
+
+def greedy_influential_nodes(g: Graph, k: int, spreading_model: Any = IndependentCascadeModel, act_prob: float = 0.2,
+                             replicas: int = 1, rng_seed: Any = 0, candidates: Iterable[str] = None,
+                             cache: SpreadCache = None) -> List[str]:
+    """ Selects `k` seed nodes greedily: each step adds the candidate which increases the estimated spread the most.
+    Spread estimates go through `estimate_spread`, so repeated selections on the same graph, such as with a larger `k` or
+    another set of candidates, only simulate the seed sets not estimated yet. Gains are evaluated lazily (CELF):
+    since the spread is submodular, a candidate whose previous gain is below the best gain of the step is not estimated again.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which the diffusion is performed.
+
+    k : int
+        number of seed nodes selected.
+
+    spreading_model : Any, optional
+        spreading model used: either IC or LT. Defaults to IC.
+
+    act_prob : float, optional
+        activation probability. Defaults to 0.2.
+
+    replicas : int, optional
+        number of cascades averaged by each estimate. Defaults to 1.
+
+    rng_seed : Any, optional
+        seed of the random number generator of every estimate. Defaults to 0. With None, estimates are neither cached nor
+        made on common random numbers.
+
+    candidates : Iterable[str], optional
+        nodes selectable. Defaults to all the vertices of `g`.
+
+    cache : SpreadCache, optional
+        cache used. Defaults to the module-wide cache.
+
+    Returns
+    -------
+    List[str]
+        the selected nodes, in order of selection.
+    """
+    candidates = list(g.get_vertices() if candidates is None else candidates)
+    selected = []
+    spread = 0.0
+    # Heap of (-gain, position, node, size of the seed set the gain was computed for); the position breaks ties in candidate order.
+    heap = [(-estimate_spread(g, [node], spreading_model, act_prob, replicas, rng_seed, cache), position, node, 0)
+            for position, node in enumerate(candidates)]
+    heapq.heapify(heap)
+    while heap and len(selected) < k:
+        negative_gain, position, node, size = heapq.heappop(heap)
+        if size == len(selected):
+            selected.append(node)
+            spread -= negative_gain
+            continue
+        gain = estimate_spread(g, selected + [node], spreading_model, act_prob, replicas, rng_seed, cache) - spread
+        heapq.heappush(heap, (-gain, position, node, len(selected)))
+    return selected
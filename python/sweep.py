@@ -0,0 +1,143 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+from python.graph import Graph
+from python.evaluation import time_influential_nodes_computation, count_influential_nodes, \
+    compute_spreadings_of_influential_and_random_nodes
+
+# Each method computes the result of one iteration of an evaluation test on a random subgraph of size k.
+METHODS = {
+    "time": time_influential_nodes_computation,
+    "influential": count_influential_nodes,
+    "spreading": compute_spreadings_of_influential_and_random_nodes,
+}
+
+# Graph shared by the iterations run in a worker process, set once when the worker starts.
+worker_graph = None
+
+
+def set_worker_graph(g: Graph) -> None:
+    """ Stores the graph shared by the iterations run in the current process.
+    With the fork start method the graph is inherited from the parent process rather than pickled.
+
+    Parameters
+    ----------
+    g : Graph
+        graph on which the tests are carried out.
+    """
+    global worker_graph
+    worker_graph = g
+
+
+def iteration_rng(seed: int, method: str, k: int, iteration: int) -> random.Random:
+    """ Returns the random number generator of one iteration. It only depends on its arguments, and the cascade models draw
+    their random numbers in an order which does not depend on string hashes, so an iteration gives the same result
+    whichever process runs it, in whichever order and under whichever PYTHONHASHSEED.
+
+    Parameters
+    ----------
+    seed : int
+        seed of the sweep.
+
+    method : str
+        name of the method.
+
+    k : int
+        size of subgraph.
+
+    iteration : int
+        index of the iteration.
+
+    Returns
+    -------
+    random.Random
+        random number generator.
+    """
+    return random.Random("%d:%s:%d:%d" % (seed, method, k, iteration))
+
+
+def run_iteration(task: Tuple[str, int, int, int]) -> Any:
+    """ Runs one iteration of a method on the worker graph.
+
+    Parameters
+    ----------
+    task : Tuple[str, int, int, int]
+        method name, size of subgraph, index of the iteration and seed of the sweep.
+
+    Returns
+    -------
+    Any
+        result of the iteration.
+    """
+    method, k, iteration, seed = task
+    return METHODS[method](worker_graph, k, iteration_rng(seed, method, k, iteration))
+
+
+def average(results: List[Any]) -> Any:
+    """ Averages iteration results, which are either numbers or lists of numbers averaged element-wise.
+
+    Parameters
+    ----------
+    results : List[Any]
+        results of the iterations.
+
+    Returns
+    -------
+    Any
+        average result.
+    """
+    if isinstance(results[0], list):
+        return [sum(values) / float(len(values)) for values in zip(*results)]
+    return sum(results) / float(len(results))
+
+
+def run_sweep(dataset_graph: Graph, ks: List[int], ns: List[int], methods: List[str], processes: int = None,
+              seed: int = 0, aggregate: Callable[[List[Any]], Any] = average) -> Dict[Tuple[str, int, int], Any]:
+    """ Runs the evaluation tests over a grid of subgraph sizes, numbers of iterations and methods,
+    fanning the independent iterations out to a pool of processes.
+    The cells (`method`, `k`, `n`) of a same method and size share their first iterations: the cell with `n` = 10
+    averages the first 10 iterations of the cell with `n` = 50, which are only computed once.
+
+    Parameters
+    ----------
+    dataset_graph : Graph
+        graph on which the tests are carried out.
+
+    ks : List[int]
+        sizes of subgraph.
+
+    ns : List[int]
+        numbers of iterations.
+
+    methods : List[str]
+        names of the methods, among the keys of `METHODS`.
+
+    processes : int, optional
+        number of worker processes. Defaults to the number of CPUs.
+
+    seed : int, optional
+        seed of the sweep. Defaults to 0.
+
+    aggregate : Callable[[List[Any]], Any], optional
+        function combining the results of the iterations of a cell. Defaults to the average.
+
+    Returns
+    -------
+    Dict[Tuple[str, int, int], Any]
+        dictionary which entries ((`method`, `k`, `n`), `r`) associate each cell to its aggregated result `r`.
+    """
+    for method in methods:
+        if method not in METHODS:
+            raise Exception("unknown method", method)
+    max_n = max(ns)
+    tasks = [(method, k, iteration, seed) for method in methods for k in ks for iteration in range(max_n)]
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (4 * processes))
+    with ProcessPoolExecutor(max_workers=processes, initializer=set_worker_graph, initargs=(dataset_graph,)) as executor:
+        # map returns the results in the order of the tasks, which makes the aggregation deterministic.
+        results = list(executor.map(run_iteration, tasks, chunksize=chunksize))
+    iteration_results = {}
+    for task, result in zip(tasks, results):
+        iteration_results.setdefault((task[0], task[1]), []).append(result)
+    return {(method, k, n): aggregate(iteration_results[(method, k)][:n]) for method in methods for k in ks for n in ns}
@@ -0,0 +1,461 @@
+import heapq
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from python.graph import Graph
+
+
+class TemporalGraph(Graph):
+    """Graph of the edges of a timestamped stream that arrived within a sliding time window.
+    Edges are ingested one at a time with `add_edge`, and edges older than the window expire as time advances.
+    Degrees, predecessors and neighbourhoods are read from indexes updated with every edge, and the local clustering
+    coefficients and node level centralities of the nodes are cached and only recomputed for the nodes an edge affects,
+    so the top-degree and influential nodes can be queried at any moment without rebuilding the graph.
+
+    The graph holds the nodes of the live edges, in the order in which they appear in the live edges, as in a `Graph`
+    rebuilt from them: when the first live edge of a node expires, the node moves to its next live edge.
+    A node is removed with its last edge.
+    As in `Graph`, self loops are skipped and an edge arriving several times is kept once per arrival.
+    Timestamps must not decrease along the stream.
+
+    Parameters
+    ----------
+    window : float
+        length of the window: at time `now`, the live edges are those which timestamp `t` satisfies `now - window < t`.
+    """
+
+    def __init__(self, window):
+        if window <= 0:
+            raise Exception("The window must be positive")
+        self.window = window
+        self.now = None
+        # Live edges (t, a, b), in arrival order, hence also in expiry order.
+        self.timed_edges = deque()
+        # Successors of each node, once per live edge, in arrival order; iterated in the order of the nodes.
+        self.adjacency_list = {}
+        self.deduplicate = False
+        # Bumped by every edge change, so that the spread estimates cached for an earlier window are not reused.
+        self.mutations = 0
+        # Number of live edges between two nodes: successor_counts[a][b] for a -> b, predecessor_counts[b][a] likewise,
+        # and neighbour_counts[a][b] for the edges in either direction.
+        self.successor_counts = {}
+        self.predecessor_counts = {}
+        self.neighbour_counts = {}
+        # Positions of the live edges of each node, in arrival order: 2 * i for the head of the i-th edge of the stream,
+        # 2 * i + 1 for its tail. The first one is the position of the node, which orders the nodes.
+        self.incident_positions = {}
+        self.positions = {}
+        self.next_edge = 0
+        self.nodes_cache = None
+        # Cached scores, removed for the nodes affected by each edge.
+        self.lcc_cache = {}
+        self.nlc_cache = {"i": {}, "o": {}}
+        self.influential_nodes_cache = {}
+        self.snapshot_cache = None
+        self.most_connected_node_degree_value = None
+        self.degree_centralities = {}
+        self.weak_components = None
+        self.strong_components = None
+
+    @property
+    def nodes(self) -> List[str]:
+        if self.nodes_cache is None:
+            self.nodes_cache = sorted(self.adjacency_list, key=self.positions.__getitem__)
+        return list(self.nodes_cache)
+
+    def get_vertices(self) -> List[str]:
+        """Returns the vertices of `self`, in the order of their first live edge.
+
+        Returns
+        -------
+        List[str]
+            list of strings where each string `v`, is a node `v` of the graph.
+        """
+        return self.nodes
+
+    @property
+    def edges(self) -> List[Tuple[str, str]]:
+        return self.get_edges()
+
+    def get_edges(self) -> List[Tuple[str, str]]:
+        """Returns the live edges of `self`, in arrival order.
+
+        Returns
+        -------
+        List[Tuple[str,str]]
+            list of tuples where each tuple (`a`, `b`) is an edge between `a` and `b`.
+        """
+        return [(from_node, to_node) for _, from_node, to_node in self.timed_edges]
+
+    def add_edge(self, from_node: str, to_node: str, timestamp: float) -> None:
+        """ Ingests an edge of the stream, after expiring the edges which fall out of the window at `timestamp`.
+
+        Parameters
+        ----------
+        from_node : str
+            head of the edge.
+
+        to_node : str
+            tail of the edge.
+
+        timestamp : float
+            time of the edge, not earlier than the previous one.
+        """
+        self.advance(timestamp)
+        # Skips self loops, like `Graph.build_adjacency_list`.
+        if from_node == to_node:
+            return
+        self.add_node(from_node, 2 * self.next_edge)
+        self.add_node(to_node, 2 * self.next_edge + 1)
+        self.next_edge += 1
+        self.timed_edges.append((timestamp, from_node, to_node))
+        self.adjacency_list[from_node].append(to_node)
+        self.update_edge(from_node, to_node, 1)
+
+    def add_edges(self, timed_edges: Iterable[Tuple[str, str, float]]) -> None:
+        """ Ingests the edges of a stream.
+
+        Parameters
+        ----------
+        timed_edges : Iterable[Tuple[str, str, float]]
+            tuples (`a`, `b`, `t`) denoting an edge between `a` and `b` at time `t`, in timestamp order.
+        """
+        for from_node, to_node, timestamp in timed_edges:
+            self.add_edge(from_node, to_node, timestamp)
+
+    def advance(self, timestamp: float) -> None:
+        """ Moves the time of `self` to `timestamp` and expires the edges which fall out of the window.
+
+        Parameters
+        ----------
+        timestamp : float
+            new time, not earlier than the current one.
+        """
+        if self.now is not None and timestamp < self.now:
+            raise Exception("Edges must arrive in timestamp order:", timestamp, "is earlier than", self.now)
+        self.now = timestamp
+        horizon = timestamp - self.window
+        while self.timed_edges and self.timed_edges[0][0] <= horizon:
+            _, from_node, to_node = self.timed_edges.popleft()
+            # Edges leave in arrival order, so the oldest successor of the head is the one expiring.
+            self.adjacency_list[from_node].popleft()
+            self.update_edge(from_node, to_node, -1)
+            for vertex in (from_node, to_node):
+                # The expiring edge is the oldest live edge of both its nodes.
+                incident_positions = self.incident_positions[vertex]
+                incident_positions.popleft()
+                if incident_positions:
+                    self.positions[vertex] = incident_positions[0]
+                else:
+                    self.remove_node(vertex)
+
+    def add_node(self, vertex: str, position: int) -> None:
+        """ Records an edge of `vertex` at `position`, adding `vertex` to the nodes of `self` if it is not already one of them.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex added.
+
+        position : int
+            position of `vertex` in the edge arriving, see `incident_positions`.
+        """
+        if vertex not in self.adjacency_list:
+            self.adjacency_list[vertex] = deque()
+            self.successor_counts[vertex] = {}
+            self.predecessor_counts[vertex] = {}
+            self.neighbour_counts[vertex] = {}
+            self.incident_positions[vertex] = deque()
+            self.positions[vertex] = position
+            self.nodes_cache = None
+        self.incident_positions[vertex].append(position)
+
+    def remove_node(self, vertex: str) -> None:
+        """ Removes `vertex`, which has no live edge left, from the nodes of `self`.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex removed.
+        """
+        for index in (self.adjacency_list, self.successor_counts, self.predecessor_counts, self.neighbour_counts,
+                      self.incident_positions, self.positions, self.lcc_cache, self.nlc_cache["i"], self.nlc_cache["o"],
+                      self.degree_centralities):
+            index.pop(vertex, None)
+
+    @staticmethod
+    def update_count(counts: Dict[str, int], key: str, change: int) -> bool:
+        """ Adds `change` to the count of `key`, removing it when it drops to 0.
+
+        Parameters
+        ----------
+        counts : Dict[str, int]
+            counts updated.
+
+        key : str
+            key which count is updated.
+
+        change : int
+            1 or -1.
+
+        Returns
+        -------
+        bool
+            whether `key` was added to or removed from `counts`.
+        """
+        count = counts.get(key, 0) + change
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+        return count == 0 or count == change
+
+    def update_edge(self, from_node: str, to_node: str, change: int) -> None:
+        """ Updates the indexes for an edge arriving (`change` is 1) or expiring (`change` is -1),
+        and drops the cached scores it affects.
+
+        Parameters
+        ----------
+        from_node : str
+            head of the edge.
+
+        to_node : str
+            tail of the edge.
+
+        change : int
+            1 or -1.
+        """
+        distinct_edge_changed = self.update_count(self.successor_counts[from_node], to_node, change)
+        self.update_count(self.predecessor_counts[to_node], from_node, change)
+        self.update_count(self.neighbour_counts[from_node], to_node, change)
+        self.update_count(self.neighbour_counts[to_node], from_node, change)
+        # The out-degree of the head always changes, the in-degree of the tail when the edge is its first or last one.
+        # Either changes the node level centrality of the node and of its neighbours.
+        for vertex in (from_node, to_node):
+            for nlc in self.nlc_cache.values():
+                nlc.pop(vertex, None)
+                for neighbour in self.neighbour_counts[vertex]:
+                    nlc.pop(neighbour, None)
+        if distinct_edge_changed:
+            # The edge counts in the neighbourhood of both end nodes, and of the nodes they both neighbour.
+            self.lcc_cache.pop(from_node, None)
+            self.lcc_cache.pop(to_node, None)
+            for neighbour in self.neighbour_counts[from_node].keys() & self.neighbour_counts[to_node].keys():
+                self.lcc_cache.pop(neighbour, None)
+        self.mutations += 1
+        self.influential_nodes_cache = {}
+        self.snapshot_cache = None
+        self.nodes_cache = None
+        self.most_connected_node_degree_value = None
+        self.weak_components = None
+        self.strong_components = None
+
+    def degree_key(self, degree_method: Callable[[str], int]) -> Optional[str]:
+        """ Returns the string encoding `degree_method`, under which the scores computed with it are cached.
+
+        Parameters
+        ----------
+        degree_method : Callable[[str], int]
+            degree metric.
+
+        Returns
+        -------
+        Optional[str]
+            "i" for the in-degree, "o" for the out-degree, None for any other metric.
+        """
+        if degree_method == self.in_degree:
+            return "i"
+        if degree_method == self.out_degree:
+            return "o"
+        return None
+
+    def in_degree(self, vertex: str) -> int:
+        """ Returns the in-degree of `vertex`, that is its number of predecessors.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the in-degree is returned.
+
+        Returns
+        -------
+        int
+            the in-degree of the vertex.
+        """
+        return len(self.predecessor_counts[vertex])
+
+    def in_degree_counts(self) -> Dict[str, int]:
+        """ Returns the in-degree of every vertex of `self`.
+
+        Returns
+        -------
+        Dict[str, int]
+            dictionary which entries (`v`, `d`) associate each node `v` to its in-degree `d`.
+        """
+        return {vertex: len(self.predecessor_counts[vertex]) for vertex in self.nodes}
+
+    def successors(self, vertex: str) -> List[str]:
+        """ Derives the successors of `vertex`, once per live edge, in arrival order.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the successors are derived.
+
+        Returns
+        -------
+        List[str]
+            list of successors of `vertex`.
+        """
+        return list(self.adjacency_list[vertex])
+
+    def predecessors(self, vertices: List[str], vertex: str) -> List[str]:
+        """ Derives the predecessors of `vertex` from the index, in the order in which they became predecessors.
+        They are not searched in `vertices`, which only has to hold all of them.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the predecessors are derived.
+
+        vertices : List[str]
+            vertices of the original graph.
+
+        Returns
+        -------
+        List[str]
+            list of predecessors of `vertex`.
+        """
+        return list(self.predecessor_counts[vertex])
+
+    def neighbourhood(self, vertex: str) -> List[str]:
+        """ Determines the neighbourhood of `vertex`, which are the nodes connected to `vertex` by either an outgoing or incoming edge.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex which neighbourhood is determined.
+
+        Returns
+        -------
+        List[str]
+            list of nodes corresponding to the neighbourhood of `vertex`, in the order of the nodes of `self`.
+        """
+        return sorted(self.neighbour_counts[vertex], key=self.positions.__getitem__)
+
+    def isolated_nodes(self) -> List[str]:
+        """ Returns the nodes of `self` without any incoming or outgoing edge. There are none: nodes leave with their last edge.
+
+        Returns
+        -------
+        List[str]
+            empty list.
+        """
+        return []
+
+    def local_clustering_coefficient(self, vertex: str) -> float:
+        """ Computes the local clustering coefficient of `vertex`, `LCC(vertex)`, or returns it from the cache.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the local clustering coefficient is computed.
+
+        Returns
+        -------
+        float
+            `LCC(vertex)`
+        """
+        lcc = self.lcc_cache.get(vertex)
+        if lcc is None:
+            neighbourhood = self.neighbour_counts[vertex].keys()
+            lcc = 0.0
+            if len(neighbourhood) > 1:
+                neighbourhood_edges = sum(len(self.successor_counts[neighbour].keys() & neighbourhood) for neighbour in neighbourhood)
+                lcc = neighbourhood_edges / (len(neighbourhood) * (len(neighbourhood) - 1))
+            self.lcc_cache[vertex] = lcc
+        return lcc
+
+    def node_level_centrality(self, degree_method: Callable[[str], int], vertex: str) -> float:
+        """ Computes the node level centrality of `vertex`, `NLC(vertex)`, or returns it from the cache.
+
+        Parameters
+        ----------
+        vertex : str
+            vertex for which the  node level centrality is computed.
+
+        degree_method : Callable[[str], int]
+            degree metric used: in-degree or out-degree.
+
+        Returns
+        -------
+        float
+            `NLC(vertex)`
+        """
+        key = self.degree_key(degree_method)
+        # Scores of other degree metrics are not cached, since the indexes do not track their changes.
+        cache = {} if key is None else self.nlc_cache[key]
+        nlc = cache.get(vertex)
+        if nlc is None:
+            degrees = [degree_method(neighbour) for neighbour in self.neighbour_counts[vertex]]
+            degrees.append(degree_method(vertex))
+            most_connections = max(degrees)
+            nlc = sum([most_connections - degree for degree in degrees])
+            cache[vertex] = nlc
+        return nlc
+
+    def select_vertices_with_k_biggest_degree_values(self, degree_method: Callable[[str], int], k: int) -> List[str]:
+        """ Returns the `k` nodes with the biggest degree values, from the degree indexes and without sorting all the nodes.
+
+        Parameters
+        ----------
+        degree_method : Callable[[str], int]
+            degree metric used: in-degree or out-degree.
+
+        k : int
+            number of nodes returned.
+
+        Returns
+        -------
+        List[str]
+            the `k` nodes with the biggest degree values, ties in the order of the nodes of `self`.
+        """
+        return heapq.nlargest(k, self.nodes, key=degree_method)
+
+    def get_influential_nodes(self, degree_method: Callable[[str], int]) -> List[str]:
+        """ Computes the influential nodes among the live nodes using the IM algorithm.
+        Only the scores of the nodes affected by edges since the previous query are recomputed,
+        and the result is cached until the next edge arrives or expires.
+
+        Parameters
+        ----------
+        degree_method : Callable[[str], int]
+            degree metric used: in-degree or out-degree.
+
+        Returns
+        -------
+        List[str]
+            list of influential nodes.
+        """
+        key = self.degree_key(degree_method)
+        influential_nodes = self.influential_nodes_cache.get(key)
+        if influential_nodes is None:
+            if not self.adjacency_list:
+                return []
+            # The biggest degree depends on the degree metric, so it is computed for each query.
+            self.most_connected_node_degree_value = max(map(degree_method, self.adjacency_list))
+            influential_nodes = super().get_influential_nodes(degree_method)
+            if key is not None:
+                self.influential_nodes_cache[key] = influential_nodes
+        return list(influential_nodes)
+
+    def snapshot(self) -> Graph:
+        """ Builds a static `Graph` of the live edges, for instance to run cascades on. It is cached until the next change.
+
+        Returns
+        -------
+        Graph
+            graph with the nodes of `self`, in the same order, and their successors.
+        """
+        if self.snapshot_cache is None:
+            self.snapshot_cache = Graph("", {vertex: list(self.adjacency_list[vertex]) for vertex in self.nodes})
+        return self.snapshot_cache